@@ -0,0 +1,539 @@
+import json
+import re
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from warnings import warn
+
+from .concurrency import map_ordered
+from .contracts import Contracts
+from .pagination import Record
+
+Abi = List[Dict[str, Any]]
+# decodes the value whose encoding starts at a position (in hex characters) of the hex data
+Decode = Callable[[str, int], Any]
+# (decode, dynamic, head size in words)
+Coder = Tuple[Decode, bool, int]
+
+WORD = 64
+ARRAY = re.compile(r"^(.*)\[(\d*)\]$")
+NOT_VERIFIED = "not verified"
+
+_ROUND_CONSTANTS = [
+    0x0000000000000001,
+    0x0000000000008082,
+    0x800000000000808A,
+    0x8000000080008000,
+    0x000000000000808B,
+    0x0000000080000001,
+    0x8000000080008081,
+    0x8000000000008009,
+    0x000000000000008A,
+    0x0000000000000088,
+    0x0000000080008009,
+    0x000000008000000A,
+    0x000000008000808B,
+    0x800000000000008B,
+    0x8000000000008089,
+    0x8000000000008003,
+    0x8000000000008002,
+    0x8000000000000080,
+    0x000000000000800A,
+    0x800000008000000A,
+    0x8000000080008081,
+    0x8000000000008080,
+    0x0000000080000001,
+    0x8000000080008008,
+]
+# rotation of lane x + 5 * y
+_ROTATIONS = [
+    shift
+    for row in (
+        (0, 1, 62, 28, 27),
+        (36, 44, 6, 55, 20),
+        (3, 10, 43, 25, 39),
+        (41, 45, 15, 21, 8),
+        (18, 2, 61, 56, 14),
+    )
+    for shift in row
+]
+_LANE = (1 << 64) - 1
+_RATE = 136
+
+
+def _keccak_f(lanes: List[int]):
+    for constant in _ROUND_CONSTANTS:
+        parity = [
+            lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^ lanes[x + 20]
+            for x in range(5)
+        ]
+        for x in range(5):
+            right = parity[(x + 1) % 5]
+            theta = parity[(x - 1) % 5] ^ (((right << 1) | (right >> 63)) & _LANE)
+            for y in range(0, 25, 5):
+                lanes[x + y] ^= theta
+        moved = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                lane, shift = lanes[x + 5 * y], _ROTATIONS[x + 5 * y]
+                moved[y + 5 * ((2 * x + 3 * y) % 5)] = (
+                    (lane << shift) | (lane >> (64 - shift))
+                ) & _LANE
+        for y in range(0, 25, 5):
+            row = moved[y : y + 5]
+            for x in range(5):
+                lanes[x + y] = row[x] ^ (~row[(x + 1) % 5] & row[(x + 2) % 5])
+        lanes[0] ^= constant
+
+
+def keccak256(data: bytes) -> bytes:
+    """
+    Keccak-256 as used by Ethereum (not the NIST SHA3-256 of hashlib), in pure Python: meant for the few signatures
+    of an ABI, not for bulk hashing.
+    """
+    padded = bytearray(data) + b"\x01"
+    padded += b"\x00" * (-len(padded) % _RATE)
+    padded[-1] |= 0x80
+    lanes = [0] * 25
+    for start in range(0, len(padded), _RATE):
+        for i in range(_RATE // 8):
+            lanes[i] ^= int.from_bytes(
+                padded[start + 8 * i : start + 8 * i + 8], "little"
+            )
+        _keccak_f(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+def canonical_type(param: Dict[str, Any]) -> str:
+    """
+    Type of an ABI parameter as written in signatures, tuples expanded to their component types.
+    """
+    kind = param["type"]
+    if kind.startswith("tuple"):
+        components = ",".join(
+            canonical_type(component) for component in param["components"]
+        )
+        return f"({components}){kind[5:]}"
+    return kind
+
+
+def signature(entry: Dict[str, Any]) -> str:
+    return f"{entry['name']}({','.join(canonical_type(param) for param in entry.get('inputs', []))})"
+
+
+def _uint(word: str) -> int:
+    return int(word, 16)
+
+
+def _int(word: str) -> int:
+    value = int(word, 16)
+    return value - (1 << 256) if value >> 255 else value
+
+
+def _address(word: str) -> str:
+    if len(word) != WORD:
+        raise ValueError("truncated word")
+    return "0x" + word[24:]
+
+
+def _bool(word: str) -> bool:
+    return int(word, 16) != 0
+
+
+def _fixed_bytes(size: int) -> Callable[[str], str]:
+    def convert(word: str) -> str:
+        if len(word) != WORD:
+            raise ValueError("truncated word")
+        return "0x" + word[: 2 * size]
+
+    return convert
+
+
+def _word_converter(kind: str) -> Optional[Callable[[str], Any]]:
+    """
+    Converter of a 32 byte word for the static elementary types, None for any other type.
+    """
+    if kind.endswith("]") or kind.startswith("tuple"):
+        return None
+    if kind.startswith("uint"):
+        return _uint
+    if kind.startswith("int"):
+        return _int
+    if kind == "address":
+        return _address
+    if kind == "bool":
+        return _bool
+    if kind.startswith("bytes") and kind != "bytes":
+        return _fixed_bytes(int(kind[5:]))
+    return None
+
+
+def _bytes(data: str, position: int) -> str:
+    length = int(data[position : position + WORD], 16)
+    raw = data[position + WORD : position + WORD + 2 * length]
+    if len(raw) != 2 * length:
+        raise ValueError("truncated bytes")
+    return raw
+
+
+def _length(data: str, position: int, words: int) -> int:
+    """
+    Reads the length of a dynamic array, refusing one that can not fit in the data.
+    """
+    length = int(data[position : position + WORD], 16)
+    if length * words * WORD > len(data) - position - WORD:
+        raise ValueError("truncated array")
+    return length
+
+
+def _sequence(coders: List[Coder]) -> Decode:
+    """
+    Decoder of a tuple encoding: static values inline in the head, dynamic ones at an offset from its start.
+    """
+
+    def decode(data: str, position: int) -> List[Any]:
+        values, head = [], position
+        for decode_item, dynamic, words in coders:
+            if dynamic:
+                values.append(
+                    decode_item(data, position + 2 * int(data[head : head + WORD], 16))
+                )
+                head += WORD
+            else:
+                values.append(decode_item(data, head))
+                head += WORD * words
+        return values
+
+    return decode
+
+
+def coder(param: Dict[str, Any]) -> Coder:
+    """
+    Builds the decoder of an ABI parameter.
+    """
+    kind = param["type"]
+    array = ARRAY.match(kind)
+    if array is not None:
+        item_decode, item_dynamic, item_words = coder({**param, "type": array.group(1)})
+        item = (item_decode, item_dynamic, item_words)
+        if array.group(2):
+            count = int(array.group(2))
+            return _sequence([item] * count), item_dynamic, count * item_words
+        return (
+            lambda data, position: _sequence(
+                [item] * _length(data, position, item_words)
+            )(data, position + WORD),
+            True,
+            1,
+        )
+    if kind == "tuple":
+        components = param["components"]
+        coders = [coder(component) for component in components]
+        names = [component.get("name") for component in components]
+        decode = _sequence(coders)
+        if all(names):
+            decode = (
+                lambda sequence: lambda data, position: dict(
+                    zip(names, sequence(data, position))
+                )
+            )(decode)
+        dynamic = any(dynamic for _, dynamic, _ in coders)
+        return decode, dynamic, 1 if dynamic else sum(words for _, _, words in coders)
+    if kind == "bytes":
+        return lambda data, position: "0x" + _bytes(data, position), True, 1
+    if kind == "string":
+        return (
+            lambda data, position: bytes.fromhex(_bytes(data, position)).decode(
+                "utf-8", "replace"
+            ),
+            True,
+            1,
+        )
+    convert = _word_converter(kind)
+    if convert is None:
+        raise ValueError(f"unsupported abi type {kind}")
+    word: Callable[[str], Any] = convert
+    return lambda data, position: word(data[position : position + WORD]), False, 1
+
+
+def _names(params: List[Dict[str, Any]]) -> List[str]:
+    return [param.get("name") or f"arg{i}" for i, param in enumerate(params)]
+
+
+def params_decoder(params: List[Dict[str, Any]]) -> Callable[[str], Dict[str, Any]]:
+    """
+    Decoder of a hex encoded parameter tuple (no 0x prefix) into a {name: value} dict. Tuples of static elementary
+    types, most events and calls, take a fast path reading every word at a fixed position.
+    """
+    names = _names(params)
+    converters = [_word_converter(param["type"]) for param in params]
+    fields = [
+        (name, i * WORD, convert)
+        for i, (name, convert) in enumerate(zip(names, converters))
+        if convert is not None
+    ]
+    if len(fields) == len(params):
+        return lambda data: {
+            name: convert(data[start : start + WORD]) for name, start, convert in fields
+        }
+    decode = _sequence([coder(param) for param in params])
+    return lambda data: dict(zip(names, decode(data, 0)))
+
+
+class Function(object):
+    """
+    Decoder of the calldata and return data of an ABI function.
+    """
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.name: str = entry["name"]
+        self.signature = signature(entry)
+        self.selector = "0x" + keccak256(self.signature.encode()).hex()[:8]
+        self.decode_input = params_decoder(entry.get("inputs", []))
+        self.decode_output = params_decoder(entry.get("outputs", []))
+
+    def decode(self, calldata: str) -> Dict[str, Any]:
+        return {"function": self.name, "args": self.decode_input(calldata[10:])}
+
+
+class Event(object):
+    """
+    Decoder of the logs of an ABI event. Indexed parameters of dynamic or composite types are only available as the
+    hash held by their topic.
+    """
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.name: str = entry["name"]
+        self.signature = signature(entry)
+        self.topic = "0x" + keccak256(self.signature.encode()).hex()
+        self.anonymous = bool(entry.get("anonymous"))
+        inputs = entry.get("inputs", [])
+        indexed = [param for param in inputs if param.get("indexed")]
+        self.topic_count = len(indexed) + (0 if self.anonymous else 1)
+        self._indexed = [
+            (name, _word_converter(param["type"]) or (lambda word: "0x" + word))
+            for name, param in zip(_names(inputs), inputs)
+            if param.get("indexed")
+        ]
+        self._decode_data = params_decoder(
+            [param for param in inputs if not param.get("indexed")]
+        )
+
+    def decode(self, topics: List[str], data: str) -> Dict[str, Any]:
+        first = 0 if self.anonymous else 1
+        args = {
+            name: convert(topic[2:])
+            for (name, convert), topic in zip(self._indexed, topics[first:])
+        }
+        args.update(self._decode_data(data[2:]))
+        return {"event": self.name, "args": args}
+
+
+class ContractAbi(object):
+    """
+    Selector and topic0 lookup tables of a contract's ABI. Events are looked up by topic0 and number of topics, so
+    that e.g. ERC-20 and ERC-721 Transfer events, which share their topic0, are told apart.
+
+    Entries using a type the decoder does not support (function, fixed, ...) are left out and listed in
+    `unsupported` with the reason, the rest of the ABI is usable.
+    """
+
+    def __init__(self, abi: Union[str, Abi]):
+        entries: List[Any] = json.loads(abi) if isinstance(abi, str) else abi
+        self.functions: Dict[str, Function] = {}
+        self.events: Dict[Tuple[str, int], Event] = {}
+        self.unsupported: Dict[str, str] = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                if entry.get("type") == "function":
+                    function = Function(entry)
+                    self.functions[function.selector] = function
+                elif entry.get("type") == "event" and not entry.get("anonymous"):
+                    event = Event(entry)
+                    self.events[(event.topic, event.topic_count)] = event
+            except (ValueError, KeyError, TypeError) as error:
+                reason = f"{type(error).__name__}: {error}"
+                self.unsupported[str(entry.get("name"))] = reason
+
+    def function(self, name: str) -> Function:
+        for function in self.functions.values():
+            if function.name == name:
+                return function
+        raise KeyError(name)
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def _event_finder(topic: str, topic_count: int) -> Callable[[ContractAbi], Any]:
+    return lambda abi: abi.events.get((topic, topic_count))
+
+
+def _function_finder(selector: str) -> Callable[[ContractAbi], Any]:
+    return lambda abi: abi.functions.get(selector)
+
+
+class AbiDecoder(object):
+    """
+    Decodes pages of event logs and transactions with the ABIs of the contracts involved.
+
+    ABIs are fetched once per contract through Contracts.getabi (and persisted by the ResponseCache when the client
+    has one, getabi is immutable), contracts the api answers are not verified are remembered as such. Any other
+    failure leaves the contract's records undecoded with a warning and is asked again next time. `register` adds ABIs
+    known upfront, `fallback` ABIs (e.g. the ERC-20 one) decode what the contract's own ABI does not.
+
+    The batch methods fetch the missing ABIs of a page concurrently, then decode every record with the decoder found
+    in the precompiled tables, see params_decoder. A record that can not be decoded gives None, in order:
+
+        decoder = AbiDecoder(etherscan.contacts)
+        decoded = decoder.decode_logs(etherscan.logs.getLogs(token)["result"])
+    """
+
+    def __init__(
+        self,
+        contracts: Optional[Contracts] = None,
+        fallback: Iterable[Union[str, Abi]] = (),
+        workers: int = 4,
+    ):
+        self.contracts = contracts
+        self.workers = workers
+        self._abis: Dict[str, Optional[ContractAbi]] = {}
+        self._fallback = [ContractAbi(abi) for abi in fallback]
+
+    def register(self, address: str, abi: Union[str, Abi, ContractAbi]):
+        self._abis[address.lower()] = (
+            abi if isinstance(abi, ContractAbi) else ContractAbi(abi)
+        )
+
+    def abi(self, address: str) -> Optional[ContractAbi]:
+        """
+        Returns the ABI of a contract, fetched on first use, None when it is not verified.
+        """
+        address = address.lower()
+        if address in self._abis:
+            return self._abis[address]
+        abi, final = self._fetch(address)
+        if final:
+            self._abis[address] = abi
+        return abi
+
+    def prefetch(self, addresses: Iterable[str]):
+        """
+        Fetches the ABIs of the addresses not known yet, concurrently.
+        """
+        missing = list(
+            dict.fromkeys(address.lower() for address in addresses if address)
+        )
+        missing = [address for address in missing if address not in self._abis]
+        if self.contracts is None or not missing:
+            return
+        fetched = map_ordered(
+            self._fetch,
+            missing,
+            self.workers,
+            on_error=lambda index, error: self._fetch_failed(missing[index], error),
+        )
+        for address, (abi, final) in zip(missing, fetched):
+            if final:
+                self._abis[address] = abi
+
+    def decode_logs(self, records: List[Record]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Decodes a page of logs (getLogs results or eth_getTransactionReceipt logs) to {"event", "args"} dicts.
+        """
+        self.prefetch(_text(record.get("address")) for record in records)
+        decoded: List[Optional[Dict[str, Any]]] = []
+        lookups: Dict[Tuple[str, str, int], Optional[Event]] = {}
+        for record in records:
+            address, topics = record.get("address"), record.get("topics")
+            if (
+                not isinstance(address, str)
+                or not isinstance(topics, list)
+                or not topics
+            ):
+                decoded.append(None)
+                continue
+            key = (address.lower(), str(topics[0]).lower(), len(topics))
+            if key not in lookups:
+                lookups[key] = self._lookup(key[0], _event_finder(key[1], key[2]))
+            decoded.append(
+                self._apply(lookups[key], topics, record.get("data") or "0x")
+            )
+        return decoded
+
+    def decode_transactions(
+        self, records: List[Record]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Decodes the calldata of a page of transactions (txlist or eth_getTransactionByHash results) to
+        {"function", "args"} dicts, plain transfers and contract creations give None.
+        """
+        calls = [
+            (_text(record.get("to")), _text(record.get("input"))) for record in records
+        ]
+        self.prefetch(to for to, calldata in calls if len(calldata) >= 10)
+        decoded: List[Optional[Dict[str, Any]]] = []
+        lookups: Dict[Tuple[str, str], Optional[Function]] = {}
+        for to, calldata in calls:
+            if not to or len(calldata) < 10:
+                decoded.append(None)
+                continue
+            key = (to.lower(), calldata[:10].lower())
+            if key not in lookups:
+                lookups[key] = self._lookup(key[0], _function_finder(key[1]))
+            decoded.append(self._apply(lookups[key], calldata))
+        return decoded
+
+    def _lookup(self, address: str, find: Callable[[ContractAbi], Any]) -> Any:
+        # the page was prefetched, an address missing here failed to fetch
+        abi = self._abis.get(address)
+        for candidate in ([abi] if abi is not None else []) + self._fallback:
+            found = find(candidate)
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def _apply(
+        decoder: Optional[Union[Event, Function]], *args: Any
+    ) -> Optional[Dict[str, Any]]:
+        if decoder is None:
+            return None
+        try:
+            return decoder.decode(*args)  # type: ignore[arg-type]
+        except (ValueError, IndexError):
+            return None
+
+    def _fetch(self, address: str) -> Tuple[Optional[ContractAbi], bool]:
+        """
+        Fetches the ABI of a contract, returns it (None without one) and whether that answer is final: a verified ABI
+        or the api's "not verified" answer, not an error that may go away.
+        """
+        if self.contracts is None:
+            return None, True
+        response = self.contracts.getabi(address)
+        if response.get("status") != "1":
+            result = response.get("result")
+            if isinstance(result, str) and NOT_VERIFIED in result.lower():
+                return None, True
+            warn(f"getabi of {address} failed, its records are not decoded: {result}")
+            return None, False
+        try:
+            return ContractAbi(response["result"]), True  # type: ignore[arg-type]
+        except (ValueError, KeyError, TypeError):
+            return None, True
+
+    @staticmethod
+    def _fetch_failed(address: str, error: Exception) -> Tuple[None, bool]:
+        warn(
+            f"getabi of {address} failed, its records are not decoded: {type(error).__name__}: {error}"
+        )
+        return None, False
@@ -1,7 +1,57 @@
+from copy import copy
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
+from warnings import warn
 
-import requests
+from .backfill import backfill
+from .backfill import ShardPlanner
+from .concurrency import chunked
+from .concurrency import map_ordered
+from .exceptions import EtherscanError
+from .pagination import BlockPaginator
+from .pagination import MAX_RECORDS
+from .pagination import paginate
+from .pagination import Record
+from .pagination import result_records
+from .transport import BaseTransport
+from .transport import Transport
+
+
+def merge_balances(chunks: List[List[str]], responses: List[Any]) -> Dict[str, int]:
+    """
+    Merges the balancemulti responses of the address chunks. A failed call (an error response or the exception it
+    raised) does not discard the others, the addresses of its chunk are left out and reported with a warning.
+    """
+    balances: Dict[str, int] = {}
+    errors: List[Tuple[List[str], str]] = []
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            errors.append((chunk, f"{type(response).__name__}: {response}"))
+            continue
+        try:
+            records = result_records(response)
+        except EtherscanError as error:
+            errors.append((chunk, str(error)))
+            continue
+        for record in records:
+            balances[str(record["account"])] = int(str(record["balance"]))
+    if errors:
+        listed = "; ".join(
+            f"{chunk[0]}..({len(chunk)}): {error}" for chunk, error in errors[:3]
+        )
+        more = f" and {len(errors) - 3} more" if len(errors) > 3 else ""
+        warn(
+            f"balancemulti failed for {len(errors)} of {len(chunks)} chunks, "
+            f"their addresses are left out: {listed}{more}"
+        )
+    return balances
 
 
 class Accounts(object):
@@ -10,12 +60,28 @@ class Accounts(object):
     see: https://docs.etherscan.io/api-endpoints/accounts for more details
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self, key: str, endpoint: str, transport: Optional[BaseTransport] = None
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "account"}
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
+
+    def _streaming(self) -> "Accounts":
+        """
+        Returns a copy of this wrapper whose calls yield the records of the result as they arrive, see Transport.stream.
+        """
+        view = copy(self)
+        stream = self.transport.stream
+        view._get_request = lambda params: stream(self.endpoint, params)  # type: ignore
+        return view
+
+    # drivers of the iter_* and backfill_* methods, the asyncio wrappers swap in apaginate and abackfill
+    _paginate: Callable[..., Any] = staticmethod(paginate)
+    _backfill: Callable[..., Any] = staticmethod(backfill)
 
     def balance(
         self, address: str, tag: str = "latest"
@@ -27,19 +93,42 @@ class Accounts(object):
         return self._get_request(schema)
 
     def balancemulti(  # noqa
-        self, address: list, tag: str = "latest"
+        self, address: Union[str, List[str]], tag: str = "latest"
     ) -> Dict[str, Union[str, float, int]]:
         """
-        Returns the balance of the accounts from a list of addresses.
+        Returns the balance of the accounts from a list, or a comma separated string, of up to 20 addresses, see
+        balances for larger lists.
         """
         schema = {
             **self.params,
             "action": "balancemulti",
-            "address": address,
+            "address": address if isinstance(address, str) else ",".join(address),
             "tag": tag,
         }
         return self._get_request(schema)
 
+    def balances(
+        self,
+        addresses: Iterable[str],
+        tag: str = "latest",
+        chunk_size: int = 20,
+        workers: int = 8,
+    ) -> Dict[str, int]:
+        """
+        Returns the balance in wei of any number of addresses, fetched with concurrent balancemulti calls of
+        `chunk_size` addresses each. Addresses whose call failed are left out, see merge_balances.
+        """
+        chunks = chunked(list(dict.fromkeys(addresses)), chunk_size)
+        return merge_balances(
+            chunks,
+            map_ordered(
+                lambda chunk: self.balancemulti(chunk, tag),
+                chunks,
+                workers,
+                on_error=lambda index, error: error,
+            ),
+        )
+
     def txlist(  # noqa
         self,
         address: str,
@@ -104,7 +193,7 @@ class Accounts(object):
 
     def tokentx(  # noqa
         self,
-        contract_address: str,
+        contract_address: Optional[str],
         address: str,
         start_block: int,
         end_block: int,
@@ -136,7 +225,7 @@ class Accounts(object):
 
     def tokennfttx(  # noqa
         self,
-        contract_address: str,
+        contract_address: Optional[str],
         address: str,
         start_block: int,
         end_block: int,
@@ -168,7 +257,7 @@ class Accounts(object):
 
     def token1155tx(  # noqa
         self,
-        contract_address: str,
+        contract_address: Optional[str],
         address: str,
         start_block: int,
         end_block: int,
@@ -220,3 +309,127 @@ class Accounts(object):
             "offset": offset,
         }
         return self._get_request(schema)
+
+    def iter_txlist(
+        self,
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        offset: int = 1000,
+        sort: str = "asc",
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every transaction performed by an address, page by page.
+
+        The 10000 record cap is worked around by re-splitting the block range, see BlockPaginator. With stream=True
+        each page is parsed while it downloads instead of after, see Transport.stream.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.txlist(
+                address, start, end, page, offset, sort
+            ),
+            BlockPaginator(start_block, end_block, offset, sort),
+        )
+
+    def backfill_txlist(
+        self,
+        address: str,
+        start_block: int,
+        end_block: int,
+        workers: int = 4,
+        shard_size: int = 100000,
+    ) -> Iterator[Record]:
+        """
+        Yields every transaction performed by an address in block order, fetching adaptive block range shards
+        concurrently under the client's rate limit, see ShardPlanner.
+        """
+        return self._backfill(
+            lambda start, end: self.txlist(address, start, end, 1, MAX_RECORDS, "asc"),
+            ShardPlanner(start_block, end_block, MAX_RECORDS, shard_size),
+            workers,
+        )
+
+    def iter_txlistinternal(
+        self,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        address: str = None,
+        offset: int = 1000,
+        sort: str = "asc",
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every internal transaction of an address, or of a block range when address is None.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.txlistinternal(
+                start, end, address=address, page=page, offset=offset, sort=sort
+            ),
+            BlockPaginator(start_block, end_block, offset, sort),
+        )
+
+    def iter_tokentx(
+        self,
+        contract_address: Optional[str],
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        offset: int = 1000,
+        sort: str = "asc",
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every ERC-20 transfer matching the address and/or token contract, see tokentx.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.tokentx(
+                contract_address, address, start, end, page, offset, sort
+            ),
+            BlockPaginator(start_block, end_block, offset, sort),
+        )
+
+    def iter_tokennfttx(
+        self,
+        contract_address: Optional[str],
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        offset: int = 1000,
+        sort: str = "asc",
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every ERC-721 transfer matching the address and/or token contract, see tokennfttx.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.tokennfttx(
+                contract_address, address, start, end, page, offset, sort
+            ),
+            BlockPaginator(start_block, end_block, offset, sort),
+        )
+
+    def iter_token1155tx(
+        self,
+        contract_address: Optional[str],
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        offset: int = 1000,
+        sort: str = "asc",
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every ERC-1155 transfer matching the address and/or token contract, see token1155tx.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.token1155tx(
+                contract_address, address, start, end, page, offset, sort
+            ),
+            BlockPaginator(start_block, end_block, offset, sort),
+        )
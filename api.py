@@ -1,27 +1,93 @@
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
 from .accounts import Accounts
 from .blocks import Blocks
+from .cache import MemoryCache
+from .cache import ResponseCache
 from .contracts import Contracts
 from .gas_tracker import GasTracker
+from .keys import KeyPool
 from .logs import Logs
+from .metrics import Metrics
 from .proxy import Proxy
+from .retry import RetryPolicy
 from .stats import Stats
 from .tokens import Tokens
 from .transactions import Transactions
+from .transport import Timeout
+from .transport import Transport
 
 
 class Connector(object):
     """
     Etherscan api connector, see https://docs.etherscan.io/ for more details
+
+    All endpoint wrappers share a single pooled transport, `pool_size` bounds the number of keep-alive connections
+    kept open to the endpoint and `timeout` is passed to every request as (connect, read) seconds.
+
+    Calls are throttled client side to the limits of the key's tier, the defaults match the free tier
+    (5 calls/sec, 100,000 calls/day). Pass None to disable either limit. `key` may also be a list of keys, calls are
+    then spread over them with a rate budget each and keys the api rejects are ejected, see KeyPool.
+
+    An optional ResponseCache, e.g. ResponseCache("etherscan.sqlite"), answers repeated queries for immutable data
+    (old blocks, receipts, abis, ...) from disk instead of the api. An optional MemoryCache keeps hot responses
+    (eth_blockNumber, gasoracle, ...) in process and lets concurrent identical calls share one request.
+
+    Transient failures (connection errors, 5xx, "Max rate limit reached", ...) are retried with backoff by default,
+    pass e.g. RetryPolicy(max_attempts=1) as `retry_policy` to disable retries.
+
+    `rpc_endpoint` optionally names a JSON-RPC node used for the batch methods of the proxy module, see Proxy.
+
+    Pass Metrics() as `metrics` to record timings, sizes, cache hits, retries, rate limit waits and errors of every
+    call, see Metrics.
     """
 
-    def __init__(self, key: str, endpoint: str = "https://api.etherscan.io/api"):
+    def __init__(
+        self,
+        key: Union[str, Sequence[str]],
+        endpoint: str = "https://api.etherscan.io/api",
+        pool_size: int = 10,
+        timeout: Timeout = (3.05, 30.0),
+        calls_per_second: Optional[float] = 5.0,
+        daily_quota: Optional[int] = 100_000,
+        cache: Optional[ResponseCache] = None,
+        memory_cache: Optional[MemoryCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rpc_endpoint: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self.endpoint = endpoint
-        self.proxy = Proxy(key, endpoint)
-        self.accounts = Accounts(key, endpoint)
-        self.contacts = Contracts(key, endpoint)
-        self.transactions = Transactions(key, endpoint)
-        self.blocks = Blocks(key, endpoint)
-        self.logs = Logs(key, endpoint)
-        self.tokens = Tokens(key, endpoint)
-        self.gas_tracker = GasTracker(key, endpoint)
-        self.stats = Stats(key, endpoint)
+        self.key_pool = KeyPool(
+            key, calls_per_second=calls_per_second, daily_quota=daily_quota
+        )
+        key = self.key_pool.keys[0]
+        self.transport = Transport(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            timeout=timeout,
+            key_pool=self.key_pool,
+            cache=cache,
+            memory_cache=memory_cache,
+            retry_policy=retry_policy if retry_policy is not None else RetryPolicy(),
+            metrics=metrics,
+        )
+        self.proxy = Proxy(key, endpoint, self.transport, rpc_endpoint=rpc_endpoint)
+        self.accounts = Accounts(key, endpoint, self.transport)
+        self.contacts = Contracts(key, endpoint, self.transport)
+        self.transactions = Transactions(key, endpoint, self.transport)
+        self.blocks = Blocks(key, endpoint, self.transport)
+        self.logs = Logs(key, endpoint, self.transport)
+        self.tokens = Tokens(key, endpoint, self.transport)
+        self.gas_tracker = GasTracker(key, endpoint, self.transport)
+        self.stats = Stats(key, endpoint, self.transport)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,208 @@
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import cast
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from .accounts import Accounts
+from .accounts import merge_balances
+from .backfill import abackfill
+from .blocks import Blocks
+from .cache import MemoryCache
+from .cache import ResponseCache
+from .concurrency import amap_ordered
+from .concurrency import chunked
+from .contracts import Contracts
+from .gas_tracker import GasTracker
+from .keys import KeyPool
+from .logs import Logs
+from .metrics import Metrics
+from .pagination import apaginate
+from .proxy import Proxy
+from .proxy import rpc_error
+from .proxy import rpc_requests
+from .proxy import rpc_results
+from .retry import RetryPolicy
+from .stats import Stats
+from .tokens import merge_token_balances
+from .tokens import Tokens
+from .transactions import Transactions
+from .transport import AsyncTransport
+from .transport import Timeout
+
+
+def awaitable(response: Any) -> Awaitable[Dict[str, Any]]:
+    """
+    Types the response of a wrapper method inherited from its synchronous class, bound to an AsyncTransport it is the
+    awaitable of the response.
+    """
+    return cast(Awaitable[Dict[str, Any]], response)
+
+
+class AsyncAccounts(Accounts):
+    """
+    Accounts wrapper for the AsyncConnector, the iter_* and backfill_* methods return async iterators.
+    """
+
+    _paginate = staticmethod(apaginate)
+    _backfill = staticmethod(abackfill)
+
+    async def balances(  # type: ignore[override]
+        self,
+        addresses: Iterable[str],
+        tag: str = "latest",
+        chunk_size: int = 20,
+        workers: int = 8,
+    ) -> Dict[str, int]:
+        chunks = chunked(list(dict.fromkeys(addresses)), chunk_size)
+        return merge_balances(
+            chunks,
+            await amap_ordered(
+                lambda chunk: awaitable(self.balancemulti(chunk, tag)),
+                chunks,
+                workers,
+                on_error=lambda index, error: error,
+            ),
+        )
+
+
+class AsyncLogs(Logs):
+    """
+    Logs wrapper for the AsyncConnector, the iter_* and backfill_* methods return async iterators.
+    """
+
+    _paginate = staticmethod(apaginate)
+    _backfill = staticmethod(abackfill)
+
+
+class AsyncTokens(Tokens):
+    """
+    Tokens wrapper for the AsyncConnector.
+    """
+
+    async def tokenbalances(  # type: ignore[override]
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        tag: str = "latest",
+        workers: int = 8,
+    ) -> Dict[Tuple[str, str], int]:
+        pairs = list(dict.fromkeys(pairs))
+        return merge_token_balances(
+            pairs,
+            await amap_ordered(
+                lambda pair: awaitable(self.tokenbalance(pair[0], pair[1], tag)),
+                pairs,
+                workers,
+                on_error=lambda index, error: error,
+            ),
+        )
+
+
+class AsyncProxy(Proxy):
+    """
+    Proxy wrapper for the AsyncConnector, only methods that post-process their responses need overriding.
+    """
+
+    async def eth_gasPrice(  # type: ignore[override]
+        self, in_wei: bool = True
+    ) -> Dict[str, Union[str, float, int]]:
+        """
+        Returns the current price per gas in wei.
+        """
+        schema = {
+            **self.params,
+            "action": "eth_gasPrice",
+        }
+        return self._gas_price_result(
+            await awaitable(self._get_request(schema)), in_wei
+        )
+
+    async def _batch(  # type: ignore[override]
+        self,
+        method: str,
+        calls: List[list],
+        workers: int,
+        single: Optional[Callable[..., Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.rpc_endpoint is None:
+            call: Callable[..., Any] = single or getattr(self, method)
+            return await amap_ordered(
+                lambda args: awaitable(call(*args)), calls, workers, rpc_error
+            )
+        rpc_endpoint: str = self.rpc_endpoint
+        batches = chunked(rpc_requests(method, calls), self.rpc_batch_size)
+        responses = await amap_ordered(
+            lambda batch: self.transport.post_json(rpc_endpoint, batch),
+            batches,
+            workers,
+            lambda _, error: error,
+        )
+        return rpc_results(batches, responses)
+
+
+class AsyncConnector(object):
+    """
+    Asyncio etherscan api connector, see https://docs.etherscan.io/ for more details
+
+    Exposes the same modules and methods as Connector, each returning an awaitable of the response:
+
+        async with AsyncConnector(my_key) as etherscan:
+            last_block_number = await etherscan.proxy.eth_blockNumber()
+
+    All modules share one aiohttp session (requires `pip install aiohttp`) and the same rate limiter.
+    """
+
+    def __init__(
+        self,
+        key: Union[str, Sequence[str]],
+        endpoint: str = "https://api.etherscan.io/api",
+        pool_size: int = 100,
+        timeout: Timeout = (3.05, 30.0),
+        calls_per_second: Optional[float] = 5.0,
+        daily_quota: Optional[int] = 100_000,
+        cache: Optional[ResponseCache] = None,
+        memory_cache: Optional[MemoryCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rpc_endpoint: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.endpoint = endpoint
+        self.key_pool = KeyPool(
+            key, calls_per_second=calls_per_second, daily_quota=daily_quota
+        )
+        key = self.key_pool.keys[0]
+        self.transport = AsyncTransport(
+            pool_maxsize=pool_size,
+            timeout=timeout,
+            key_pool=self.key_pool,
+            cache=cache,
+            memory_cache=memory_cache,
+            retry_policy=retry_policy if retry_policy is not None else RetryPolicy(),
+            metrics=metrics,
+        )
+        self.proxy = AsyncProxy(
+            key, endpoint, self.transport, rpc_endpoint=rpc_endpoint
+        )
+        self.accounts = AsyncAccounts(key, endpoint, self.transport)
+        self.contacts = Contracts(key, endpoint, self.transport)
+        self.transactions = Transactions(key, endpoint, self.transport)
+        self.blocks = Blocks(key, endpoint, self.transport)
+        self.logs = AsyncLogs(key, endpoint, self.transport)
+        self.tokens = AsyncTokens(key, endpoint, self.transport)
+        self.gas_tracker = GasTracker(key, endpoint, self.transport)
+        self.stats = Stats(key, endpoint, self.transport)
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
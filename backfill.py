@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from warnings import warn
+
+from .pagination import Record
+from .pagination import result_records
+
+
+class ShardPlanner(object):
+    """
+    Splits [start_block, end_block] into adaptively sized shards and re-assembles their records in block order.
+
+    Every shard is fetched with a single call returning at most `cap` records. A shard that comes back full may have
+    been truncated, it is discarded and split in two. Shards close to the cap halve the size of the shards still to
+    be planned, sparse ones double it, so dense regions are cut finely while empty stretches are covered with few
+    calls.
+
+    The planner performs no I/O, see `backfill` and `abackfill` for the threaded and asyncio drivers. At most
+    `max_buffered` completed shards are held back waiting for an earlier shard before planning pauses.
+    """
+
+    def __init__(
+        self,
+        start_block: int,
+        end_block: int,
+        cap: int,
+        shard_size: int = 100000,
+        min_shard_size: int = 1,
+        max_shard_size: int = 10000000,
+        shrink_ratio: float = 0.9,
+        grow_ratio: float = 0.25,
+        max_buffered: int = 64,
+    ):
+        self.end_block = end_block
+        self.cap = cap
+        self.shard_size = shard_size
+        self.min_shard_size = min_shard_size
+        self.max_shard_size = max_shard_size
+        self.shrink_ratio = shrink_ratio
+        self.grow_ratio = grow_ratio
+        self.max_buffered = max_buffered
+        self._cursor = start_block
+        self._next = start_block
+        self._splits: List[Tuple[int, int]] = []
+        self._done: Dict[int, Tuple[int, List[Record]]] = {}
+
+    def next_shard(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the next (start_block, end_block) to fetch, or None when nothing can be planned right now.
+        """
+        if self._splits:
+            return heapq.heappop(self._splits)
+        if self._cursor > self.end_block or len(self._done) >= self.max_buffered:
+            return None
+        start = self._cursor
+        end = min(start + self.shard_size - 1, self.end_block)
+        self._cursor = end + 1
+        return start, end
+
+    def complete(self, start: int, end: int, records: List[Record]):
+        if len(records) >= self.cap:
+            if end > start:
+                middle = (start + end) // 2
+                heapq.heappush(self._splits, (start, middle))
+                heapq.heappush(self._splits, (middle + 1, end))
+                self._resize((end - start + 1) // 2)
+                return
+            warn(
+                f"block {start} holds {self.cap} or more records, the result may be truncated"
+            )
+        elif len(records) >= self.shrink_ratio * self.cap:
+            self._resize(self.shard_size // 2)
+        elif len(records) <= self.grow_ratio * self.cap:
+            self._resize(self.shard_size * 2)
+        self._done[start] = (end, records)
+
+    def drain(self) -> List[Record]:
+        """
+        Pops the records of all completed shards that directly follow the ones already drained.
+        """
+        records: List[Record] = []
+        while self._next in self._done:
+            end, shard = self._done.pop(self._next)
+            records.extend(shard)
+            self._next = end + 1
+        return records
+
+    def _resize(self, shard_size: int):
+        self.shard_size = max(self.min_shard_size, min(self.max_shard_size, shard_size))
+
+
+def backfill(
+    fetch: Callable[[int, int], Any], planner: ShardPlanner, workers: int = 4
+) -> Iterator[Record]:
+    """
+    Fetches the shards of a planner on a thread pool and yields their records in block order,
+    `fetch(start_block, end_block)` performs one call and returns the api response.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    running: Dict[Any, Tuple[int, int]] = {}
+    try:
+        while True:
+            while len(running) < workers:
+                shard = planner.next_shard()
+                if shard is None:
+                    break
+                running[executor.submit(fetch, *shard)] = shard
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, end = running.pop(future)
+                planner.complete(start, end, result_records(future.result()))
+            yield from planner.drain()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def abackfill(
+    fetch: Callable[[int, int], Awaitable[dict]],
+    planner: ShardPlanner,
+    workers: int = 4,
+) -> AsyncIterator[Record]:
+    """
+    Asynchronous counterpart of `backfill`, running up to `workers` shards as concurrent tasks.
+    """
+    running: Dict[Any, Tuple[int, int]] = {}
+    try:
+        while True:
+            while len(running) < workers:
+                shard = planner.next_shard()
+                if shard is None:
+                    break
+                running[asyncio.ensure_future(fetch(*shard))] = shard
+            if not running:
+                break
+            finished, _ = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in finished:
+                start, end = running.pop(task)
+                planner.complete(start, end, result_records(task.result()))
+            for record in planner.drain():
+                yield record
+    finally:
+        for task in running:
+            task.cancel()
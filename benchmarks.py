@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+from .api import Connector
+from .concurrency import amap_ordered
+from .mock_server import fake_address
+from .mock_server import MockChain
+from .mock_server import MockEtherscan
+
+Result = Dict[str, Union[str, float, int]]
+# (result key, True when larger is better) of the figures compared against a baseline
+COMPARED = (("calls_per_second", True), ("p99_ms", False), ("peak_memory_kb", False))
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile, q in [0, 100].
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(-(-q * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+def timed(call: Callable[[], Any], latencies: List[float]) -> Callable[[], Any]:
+    def run():
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    return run
+
+
+def run_calls(calls: Sequence[Callable[[], Any]], workers: int) -> List[float]:
+    """
+    Performs the calls, sequentially or on a pool of `workers` threads, and returns the latency of each.
+    """
+    latencies: List[float] = []
+    if workers <= 1:
+        for call in calls:
+            timed(call, latencies)()
+        return latencies
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(timed(call, latencies)) for call in calls]:
+            future.result()
+    return latencies
+
+
+def peak_memory(run: Callable[[], Any]) -> int:
+    """
+    Peak bytes allocated by Python while running, measured with tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(
+    name: str, latencies: List[float], elapsed: float, workers: int
+) -> Result:
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "workers": workers,
+        "seconds": round(elapsed, 4),
+        "calls_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def measure(
+    name: str,
+    make_calls: Callable[[], Sequence[Callable[[], Any]]],
+    workers: int = 1,
+    memory: bool = True,
+    records: Optional[Callable[[], int]] = None,
+) -> Result:
+    """
+    Benchmarks a scenario: throughput and latency percentiles of one timed run, then peak memory of a second run
+    under tracemalloc (which slows allocation down, so it never overlaps the timed run). `records` optionally counts
+    the records the last run produced.
+    """
+    calls = make_calls()
+    started = time.perf_counter()
+    latencies = run_calls(calls, workers)
+    elapsed = time.perf_counter() - started
+    result = summarize(name, latencies, elapsed, workers)
+    if records is not None:
+        result["records_per_second"] = round(records() / elapsed, 2) if elapsed else 0.0
+    if memory:
+        calls = make_calls()
+        result["peak_memory_kb"] = round(
+            peak_memory(lambda: run_calls(calls, workers)) / 1024, 1
+        )
+    return result
+
+
+def measure_async(
+    name: str,
+    server: MockEtherscan,
+    addresses: Sequence[str],
+    workers: int = 16,
+    memory: bool = True,
+) -> Result:
+    """
+    Benchmarks balance calls on an AsyncConnector, at most `workers` in flight on one event loop, see measure.
+    Requires aiohttp.
+    """
+    from .async_api import AsyncConnector
+
+    async def gather(latencies: List[float]):
+        async with AsyncConnector(
+            "bench",
+            server.url,
+            pool_size=workers,
+            calls_per_second=None,
+            daily_quota=None,
+        ) as connector:
+
+            async def one(address: str):
+                started = time.perf_counter()
+                await connector.accounts.balance(address)
+                latencies.append(time.perf_counter() - started)
+
+            await amap_ordered(one, addresses, workers)
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    asyncio.run(gather(latencies))
+    result = summarize(name, latencies, time.perf_counter() - started, workers)
+    if memory:
+        result["peak_memory_kb"] = round(
+            peak_memory(lambda: asyncio.run(gather([]))) / 1024, 1
+        )
+    return result
+
+
+def run_suite(
+    calls: int = 1000,
+    workers: int = 16,
+    latency: float = 0.0,
+    records: int = 20000,
+    memory: bool = True,
+    server: Optional[MockEtherscan] = None,
+) -> List[Result]:
+    """
+    Runs every scenario against a local MockEtherscan (spawned here unless one is given) and returns their results:
+    sequential and threaded calls on the shared sync transport, asyncio calls when aiohttp is installed, and a full
+    paginated walk of an address's `records` transactions, buffered and streamed.
+    """
+    owned = server is None
+    if server is None:
+        server = MockEtherscan(
+            MockChain(records_per_address=records), latency=latency
+        ).spawn()
+    connector = Connector(
+        "bench", server.url, pool_size=workers, calls_per_second=None, daily_quota=None
+    )
+    addresses = [fake_address("bench", i) for i in range(calls)]
+    balance = connector.accounts.balance
+
+    def balance_calls() -> List[Callable[[], Any]]:
+        def call(address: str) -> Callable[[], Any]:
+            return lambda: balance(address)
+
+        return [call(address) for address in addresses]
+
+    results = []
+    try:
+        results.append(measure("sync", balance_calls, 1, memory))
+        results.append(measure("threaded", balance_calls, workers, memory))
+        try:
+            results.append(measure_async("asyncio", server, addresses, workers, memory))
+        except ImportError:
+            pass
+        for stream in (False, True):
+            counted: List[int] = []
+
+            def walk(stream: bool = stream, counted: List[int] = counted) -> None:
+                counted.append(
+                    sum(
+                        1
+                        for _ in connector.accounts.iter_txlist(
+                            "0xbench", offset=1000, stream=stream
+                        )
+                    )
+                )
+
+            def walk_calls(walk: Callable[[], None] = walk) -> List[Callable[[], Any]]:
+                return [walk]
+
+            def count(counted: List[int] = counted) -> int:
+                return counted[0]
+
+            results.append(
+                measure(
+                    "paginate_stream" if stream else "paginate",
+                    walk_calls,
+                    1,
+                    memory,
+                    records=count,
+                )
+            )
+    finally:
+        connector.close()
+        if owned:
+            server.stop()
+    return results
+
+
+def compare(
+    results: List[Result], baseline: List[Result], tolerance: float = 0.2
+) -> List[str]:
+    """
+    Returns a description of every figure that regressed by more than `tolerance` relative to the baseline results.
+    """
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["name"])
+        if base is None:
+            continue
+        for figure, higher_is_better in COMPARED:
+            if figure not in result or not base.get(figure):
+                continue
+            ratio = float(result[figure]) / float(base[figure])
+            if (ratio < 1 - tolerance) if higher_is_better else (ratio > 1 + tolerance):
+                regressions.append(
+                    f"{result['name']}: {figure} {base[figure]} -> {result[figure]}"
+                )
+    return regressions
+
+
+def format_results(results: List[Result]) -> str:
+    columns = [
+        "name",
+        "calls",
+        "workers",
+        "calls_per_second",
+        "p50_ms",
+        "p99_ms",
+        "peak_memory_kb",
+    ]
+    rows = [columns] + [
+        [str(result.get(column, "")) for column in columns] for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point, `python -m pyetherscan.benchmarks --help`. Exits with 1 when a baseline is given and
+    any figure regressed beyond the tolerance.
+    """
+    parser = argparse.ArgumentParser(
+        description="pyetherscan client benchmarks against a local mock api"
+    )
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="mock server latency per call, in seconds",
+    )
+    parser.add_argument(
+        "--records",
+        type=int,
+        default=20000,
+        help="transactions walked by the pagination scenarios",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc runs"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument(
+        "--baseline", help="results file of a previous run to compare against"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.calls, args.workers, args.latency, args.records, not args.no_memory
+    )
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import sqlite3
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .blocks import Blocks
+from .exceptions import EtherscanError
+from .proxy import Proxy
+
+SETTLE_SECONDS = 900.0
+
+Point = Tuple[int, int]
+
+
+def _point(timestamp: int, closest: str) -> int:
+    """
+    Timestamp at which the step function gives the answer: the first block at or after t follows the last block at or
+    before t - 1, block timestamps strictly increase.
+    """
+    return timestamp if closest == "before" else timestamp - 1
+
+
+class BlockTimeIndex(object):
+    """
+    Persistent timestamp -> block number index answering getblocknobytime queries locally where it can.
+
+    The index stores points of the step function "last block mined at or before t", learned from getblocknobytime
+    answers and from block timestamps (fetched here or fed with `record_blocks`). A timestamp between two known points
+    of the same block is answered without any call, any other costs one getblocknobytime call whose answer is stored.
+    Only points at least `settle` seconds old are stored, recent blocks may still be reorganised.
+
+    `blocks_at` resolves many timestamps at once: they are searched median first, a binary search over the sorted
+    timestamps where every answer brackets the remaining ones. Where the timestamps left in a bracket outnumber the
+    calls needed to fetch every block of its range, interpolated from the known points around it, those blocks are
+    fetched with Proxy.get_blocks instead (batched over JSON-RPC when the proxy has an rpc_endpoint).
+
+    The index belongs to one chain, use one file per endpoint. Requires the synchronous Connector's modules:
+
+        index = BlockTimeIndex(etherscan.blocks, etherscan.proxy)
+        start_block, end_block = index.block_range(start_time, end_time)
+    """
+
+    def __init__(
+        self,
+        blocks: Blocks,
+        proxy: Proxy,
+        path: str = "pyetherscan_blocks.sqlite",
+        settle: float = SETTLE_SECONDS,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.blocks = blocks
+        self.proxy = proxy
+        self.settle = settle
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS points "
+                "(timestamp INTEGER PRIMARY KEY, number INTEGER NOT NULL)"
+            )
+        self.lookups = 0
+        self.local = 0
+        self.calls = 0
+
+    def block_at(self, timestamp: int, closest: str = "before") -> int:
+        """
+        Returns the last block mined at or before the timestamp ("before") or the first one mined at or after it
+        ("after"), like Blocks.getblocknobytime.
+        """
+        with self._lock:
+            self.lookups += 1
+        number = self._known(_point(timestamp, closest))
+        if number is None:
+            return self._ask(timestamp, closest)
+        with self._lock:
+            self.local += 1
+        return number if closest == "before" else number + 1
+
+    def blocks_at(
+        self, timestamps: Iterable[int], closest: str = "before"
+    ) -> List[int]:
+        """
+        Bulk block_at, in order, see the class documentation.
+        """
+        timestamps = list(timestamps)
+        found: Dict[int, int] = {}
+        stack = [
+            (sorted({_point(timestamp, closest) for timestamp in timestamps}), True)
+        ]
+        while stack:
+            points, may_fetch = stack.pop()
+            points = self._unknown(points, found)
+            if points and may_fetch and self._fetch_range(points):
+                points, may_fetch = self._unknown(points, found), False
+            if not points:
+                continue
+            middle = len(points) // 2
+            timestamp = points[middle] + (0 if closest == "before" else 1)
+            number = self._ask(timestamp, closest)
+            found[points[middle]] = number if closest == "before" else number - 1
+            stack.extend(
+                [(points[:middle], may_fetch), (points[middle + 1 :], may_fetch)]
+            )
+        with self._lock:
+            self.lookups += len(found)
+        offset = 0 if closest == "before" else 1
+        return [found[_point(timestamp, closest)] + offset for timestamp in timestamps]
+
+    def block_range(self, start_time: int, end_time: int) -> Tuple[int, int]:
+        """
+        Translates a time window into the (start_block, end_block) range of the blocks mined within it.
+        """
+        return self.block_at(start_time, "after"), self.block_at(end_time, "before")
+
+    def record_blocks(self, blocks: Iterable[Optional[dict]]) -> int:
+        """
+        Learns the timestamps of blocks (eth_getBlockByNumber results or responses, e.g. from Proxy.get_blocks),
+        returns how many were recorded.
+        """
+        points: List[Point] = []
+        recorded = 0
+        for block in blocks:
+            if isinstance(block, dict) and "result" in block:
+                block = block["result"]
+            if not isinstance(block, dict) or "timestamp" not in block:
+                continue
+            number, timestamp = int(block["number"], 16), int(block["timestamp"], 16)
+            points.append((timestamp, number))
+            if number > 0:
+                points.append((timestamp - 1, number - 1))
+            recorded += 1
+        self._store(points)
+        return recorded
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (points,) = self._connection.execute(
+                "SELECT COUNT(*) FROM points"
+            ).fetchone()
+        return {
+            "points": points,
+            "lookups": self.lookups,
+            "local": self.local,
+            "calls": self.calls,
+        }
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM points")
+
+    def close(self):
+        self._connection.close()
+
+    def _bracket(self, timestamp: int) -> Tuple[Optional[Point], Optional[Point]]:
+        with self._lock:
+            lower = self._connection.execute(
+                "SELECT timestamp, number FROM points WHERE timestamp <= ? ORDER BY timestamp DESC LIMIT 1",
+                (timestamp,),
+            ).fetchone()
+            upper = self._connection.execute(
+                "SELECT timestamp, number FROM points WHERE timestamp >= ? ORDER BY timestamp LIMIT 1",
+                (timestamp,),
+            ).fetchone()
+        return lower, upper
+
+    def _known(self, timestamp: int) -> Optional[int]:
+        lower, upper = self._bracket(timestamp)
+        if lower is not None and lower[0] == timestamp:
+            return lower[1]
+        if upper is not None and upper[0] == timestamp:
+            return upper[1]
+        if lower is not None and upper is not None and lower[1] == upper[1]:
+            return lower[1]
+        return None
+
+    def _unknown(self, points: List[int], found: Dict[int, int]) -> List[int]:
+        """
+        Resolves the points known locally into `found`, returns the others.
+        """
+        unknown = []
+        for point in points:
+            number = self._known(point)
+            if number is None:
+                unknown.append(point)
+            else:
+                found[point] = number
+                with self._lock:
+                    self.local += 1
+        return unknown
+
+    def _fetch_range(self, points: List[int]) -> bool:
+        """
+        Fetches every block of the range the points fall in when that takes fewer calls than asking for each point.
+        """
+        (lower, _), (_, upper) = self._bracket(points[0]), self._bracket(points[-1])
+        if lower is None or upper is None or upper[0] == lower[0]:
+            return False
+        (low_time, low), (high_time, high) = lower, upper
+        rate = (high - low) / (high_time - low_time)
+        pad = 2 + (points[-1] - points[0]) * rate // 100
+        # f(t) is within [low, high], knowing it takes the timestamps of f(t) and f(t) + 1
+        first = max(low + 1, int(low + (points[0] - low_time) * rate - pad))
+        last = min(high, int(low + (points[-1] - low_time) * rate + pad) + 1)
+        batch_size = self.proxy.rpc_batch_size if self.proxy.rpc_endpoint else 1
+        calls = -(-(last - first + 1) // batch_size)
+        if last < first or calls >= len(points):
+            return False
+        self.record_blocks(self.proxy.get_blocks(range(first, last + 1), False))
+        with self._lock:
+            self.calls += calls
+        return True
+
+    def _ask(self, timestamp: int, closest: str) -> int:
+        response = self.blocks.getblocknobytime(timestamp, closest)
+        with self._lock:
+            self.calls += 1
+        if response.get("status") != "1":
+            raise EtherscanError(f"{response.get('message')}: {response.get('result')}")
+        number = int(response["result"])  # type: ignore[arg-type]
+        if closest == "before":
+            self._store([(timestamp, number)])
+        else:
+            self._store([(timestamp - 1, number - 1)])
+        return number
+
+    def _store(self, points: Sequence[Point]):
+        settled = self._wall_clock() - self.settle
+        rows = [
+            (timestamp, number)
+            for timestamp, number in points
+            if timestamp <= settled and number >= 0
+        ]
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO points (timestamp, number) VALUES (?, ?)", rows
+            )
@@ -0,0 +1,407 @@
+import asyncio
+import copy
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Optional
+from typing import Tuple
+
+from .utils import to_int
+
+Action = Tuple[str, str]
+
+IMMUTABLE_ACTIONS: FrozenSet[Action] = frozenset(
+    {
+        ("proxy", "eth_getBlockByNumber"),
+        ("proxy", "eth_getTransactionByHash"),
+        ("proxy", "eth_getTransactionReceipt"),
+        ("block", "getblockreward"),
+        ("contract", "getabi"),
+        ("contract", "getsourcecode"),
+        ("transaction", "gettxreceiptstatus"),
+    }
+)
+DEFAULT_TTLS: Dict[Action, float] = {
+    ("gastracker", "gasoracle"): 15.0,
+    ("stats", "ethprice"): 60.0,
+}
+HOT_TTLS: Dict[Action, float] = {
+    **DEFAULT_TTLS,
+    ("proxy", "eth_blockNumber"): 2.0,
+}
+# responses tied to a block, only final once the block is `confirmations` deep
+BLOCK_ACTIONS: FrozenSet[Action] = frozenset(
+    {
+        ("proxy", "eth_getBlockByNumber"),
+        ("proxy", "eth_getTransactionByHash"),
+        ("proxy", "eth_getTransactionReceipt"),
+        ("block", "getblockreward"),
+    }
+)
+HEAD_ACTION: Action = ("proxy", "eth_blockNumber")
+MOVING_TAGS = frozenset({"latest", "pending", "earliest", "safe", "finalized"})
+UNKEYED_PARAMS = frozenset({"apikey"})
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """
+    Key of a request, independent of the api key used to make it.
+    """
+    return json.dumps(
+        [endpoint, {k: v for k, v in params.items() if k not in UNKEYED_PARAMS}],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def block_number(result: Any) -> Optional[int]:
+    """
+    Number of the block a block, transaction, receipt or block reward result belongs to, None while pending.
+    """
+    if not isinstance(result, dict):
+        return None
+    number = result.get("blockNumber", result.get("number"))
+    return to_int(number) if number not in (None, "") else None
+
+
+def is_success(response: dict) -> bool:
+    """
+    True for a successful api ({"status": "1"}) or proxy ({"result": ...} without "error") response.
+    """
+    if "status" in response:
+        return response["status"] == "1"
+    return response.get("result") is not None and "error" not in response
+
+
+class CachePolicy(object):
+    """
+    Declares which (module, action) pairs may be cached and for how long.
+
+    Immutable actions never expire, but only when the request is pinned to a block number (a block tag such as
+    "latest" keeps them uncached) and the response is final. Blocks, transactions, receipts and block rewards are
+    final once their block is `confirmations` blocks below the head, or for blocks and rewards once their timestamp
+    is `finality_seconds` old. The head is learnt from the eth_blockNumber responses and blocks passing through the
+    cache, until one was seen only old enough timestamps count. Pending or empty results (a receipt status of "", an
+    unverified contract's source) are never final. Actions listed in `ttls` expire after the given number of
+    seconds, everything else is never cached.
+    """
+
+    def __init__(
+        self,
+        immutable: FrozenSet[Action] = IMMUTABLE_ACTIONS,
+        ttls: Optional[Dict[Action, float]] = None,
+        confirmations: int = 64,
+        finality_seconds: float = 900.0,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.immutable = frozenset(immutable)
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.confirmations = confirmations
+        self.finality_seconds = finality_seconds
+        self.head: Optional[int] = None
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+
+    def ttl(self, params: dict, response: Optional[dict] = None) -> Optional[float]:
+        """
+        Returns how long a response may be cached, math.inf for immutable data and None when it may not be cached.
+        Without a response only the request is judged, as for a lookup.
+        """
+        module, name = params.get("module"), params.get("action")
+        if module is None or name is None:
+            return None
+        action: Action = (module, name)
+        if action in self.immutable and params.get("tag") not in MOVING_TAGS:
+            if response is not None and not self.is_final(action, response):
+                return None
+            return math.inf
+        return self.ttls.get(action)
+
+    def is_final(self, action: Action, response: dict) -> bool:
+        result = response.get("result")
+        if action == ("transaction", "gettxreceiptstatus"):
+            return isinstance(result, dict) and result.get("status") not in (None, "")
+        if action == ("contract", "getsourcecode"):
+            return isinstance(result, list) and all(
+                isinstance(item, dict) and item.get("SourceCode") for item in result
+            )
+        if action not in BLOCK_ACTIONS:
+            return True
+        number = block_number(result)
+        if number is None:
+            return False
+        if self.head is not None and number + self.confirmations <= self.head:
+            return True
+        timestamp = result.get("timestamp", result.get("timeStamp"))  # type: ignore[union-attr]
+        return (
+            action in (("proxy", "eth_getBlockByNumber"), ("block", "getblockreward"))
+            and timestamp not in (None, "")
+            and to_int(timestamp) <= self._wall_clock() - self.finality_seconds
+        )
+
+    def observe(self, params: dict, response: Any):
+        """
+        Raises the known head to the block number of an eth_blockNumber response or a block related result.
+        """
+        action = (params.get("module"), params.get("action"))
+        if not isinstance(response, dict):
+            return
+        result = response.get("result")
+        if action == HEAD_ACTION:
+            number = to_int(result) if isinstance(result, str) and result else None
+        elif action in BLOCK_ACTIONS:
+            number = block_number(result)
+        else:
+            return
+        if number is not None:
+            self.observe_head(number)
+
+    def observe_head(self, number: int):
+        with self._lock:
+            if self.head is None or number > self.head:
+                self.head = number
+
+
+class ResponseCache(object):
+    """
+    Persistent response cache backed by a local SQLite database, shared by all wrappers through the transport.
+
+    Only successful, final responses of actions allowed by the policy are stored, see CachePolicy. The highest head
+    the policy learnt is stored as well and restored on open. Safe to share between threads, and between processes
+    pointing at the same file.
+    """
+
+    def __init__(
+        self,
+        path: str = "pyetherscan_cache.sqlite",
+        policy: Optional[CachePolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.policy = policy if policy is not None else CachePolicy()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires REAL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS head (id INTEGER PRIMARY KEY CHECK (id = 0), number INTEGER NOT NULL)"
+            )
+            row = self._connection.execute("SELECT number FROM head").fetchone()
+        self._head = None if row is None else row[0]
+        if self._head is not None:
+            self.policy.observe_head(self._head)
+
+    def get(self, endpoint: str, params: dict) -> Optional[dict]:
+        if self.policy.ttl(params) is None:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, expires FROM responses WHERE key = ?",
+                (cache_key(endpoint, params),),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= self._clock()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, params: dict, response: dict):
+        self.policy.observe(params, response)
+        head = self.policy.head
+        if head is not None and head != self._head:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT INTO head (id, number) VALUES (0, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET number = MAX(number, excluded.number)",
+                    (head,),
+                )
+            self._head = head
+        if not is_success(response):
+            return
+        ttl = self.policy.ttl(params, response)
+        if ttl is None:
+            return
+        expires = None if math.isinf(ttl) else self._clock() + ttl
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires) VALUES (?, ?, ?)",
+                (cache_key(endpoint, params), json.dumps(response), expires),
+            )
+
+    def purge(self):
+        """
+        Deletes expired responses.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM responses WHERE expires <= ?", (self._clock(),)
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        self._connection.close()
+
+
+class _Flight(object):
+    __slots__ = ("event", "response", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+
+
+class MemoryCache(object):
+    """
+    In-process LRU cache with per action TTLs and single-flight request coalescing.
+
+    At most `max_entries` responses are kept, the least recently used being evicted first. Concurrent identical
+    requests that miss share one in-flight call: the first caller loads, the others wait for its response. Callers
+    always receive their own copy of a response.
+
+    `hits`, `misses` and `coalesced` count lookups answered from memory, lookups that loaded, and lookups that waited
+    on another caller's load, see `stats`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        policy: Optional[CachePolicy] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.policy = policy if policy is not None else CachePolicy(ttls=HOT_TTLS)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, "asyncio.Future[dict]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(
+        self, endpoint: str, params: dict, load: Callable[[], dict]
+    ) -> dict:
+        if self.policy.ttl(params) is None:
+            return self._observed(params, load())
+        key = cache_key(endpoint, params)
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                return copy.deepcopy(response)
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.response)  # type: ignore[arg-type]
+        try:
+            flight.response = self._observed(params, load())
+            return copy.deepcopy(flight.response)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.response is not None:
+                    self._store(key, params, flight.response)
+            flight.event.set()
+
+    async def aget_or_load(
+        self, endpoint: str, params: dict, load: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """
+        Asynchronous counterpart of `get_or_load`, coalescing coroutines of the same event loop.
+        """
+        if self.policy.ttl(params) is None:
+            return self._observed(params, await load())
+        key = cache_key(endpoint, params)
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                return copy.deepcopy(response)
+            waiting = self._async_flights.get(key)
+            if waiting is None:
+                future = asyncio.get_running_loop().create_future()
+                self._async_flights[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if waiting is not None:
+            return copy.deepcopy(await asyncio.shield(waiting))
+        try:
+            response = self._observed(params, await load())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()  # retrieved here, waiters (if any) re-raise it
+            raise
+        else:
+            future.set_result(response)
+            with self._lock:
+                self._store(key, params, response)
+            return copy.deepcopy(response)
+        finally:
+            with self._lock:
+                del self._async_flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _observed(self, params: dict, response: dict) -> dict:
+        self.policy.observe(params, response)
+        return response
+
+    def _store(self, key: str, params: dict, response: dict):
+        if not is_success(response):
+            return
+        ttl = self.policy.ttl(params, response)
+        if ttl is None:
+            return
+        self._entries[key] = (self._clock() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,182 @@
+from array import array
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from .utils import to_int
+
+INT64 = "int64"
+UINT256 = "uint256"
+STR = "str"
+ADDRESS = "bytes20"
+HASH = "bytes32"
+
+UINT64_MASK = (1 << 64) - 1
+
+Key = Union[str, Tuple[str, int]]
+Schema = Dict[str, Tuple[Key, str]]
+
+TRANSACTION_COLUMNS: Schema = {
+    "block_number": ("blockNumber", INT64),
+    "timestamp": ("timeStamp", INT64),
+    "transaction_index": ("transactionIndex", INT64),
+    "hash": ("hash", HASH),
+    "from_address": ("from", ADDRESS),
+    "to_address": ("to", ADDRESS),
+    "value": ("value", UINT256),
+    "gas": ("gas", INT64),
+    "gas_price": ("gasPrice", INT64),
+    "gas_used": ("gasUsed", INT64),
+    "is_error": ("isError", INT64),
+}
+TOKEN_TRANSFER_COLUMNS: Schema = {
+    "block_number": ("blockNumber", INT64),
+    "timestamp": ("timeStamp", INT64),
+    "transaction_index": ("transactionIndex", INT64),
+    "hash": ("hash", HASH),
+    "contract_address": ("contractAddress", ADDRESS),
+    "from_address": ("from", ADDRESS),
+    "to_address": ("to", ADDRESS),
+    "value": ("value", UINT256),
+    "token_decimal": ("tokenDecimal", INT64),
+}
+LOG_COLUMNS: Schema = {
+    "block_number": ("blockNumber", INT64),
+    "timestamp": ("timeStamp", INT64),
+    "log_index": ("logIndex", INT64),
+    "transaction_hash": ("transactionHash", HASH),
+    "address": ("address", ADDRESS),
+    "topic0": (("topics", 0), HASH),
+    "topic1": (("topics", 1), HASH),
+    "topic2": (("topics", 2), HASH),
+    "topic3": (("topics", 3), HASH),
+    "data": ("data", STR),
+}
+
+
+def _lookup(record: Dict[str, Any], key: Key) -> Any:
+    if isinstance(key, tuple):
+        values = record.get(key[0]) or ()
+        return values[key[1]] if key[1] < len(values) else None
+    return record.get(key)
+
+
+def _column(kind: str) -> Tuple[Any, Callable[[Any], None]]:
+    """
+    Creates the storage of a column kind and the function appending one raw api value to it.
+    """
+    if kind == INT64:
+        ints = array("q")
+        return ints, lambda value: ints.append(
+            to_int(value) if value not in (None, "") else 0
+        )
+    if kind == UINT256:
+        limbs = array("Q")
+
+        def push_uint256(value):
+            number = to_int(value) if value not in (None, "") else 0
+            limbs.extend(
+                (
+                    number & UINT64_MASK,
+                    (number >> 64) & UINT64_MASK,
+                    (number >> 128) & UINT64_MASK,
+                    number >> 192,
+                )
+            )
+
+        return limbs, push_uint256
+    if kind == STR:
+        strings: List[Any] = []
+        return strings, strings.append
+    if kind.startswith("bytes"):
+        width = int(kind[5:])
+        buffer = bytearray()
+        padding = bytes(width)
+
+        def push_bytes(value):
+            if value:
+                raw = bytes.fromhex(value[2:])
+                buffer.extend(padding[len(raw) :])
+                buffer.extend(raw)
+            else:
+                buffer.extend(padding)
+
+        return buffer, push_bytes
+    raise ValueError(f"unknown column kind {kind}")
+
+
+class ColumnBuilder(object):
+    """
+    Builds typed columns directly from api records, one page at a time, without an intermediate list of dicts.
+
+    Column kinds are "int64" (block numbers, timestamps, gas, ...), "bytesN" (addresses and hashes as fixed width
+    big-endian bytes), "uint256" (wei amounts as four little-endian uint64 limbs) and "str". Integer columns accept
+    decimal and hex strings, missing values become 0 (or zero bytes).
+
+    Columns live in stdlib arrays and bytearrays, `to_numpy` exposes them as NumPy arrays without copying (the
+    builder can therefore not be extended while those arrays are alive).
+    """
+
+    def __init__(self, schema: Schema = TRANSACTION_COLUMNS):
+        self.schema = schema
+        self._columns: Dict[str, Any] = {}
+        self._pushers: List[Tuple[Key, Callable[[Any], None]]] = []
+        for name, (key, kind) in schema.items():
+            column, push = _column(kind)
+            self._columns[name] = column
+            self._pushers.append((key, push))
+        self.rows = 0
+
+    def append(self, record: Dict[str, Any]):
+        for key, push in self._pushers:
+            push(_lookup(record, key))
+        self.rows += 1
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> "ColumnBuilder":
+        for record in records:
+            self.append(record)
+        return self
+
+    def column(self, name: str) -> Union[List[Any], array, bytearray]:
+        """
+        Returns the raw storage of a column.
+        """
+        return self._columns[name]
+
+    def uint256(self, name: str) -> List[int]:
+        """
+        Reassembles a uint256 column into exact Python ints.
+        """
+        limbs = self._columns[name]
+        return [
+            limbs[i] | limbs[i + 1] << 64 | limbs[i + 2] << 128 | limbs[i + 3] << 192
+            for i in range(0, len(limbs), 4)
+        ]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Returns the columns as NumPy arrays: int64, uint64 of shape (rows, 4) for uint256, "S{width}" for bytes
+        and object for str columns. Requires numpy.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError(
+                "ColumnBuilder.to_numpy requires numpy, install it with `pip install numpy`"
+            )
+        arrays = {}
+        for name, (_, kind) in self.schema.items():
+            column = self._columns[name]
+            if kind == INT64:
+                arrays[name] = np.frombuffer(column, dtype=np.int64)
+            elif kind == UINT256:
+                arrays[name] = np.frombuffer(column, dtype=np.uint64).reshape(-1, 4)
+            elif kind == STR:
+                arrays[name] = np.array(column, dtype=object)
+            else:
+                arrays[name] = np.frombuffer(column, dtype=f"S{kind[5:]}")
+        return arrays
@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+ErrorHandler = Callable[[int, Exception], Any]
+
+
+def map_ordered(
+    func: Callable[[T], Any],
+    items: Iterable[T],
+    workers: int = 8,
+    on_error: Optional[ErrorHandler] = None,
+) -> List[Any]:
+    """
+    Applies `func` to every item on a thread pool and returns the results in input order.
+
+    Without `on_error` the first failure is raised, otherwise `on_error(index, error)` takes the place of the
+    failed result.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+        results = []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as error:
+                if on_error is None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append(on_error(index, error))
+        return results
+
+
+async def amap_ordered(
+    func: Callable[[T], Awaitable[Any]],
+    items: Iterable[T],
+    workers: int = 8,
+    on_error: Optional[ErrorHandler] = None,
+) -> List[Any]:
+    """
+    Asynchronous counterpart of `map_ordered`, running at most `workers` coroutines at a time.
+    """
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(item: T) -> Any:
+        async with semaphore:
+            return await func(item)
+
+    results = await asyncio.gather(
+        *[run(item) for item in items], return_exceptions=on_error is not None
+    )
+    if on_error is None:
+        return list(results)
+    return [
+        on_error(index, result) if isinstance(result, Exception) else result
+        for index, result in enumerate(results)
+    ]
+
+
+def chunked(items: List[T], size: int) -> List[List[T]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
@@ -1,9 +1,11 @@
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Union
 from warnings import warn
 
-import requests
+from .transport import BaseTransport
+from .transport import Transport
 
 
 class Contracts(object):
@@ -13,17 +15,20 @@ class Contracts(object):
     Find verified contracts on etherscan Verified Contracts Source Code page: https://etherscan.io/contractsVerified
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self, key: str, endpoint: str, transport: Optional[BaseTransport] = None
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "contract"}
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
 
     def _post_request(
         self, data: dict, params: dict = None
     ) -> Dict[str, Union[str, float, int]]:
-        return requests.post(self.endpoint, data=data, params=params).json()
+        return self.transport.post(self.endpoint, data, params)
 
     def getabi(self, address: str) -> Dict[str, Union[str, float, int]]:  # noqa
         """
@@ -0,0 +1,224 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Counter
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .accounts import Accounts
+from .proxy import Proxy
+from .transactions import Transactions
+
+TRANSACTION = "transaction"
+RECEIPT = "receipt"
+STATUS = "status"
+INTERNAL = "internal"
+
+
+def merge_lookups(txhash: str, lookups: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merges the responses of the lookups of a transaction into one record: the transaction fields, overlaid with the
+    receipt fields, plus `internalTransactions` and `errors` ({lookup: message} of the lookups that failed).
+    """
+    record: Dict[str, Any] = {"hash": txhash}
+    errors: Dict[str, str] = {}
+    for lookup in (TRANSACTION, RECEIPT):
+        if lookup not in lookups:
+            continue
+        result = _result(lookups[lookup], lookup, errors)
+        if isinstance(result, dict):
+            record.update(result)
+    if STATUS in lookups:
+        result = _result(lookups[STATUS], STATUS, errors)
+        if isinstance(result, dict) and result.get("status"):
+            record["status"] = hex(int(result["status"]))
+    if INTERNAL in lookups:
+        response = lookups[INTERNAL]
+        if isinstance(response, dict) and isinstance(response.get("result"), list):
+            record["internalTransactions"] = response["result"]
+        else:
+            _result(response, INTERNAL, errors)
+            record["internalTransactions"] = None
+    record.pop("transactionHash", None)
+    record["errors"] = errors
+    return record
+
+
+def _result(response: Any, lookup: str, errors: Dict[str, str]) -> Any:
+    if isinstance(response, Exception):
+        errors[lookup] = f"{type(response).__name__}: {response}"
+        return None
+    result = response.get("result")
+    if "error" in response or response.get("status") == "0" or result is None:
+        error = response.get("error")
+        errors[lookup] = str(
+            error.get("message")
+            if isinstance(error, dict)
+            else error or result or "not found"
+        )
+        return None
+    return result
+
+
+def _done(futures: Dict[str, Any]) -> bool:
+    return all(future.done() for future in futures.values())
+
+
+def _dereference(txhash: str, pending: Dict[str, Any], references: Counter[str]):
+    references[txhash] -= 1
+    if not references[txhash]:
+        del references[txhash], pending[txhash]
+
+
+class Enricher(object):
+    """
+    Builds full transaction records from a stream of hashes, looking each one up in several endpoints concurrently.
+
+    Every hash is looked up with eth_getTransactionByHash, eth_getTransactionReceipt and txlistinternal (by txhash),
+    all at the same time, and the responses are merged into one record, see merge_lookups. gettxreceiptstatus only
+    runs when receipts are not looked up, the receipt holds the same status. At most `max_in_flight` distinct hashes
+    are being looked up at a time, and records are yielded in input order as soon as their lookups and those of the
+    records before them completed. A hash repeated while its lookups are pending shares them.
+
+    A failed lookup does not stop the stream, its field is missing from the record and its error is listed under
+    `errors`:
+
+        enricher = Enricher(etherscan.proxy, etherscan.transactions, etherscan.accounts)
+        for record in enricher.enrich(txhashes):
+            ...
+    """
+
+    def __init__(
+        self,
+        proxy: Proxy,
+        transactions: Optional[Transactions] = None,
+        accounts: Optional[Accounts] = None,
+        receipts: bool = True,
+        internal: bool = True,
+        max_in_flight: int = 16,
+    ):
+        self.proxy = proxy
+        self.transactions = transactions
+        self.accounts = accounts
+        self.max_in_flight = max_in_flight
+        self.lookups: Dict[str, Callable[[str], Any]] = {
+            TRANSACTION: proxy.eth_getTransactionByHash
+        }
+        if receipts:
+            self.lookups[RECEIPT] = proxy.eth_getTransactionReceipt
+        elif transactions is not None:
+            self.lookups[STATUS] = transactions.gettxreceiptstatus
+        if internal and accounts is not None:
+            self.lookups[INTERNAL] = lambda txhash: accounts.txlistinternal(  # type: ignore[union-attr]
+                0, 0, txhash=txhash
+            )
+
+    def enrich(self, txhashes: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the enriched record of every hash, in order.
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight * len(self.lookups)
+        )
+        window: Deque[Tuple[str, Dict[str, Future]]] = deque()
+        pending: Dict[str, Dict[str, Future]] = {}
+        references: Counter[str] = Counter()
+        try:
+            for txhash in txhashes:
+                if txhash not in pending:
+                    while len(pending) >= self.max_in_flight:
+                        yield self._release(window, pending, references)
+                    pending[txhash] = {
+                        name: executor.submit(self._safe, lookup, txhash)
+                        for name, lookup in self.lookups.items()
+                    }
+                references[txhash] += 1
+                window.append((txhash, pending[txhash]))
+                while window and _done(window[0][1]):
+                    yield self._release(window, pending, references)
+            while window:
+                yield self._release(window, pending, references)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _release(
+        window: Deque[Tuple[str, Dict[str, Future]]],
+        pending: Dict[str, Dict[str, Future]],
+        references: Counter[str],
+    ) -> Dict[str, Any]:
+        """
+        Waits for the lookups of the oldest hash and returns its record, its lookups are forgotten once no later
+        occurrence in the window shares them.
+        """
+        txhash, futures = window.popleft()
+        record = merge_lookups(
+            txhash, {name: future.result() for name, future in futures.items()}
+        )
+        _dereference(txhash, pending, references)
+        return record
+
+    @staticmethod
+    def _safe(lookup: Callable[[str], Any], txhash: str) -> Any:
+        try:
+            return lookup(txhash)
+        except Exception as error:
+            return error
+
+
+class AsyncEnricher(Enricher):
+    """
+    Enricher for the AsyncConnector's modules, enrich is an async iterator.
+    """
+
+    async def enrich(self, txhashes: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:  # type: ignore[override]
+        window: Deque[Tuple[str, Dict[str, asyncio.Future]]] = deque()
+        pending: Dict[str, Dict[str, asyncio.Future]] = {}
+        references: Counter[str] = Counter()
+        try:
+            for txhash in txhashes:
+                if txhash not in pending:
+                    while len(pending) >= self.max_in_flight:
+                        yield await self._arelease(window, pending, references)
+                    pending[txhash] = {
+                        name: asyncio.ensure_future(self._asafe(lookup, txhash))
+                        for name, lookup in self.lookups.items()
+                    }
+                references[txhash] += 1
+                window.append((txhash, pending[txhash]))
+                await asyncio.sleep(0)  # lets the lookups progress between hashes
+                while window and _done(window[0][1]):
+                    yield await self._arelease(window, pending, references)
+            while window:
+                yield await self._arelease(window, pending, references)
+        finally:
+            for futures in pending.values():
+                for future in futures.values():
+                    future.cancel()
+
+    @staticmethod
+    async def _arelease(
+        window: Deque[Tuple[str, Dict[str, asyncio.Future]]],
+        pending: Dict[str, Dict[str, asyncio.Future]],
+        references: Counter[str],
+    ) -> Dict[str, Any]:
+        txhash, futures = window.popleft()
+        lookups: List[Any] = await asyncio.gather(*futures.values())
+        _dereference(txhash, pending, references)
+        return merge_lookups(txhash, dict(zip(futures, lookups)))
+
+    @staticmethod
+    async def _asafe(lookup: Callable[[str], Any], txhash: str) -> Any:
+        try:
+            return await lookup(txhash)
+        except Exception as error:
+            return error
@@ -0,0 +1,34 @@
+class EtherscanError(Exception):
+    """
+    Base class for errors raised by pyetherscan
+    """
+
+
+class DailyQuotaExceeded(EtherscanError):
+    """
+    Raised when a call would exceed the configured daily call quota of an api key
+    """
+
+
+class RetryError(EtherscanError):
+    """
+    Raised when a call still fails with a retryable api error (e.g. "Max rate limit reached") after all attempts,
+    the last response is kept as `response`
+    """
+
+    def __init__(self, message: str, response: dict):
+        super().__init__(message)
+        self.response = response
+
+
+class KeyRejected(EtherscanError):
+    """
+    Raised when the api rejected the key a call was made with (invalid key, daily limit), the key has been ejected
+    from its pool and the call may be retried with another one
+    """
+
+
+class KeyPoolExhausted(EtherscanError):
+    """
+    Raised when every key of a pool is currently ejected
+    """
@@ -0,0 +1,290 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .exceptions import EtherscanError
+from .proxy import Proxy
+
+NEW = "new"
+CONFIRMED = "confirmed"
+REORGED = "reorged"
+
+Anchor = Tuple[int, str]
+
+
+class ChainEvent(object):
+    """
+    A block that was mined (NEW), reached the confirmation depth (CONFIRMED) or was replaced by a reorg (REORGED),
+    `block` is its eth_getBlockByNumber result.
+    """
+
+    __slots__ = ("kind", "number", "hash", "block")
+
+    def __init__(self, kind: str, block: Dict[str, Any]):
+        self.kind = kind
+        self.number = int(block["number"], 16)
+        self.hash: str = block["hash"]
+        self.block = block
+
+    def __repr__(self):
+        return f"ChainEvent({self.kind!r}, {self.number}, {self.hash!r})"
+
+
+class ChainFollower(object):
+    """
+    Follows the head of the chain and reports new, confirmed and reorged blocks.
+
+    Every poll asks eth_blockNumber for the head, unless the follower is still behind it, and fetches the next missing
+    blocks, `batch_size` at a time, concurrently with Proxy.get_blocks (batched over JSON-RPC when the proxy has an
+    rpc_endpoint). A block whose parentHash does not match the previous block unwinds that block as REORGED and the
+    chain is fetched again from there. Blocks are CONFIRMED once `confirmations` blocks were mined on top of them, a
+    reorg reaching a confirmed block raises an EtherscanError.
+
+    Between polls `follow` sleeps for an adaptive interval: the block time estimated from the timestamps seen, less
+    the age of the newest block, growing by `backoff` after every poll that found nothing, within
+    [min_interval, max_interval]. It does not sleep while catching up.
+
+    With a `checkpoint` file the last confirmed block is stored (as `name`, one file may hold several followers) and a
+    restarted follower resumes after it, emitting the blocks above it as NEW again. A poll stores the progress of the
+    previous one, whose events count as handled once poll is called again.
+
+    Caches only keep blocks once they are final (see CachePolicy), a policy caching recent blocks would return a
+    reorged block unchanged:
+
+        for event in ChainFollower(etherscan.proxy).follow():
+            print(event.kind, event.number)
+    """
+
+    def __init__(
+        self,
+        proxy: Proxy,
+        start_block: Optional[int] = None,
+        confirmations: int = 12,
+        full_transactions: bool = False,
+        checkpoint: Optional[str] = None,
+        name: str = "default",
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        batch_size: int = 100,
+        workers: int = 8,
+        sleep: Callable[[float], Any] = time.sleep,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.proxy = proxy
+        self.confirmations = confirmations
+        self.full_transactions = full_transactions
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.workers = workers
+        self.interval = min_interval
+        self.block_time: Optional[float] = None
+        self.head: Optional[int] = None
+        self.next_block = start_block
+        self.anchor: Optional[Anchor] = None
+        self.unconfirmed: Deque[Dict[str, Any]] = deque()
+        self._sleep = sleep
+        self._wall_clock = wall_clock
+        self._dropped: Dict[int, str] = {}
+        self._newest_timestamp: Optional[int] = None
+        self._saved: Optional[Anchor] = None
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if checkpoint is not None:
+            self._connection = sqlite3.connect(checkpoint, check_same_thread=False)
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS followers "
+                    "(name TEXT PRIMARY KEY, number INTEGER NOT NULL, hash TEXT NOT NULL)"
+                )
+                row = self._connection.execute(
+                    "SELECT number, hash FROM followers WHERE name = ?", (name,)
+                ).fetchone()
+            if row is not None:
+                self.anchor = self._saved = (row[0], row[1])
+                self.next_block = row[0] + 1
+
+    @property
+    def caught_up(self) -> bool:
+        return (
+            self.head is None or self.next_block is None or self.next_block > self.head
+        )
+
+    def poll(self) -> List[ChainEvent]:
+        """
+        Performs one round: fetches the head when caught up, then at most `batch_size` missing blocks.
+        """
+        self._save()
+        if self.caught_up:
+            self._set_head(self.proxy.eth_blockNumber())
+        blocks = self._plan()
+        if blocks is None:
+            return self._pace([])
+        return self._pace(
+            self._accept(
+                self.proxy.get_blocks(blocks, self.full_transactions, self.workers)
+            )
+        )
+
+    def follow(self) -> Iterator[ChainEvent]:
+        """
+        Polls forever, yielding the events in chain order.
+        """
+        while True:
+            events = self.poll()
+            yield from events
+            if self.caught_up or not events:
+                self._sleep(self.interval)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def _set_head(self, response: Dict[str, Any]):
+        result = response.get("result")
+        if not isinstance(result, str) or not result.startswith("0x"):
+            raise EtherscanError(
+                f"eth_blockNumber failed: {response.get('error') or result}"
+            )
+        self.head = int(result, 16)
+        if self.next_block is None:
+            self.next_block = self.head
+
+    def _plan(self) -> Optional[range]:
+        if self.caught_up or self.head is None or self.next_block is None:
+            return None
+        last = min(self.head, self.next_block + self.batch_size - 1)
+        return range(self.next_block, last + 1)
+
+    def _tip(self) -> Optional[Anchor]:
+        if self.unconfirmed:
+            return int(self.unconfirmed[-1]["number"], 16), self.unconfirmed[-1]["hash"]
+        return self.anchor
+
+    def _accept(self, responses: List[Dict[str, Any]]) -> List[ChainEvent]:
+        """
+        Extends the chain with the fetched blocks in order, up to the first missing one or the first reorg.
+        """
+        events: List[ChainEvent] = []
+        for response in responses:
+            block = response.get("result")
+            if not isinstance(block, dict):
+                break
+            number = int(block["number"], 16)
+            tip = self._tip()
+            if tip is not None and block["parentHash"] != tip[1]:
+                if not self.unconfirmed:
+                    raise EtherscanError(
+                        f"block {tip[0]} was reorged after {self.confirmations} confirmations"
+                    )
+                dropped = ChainEvent(REORGED, self.unconfirmed.pop())
+                self._dropped[dropped.number] = dropped.hash
+                self.next_block = dropped.number
+                self._newest_timestamp = None
+                events.append(dropped)
+                break
+            if self._dropped.pop(number, None) == block["hash"]:
+                raise EtherscanError(
+                    f"block {number} came back unchanged after a reorg, are block responses cached?"
+                )
+            timestamp = int(block["timestamp"], 16)
+            if self._newest_timestamp is not None:
+                self._observe(timestamp - self._newest_timestamp)
+            self._newest_timestamp = timestamp
+            self.unconfirmed.append(block)
+            self.next_block = number + 1
+            events.append(ChainEvent(NEW, block))
+            while (
+                self.unconfirmed
+                and int(self.unconfirmed[0]["number"], 16) + self.confirmations
+                <= number
+            ):
+                confirmed = ChainEvent(CONFIRMED, self.unconfirmed.popleft())
+                self.anchor = (confirmed.number, confirmed.hash)
+                events.append(confirmed)
+        return events
+
+    def _observe(self, block_time: float):
+        if self.block_time is None:
+            self.block_time = float(block_time)
+        else:
+            self.block_time = 0.8 * self.block_time + 0.2 * block_time
+
+    def _pace(self, events: List[ChainEvent]) -> List[ChainEvent]:
+        """
+        Adapts the polling interval to the outcome of a poll and returns its events.
+        """
+        if self._newest_timestamp is not None and any(
+            event.kind == NEW for event in events
+        ):
+            age = self._wall_clock() - self._newest_timestamp
+            expected = (
+                self.min_interval if self.block_time is None else self.block_time - age
+            )
+            self.interval = max(self.min_interval, min(self.max_interval, expected))
+        else:
+            self.interval = max(
+                self.min_interval, min(self.max_interval, self.interval * self.backoff)
+            )
+        return events
+
+    def _save(self):
+        if (
+            self._connection is None
+            or self.anchor is None
+            or self.anchor == self._saved
+        ):
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO followers (name, number, hash) VALUES (?, ?, ?)",
+                (self.name, *self.anchor),
+            )
+        self._saved = self.anchor
+
+
+class AsyncChainFollower(ChainFollower):
+    """
+    ChainFollower for the AsyncConnector's proxy, poll is a coroutine and follow an async iterator.
+    """
+
+    def __init__(self, proxy: Proxy, *args, **kwargs):
+        kwargs.setdefault("sleep", asyncio.sleep)
+        super().__init__(proxy, *args, **kwargs)
+
+    async def poll(self) -> List[ChainEvent]:  # type: ignore[override]
+        self._save()
+        if self.caught_up:
+            self._set_head(await self.proxy.eth_blockNumber())  # type: ignore[misc]
+        blocks = self._plan()
+        if blocks is None:
+            return self._pace([])
+        return self._pace(
+            self._accept(
+                await self.proxy.get_blocks(  # type: ignore[misc]
+                    blocks, self.full_transactions, self.workers
+                )
+            )
+        )
+
+    async def follow(self) -> AsyncIterator[ChainEvent]:  # type: ignore[override]
+        while True:
+            events = await self.poll()
+            for event in events:
+                yield event
+            if self.caught_up or not events:
+                await self._sleep(self.interval)
@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+from array import array
+from decimal import Decimal
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from warnings import warn
+
+from .gas_tracker import GasTracker
+from .proxy import Proxy
+
+# prices are in gwei, confirmation times in seconds
+COLUMNS = (
+    "timestamp",
+    "block",
+    "safe",
+    "propose",
+    "fast",
+    "base_fee",
+    "gas_price",
+    "safe_seconds",
+    "propose_seconds",
+    "fast_seconds",
+)
+TIERS = ("safe", "propose", "fast")
+ORACLE_FIELDS = {
+    "block": "LastBlock",
+    "safe": "SafeGasPrice",
+    "propose": "ProposeGasPrice",
+    "fast": "FastGasPrice",
+    "base_fee": "suggestBaseFee",
+}
+NAN = float("nan")
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class GasSampler(object):
+    """
+    Polls gas prices at a fixed cadence into an in-memory ring buffer and answers gas queries from it.
+
+    Every `interval` seconds a sample is taken: gasoracle (safe, propose and fast prices, base fee), eth_gasPrice when
+    a proxy is given, and gasestimate at each of the three tier prices when `calibrate` is set. The last `capacity`
+    samples are kept, one array("d") per column (see COLUMNS), a value that could not be fetched is NaN.
+
+    `latest`, `percentile`, `moving_average` and `estimate_seconds` never call the api, so any number of consumers
+    share the calls of one sampler. estimate_seconds interpolates between the calibrated tiers of the latest sample,
+    which is only as good as Etherscan's own estimates at those three prices.
+
+    Sample in the background with start/stop (or as a context manager), or call `sample` from your own scheduler.
+    Requires the synchronous Connector's modules:
+
+        with GasSampler(etherscan.gas_tracker, etherscan.proxy) as gas:
+            fast = gas.percentile("fast", 90, window=3600)
+    """
+
+    def __init__(
+        self,
+        gas_tracker: GasTracker,
+        proxy: Optional[Proxy] = None,
+        interval: float = 15.0,
+        capacity: int = 1440,
+        calibrate: bool = True,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.gas_tracker = gas_tracker
+        self.proxy = proxy
+        self.interval = interval
+        self.capacity = capacity
+        self.calibrate = calibrate
+        self._wall_clock = wall_clock
+        self._columns: Dict[str, array] = {
+            column: array("d", [NAN]) * capacity for column in COLUMNS
+        }
+        self._cursor = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def sample(self) -> Dict[str, float]:
+        """
+        Takes one sample, appends it to the buffer and returns it.
+        """
+        values = dict.fromkeys(COLUMNS, NAN)
+        values["timestamp"] = self._wall_clock()
+        oracle = self.gas_tracker.gasoracle()
+        if oracle.get("status") == "1" and isinstance(oracle.get("result"), dict):
+            result: dict = oracle["result"]  # type: ignore[assignment]
+            for column, field in ORACLE_FIELDS.items():
+                values[column] = _float(result.get(field))
+        if self.proxy is not None:
+            price = self.proxy.eth_gasPrice().get("result")
+            if isinstance(price, str) and price.startswith("0x"):
+                values["gas_price"] = int(price, 16) / 1e9
+        if self.calibrate:
+            for tier in TIERS:
+                if not math.isnan(values[tier]):
+                    wei = int(Decimal(str(values[tier])) * 10**9)
+                    response = self.gas_tracker.gasestimate(wei)
+                    if response.get("status") == "1":
+                        values[f"{tier}_seconds"] = _float(response.get("result"))
+        with self._lock:
+            for column, value in values.items():
+                self._columns[column][self._cursor] = value
+            self._cursor = (self._cursor + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        return values
+
+    def start(self) -> "GasSampler":
+        """
+        Starts sampling on a daemon thread, a failed sample is reported with a warning and sampling goes on.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pyetherscan-gas-sampler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def series(self, column: str, window: Optional[float] = None) -> array:
+        """
+        Returns the values of a column, oldest first, of the samples taken within the last `window` seconds (all of
+        them by default).
+        """
+        with self._lock:
+            values = self._ordered(column)
+            if window is None:
+                return values
+            timestamps = self._ordered("timestamp")
+        since = self._wall_clock() - window
+        return array("d", (v for t, v in zip(timestamps, values) if t >= since))
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        with self._lock:
+            if not self._count:
+                return None
+            index = (self._cursor - 1) % self.capacity
+            return {column: values[index] for column, values in self._columns.items()}
+
+    def percentile(
+        self, column: str, q: float, window: Optional[float] = None
+    ) -> float:
+        """
+        Nearest-rank percentile (q in [0, 100]) of a column over the window, NaN without values.
+        """
+        values = sorted(v for v in self.series(column, window) if not math.isnan(v))
+        if not values:
+            return NAN
+        return values[max(int(-(-q * len(values) // 100)), 1) - 1]
+
+    def moving_average(self, column: str, window: Optional[float] = None) -> float:
+        values = [v for v in self.series(column, window) if not math.isnan(v)]
+        return sum(values) / len(values) if values else NAN
+
+    def estimate_seconds(self, gas_price: float) -> float:
+        """
+        Estimated confirmation time of a gas price (in gwei) from the latest calibrated sample, interpolated linearly
+        between the tiers, the fast tier's time above it and inversely proportional to the price below the safe one.
+        """
+        latest = self.latest()
+        if latest is None:
+            return NAN
+        points = sorted(
+            (latest[tier], latest[f"{tier}_seconds"])
+            for tier in TIERS
+            if not math.isnan(latest[tier])
+            and not math.isnan(latest[f"{tier}_seconds"])
+        )
+        if not points:
+            return NAN
+        if gas_price <= points[0][0]:
+            price, seconds = points[0]
+            return seconds * price / gas_price if gas_price > 0 else math.inf
+        for (low, low_seconds), (high, high_seconds) in zip(points, points[1:]):
+            if gas_price <= high:
+                if high == low:
+                    return high_seconds
+                return low_seconds + (gas_price - low) * (
+                    high_seconds - low_seconds
+                ) / (high - low)
+        return points[-1][1]
+
+    def estimates(self, gas_prices: Iterable[float]) -> List[float]:
+        return [self.estimate_seconds(gas_price) for gas_price in gas_prices]
+
+    def _ordered(self, column: str) -> array:
+        values = self._columns[column]
+        if self._count < self.capacity:
+            return values[: self._count]
+        return values[self._cursor :] + values[: self._cursor]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as error:
+                warn(f"gas sample failed: {type(error).__name__}: {error}")
+            self._stopped.wait(max(self.interval - (time.monotonic() - started), 0.0))
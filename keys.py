@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .exceptions import DailyQuotaExceeded
+from .exceptions import KeyPoolExhausted
+from .rate_limit import RateLimiter
+from .rate_limit import SECONDS_PER_DAY
+
+INVALID_KEY_MESSAGES = ("invalid api key",)
+QUOTA_MESSAGES = ("daily",)
+
+
+class _KeyState(object):
+    __slots__ = ("key", "limiter", "calls", "errors", "ejected_until")
+
+    def __init__(self, key: str, limiter: RateLimiter):
+        self.key = key
+        self.limiter = limiter
+        self.calls = 0
+        self.errors = 0
+        self.ejected_until = 0.0
+
+
+class KeyPool(object):
+    """
+    Spreads calls over several api keys, each throttled by its own RateLimiter.
+
+    Every call goes to the key that can make it soonest, ties rotating between keys. A key the api rejects as invalid
+    is ejected for `eject_invalid_for` seconds, one that used up its daily quota (on the api side or the client side)
+    until the next UTC day. The last key standing is never ejected: once its client side quota is used up
+    DailyQuotaExceeded is raised, and the api's error responses to it are returned as is. A single key is simply a
+    pool of one. KeyPoolExhausted is raised should no key be left to pick. Per key counters are reported by `usage`.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        calls_per_second: Optional[float] = 5.0,
+        daily_quota: Optional[int] = 100_000,
+        eject_invalid_for: float = 3600.0,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        if isinstance(keys, str):
+            keys = [keys]
+        if not keys:
+            raise ValueError("a key pool needs at least one key")
+        self.eject_invalid_for = eject_invalid_for
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._states: List[_KeyState] = [
+            _KeyState(
+                key,
+                RateLimiter(
+                    calls_per_second=calls_per_second,
+                    daily_quota=daily_quota,
+                    wall_clock=wall_clock,
+                ),
+            )
+            for key in keys
+        ]
+        self._by_key = {state.key: state for state in self._states}
+        self._rotation = 0
+
+    @property
+    def keys(self) -> List[str]:
+        return [state.key for state in self._states]
+
+    def reserve(self) -> Tuple[str, float]:
+        """
+        Picks a key for the next call and reserves it, returns the key and how long to wait before using it.
+        """
+        with self._lock:
+            while True:
+                state = self._soonest()
+                try:
+                    delay = state.limiter.reserve()
+                except DailyQuotaExceeded:
+                    if self._last_standing(state):
+                        raise
+                    self._eject_for_today(state)
+                    continue
+                state.calls += 1
+                return state.key, delay
+
+    def acquire(self) -> str:
+        key, delay = self.reserve()
+        if delay > 0.0:
+            time.sleep(delay)
+        return key
+
+    async def acquire_async(self) -> str:
+        key, delay = self.reserve()
+        if delay > 0.0:
+            await asyncio.sleep(delay)
+        return key
+
+    def report(self, key: str, response: dict) -> bool:
+        """
+        Inspects the response to a call made with `key`, returns True when the key got ejected because of it.
+        """
+        state = self._by_key.get(key)
+        if state is None or response.get("status") != "0":
+            return False
+        result = response.get("result")
+        if not isinstance(result, str):
+            return False
+        message = result.lower()
+        invalid = any(marker in message for marker in INVALID_KEY_MESSAGES)
+        if not invalid and not any(marker in message for marker in QUOTA_MESSAGES):
+            return False
+        with self._lock:
+            state.errors += 1
+            if self._last_standing(state):
+                return False
+            if invalid:
+                state.ejected_until = self._wall_clock() + self.eject_invalid_for
+            else:
+                self._eject_for_today(state)
+            return True
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        now = self._wall_clock()
+        return {
+            state.key: {
+                "calls": state.calls,
+                "calls_today": state.limiter.calls_today,
+                "errors": state.errors,
+                "ejected_for": max(0.0, state.ejected_until - now),
+            }
+            for state in self._states
+        }
+
+    def _soonest(self) -> _KeyState:
+        now = self._wall_clock()
+        count = len(self._states)
+        self._rotation = (self._rotation + 1) % count
+        best, best_wait = None, None
+        for i in range(count):
+            state = self._states[(self._rotation + i) % count]
+            if state.ejected_until > now:
+                continue
+            wait = state.limiter.wait_time()
+            if best_wait is None or wait < best_wait:
+                best, best_wait = state, wait
+        if best is None:
+            raise KeyPoolExhausted(f"all {count} api keys are currently ejected")
+        return best
+
+    def _last_standing(self, state: _KeyState) -> bool:
+        now = self._wall_clock()
+        return all(
+            other is state or other.ejected_until > now for other in self._states
+        )
+
+    def _eject_for_today(self, state: _KeyState):
+        now = self._wall_clock()
+        state.ejected_until = (now // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
@@ -0,0 +1,281 @@
+import json
+import sqlite3
+import threading
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .exceptions import EtherscanError
+from .logs import Logs
+from .pagination import Record
+from .proxy import Proxy
+from .utils import to_int
+
+TOPICS = 4
+INSERT_BATCH = 1000
+
+Span = Tuple[int, int]
+
+
+def topic_filter(topics: Optional[List[tuple]]) -> Tuple[str, List[str]]:
+    """
+    Translates getLogs topics, [(topic0, topic0_1_opr), (topic1, ...), ...] as taken by Logs.getLogs, to an SQL
+    condition and its parameters. Operators combine the conditions from left to right, a None topic matches anything.
+    """
+    condition, params = "", []  # type: ignore[var-annotated]
+    operator = "and"
+    for position, topic in enumerate((topics or [])[:TOPICS]):
+        if topic[0] is not None:
+            term = f"topic{position} = ?"
+            params.append(topic[0].lower())
+            condition = (
+                f"({condition} {operator.upper()} {term})" if condition else term
+            )
+        if len(topic) > 1 and topic[1] is not None:
+            if topic[1] not in ("and", "or"):
+                raise ValueError(f"unknown topic operator {topic[1]!r}")
+            operator = topic[1]
+    return condition or "1", params
+
+
+class LogStore(object):
+    """
+    Persistent store of event logs answering getLogs queries from the block ranges it holds completely.
+
+    Logs are stored per address in a local SQLite database, indexed by block and by each of topic0-3, together with
+    the (address, block range) spans fetched completely. A query is answered from the store where its range is
+    covered, with any combination of topics and `topicN_M_opr` operators; only the uncovered gaps are fetched, with
+    all logs of the address so that later queries with other topics are covered as well. This trades a larger first
+    fetch for repeated queries that cost no calls.
+
+    Only blocks at least `confirmations` below the head are marked as covered, the head is asked from `proxy` (by
+    default one sharing the logs' key and transport) whenever a gap reaches above the last head seen. Newer blocks
+    are fetched again by every query reaching them, so logs mined later in them are picked up, and their stored logs
+    are replaced each time. `forget` the blocks a deeper reorg replaced (see ChainFollower). Queries without a
+    numeric block range go to the api unchanged. Requires the synchronous Connector's logs:
+
+        store = LogStore(etherscan.logs)
+        response = store.getLogs(address, 18_000_000, 18_100_000, topics=[(TRANSFER_TOPIC,)])
+    """
+
+    def __init__(
+        self,
+        logs: Logs,
+        path: str = "pyetherscan_logs.sqlite",
+        confirmations: int = 12,
+        proxy: Optional[Proxy] = None,
+    ):
+        self.logs = logs
+        self.confirmations = confirmations
+        self.proxy = (
+            proxy
+            if proxy is not None
+            else Proxy(logs.params["apikey"], logs.endpoint, logs.transport)
+        )
+        self.head: Optional[int] = None
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        topic_columns = ", ".join(f"topic{i} TEXT" for i in range(TOPICS))
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS logs (address TEXT, block INTEGER, log_index INTEGER, "
+                f"{topic_columns}, record TEXT NOT NULL, PRIMARY KEY (address, block, log_index))"
+            )
+            for i in range(TOPICS):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS logs_topic{i} ON logs (address, topic{i}, block)"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS spans "
+                "(address TEXT, start INTEGER, end INTEGER, PRIMARY KEY (address, start))"
+            )
+        self.local = 0
+        self.fetched = 0
+
+    def getLogs(  # noqa
+        self,
+        address: str,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        page: int = 1,
+        offset: int = 1000,
+        topics: List[tuple] = None,
+    ) -> Dict[str, Any]:
+        """
+        Drop-in replacement of Logs.getLogs answering from the store, see the class documentation.
+        """
+        if not isinstance(to_block, int) or not isinstance(from_block or 0, int):
+            return self.logs.getLogs(
+                address, from_block, to_block, page, offset, topics
+            )
+        records = list(
+            self.iter_getLogs(
+                address, from_block or 0, to_block, topics, (page - 1) * offset, offset
+            )
+        )
+        if not records:
+            return {"status": "0", "message": "No records found", "result": []}
+        return {"status": "1", "message": "OK", "result": records}
+
+    def iter_getLogs(  # noqa
+        self,
+        address: str,
+        from_block: int,
+        to_block: int,
+        topics: List[tuple] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator[Record]:
+        """
+        Yields the logs of an address in the block range matching the topics, in block and log index order, after
+        fetching the gaps in the store's coverage.
+        """
+        address = address.lower()
+        gaps = self.gaps(address, from_block, to_block)
+        for start, end in gaps:
+            self._fetch(address, start, end)
+        if not gaps:
+            self.local += 1
+        condition, params = topic_filter(topics)
+        query = (
+            "SELECT record FROM logs WHERE address = ? AND block BETWEEN ? AND ? "
+            f"AND {condition} ORDER BY block, log_index LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._connection.execute(
+                query,
+                [address, from_block, to_block, *params]
+                + [-1 if limit is None else limit, skip],
+            ).fetchall()
+        for (record,) in rows:
+            yield json.loads(record)
+
+    def gaps(self, address: str, from_block: int, to_block: int) -> List[Span]:
+        """
+        Returns the block ranges within [from_block, to_block] the store does not cover for the address.
+        """
+        with self._lock:
+            spans = self._connection.execute(
+                "SELECT start, end FROM spans WHERE address = ? AND end >= ? AND start <= ? ORDER BY start",
+                (address.lower(), from_block, to_block),
+            ).fetchall()
+        gaps, cursor = [], from_block
+        for start, end in spans:
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+        if cursor <= to_block:
+            gaps.append((cursor, to_block))
+        return gaps
+
+    def forget(self, address: Optional[str] = None, from_block: int = 0):
+        """
+        Drops the logs and coverage from a block on, for one address or all of them.
+        """
+        condition, params = "", []  # type: ignore[var-annotated]
+        if address is not None:
+            condition, params = " AND address = ?", [address.lower()]
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"DELETE FROM logs WHERE block >= ?{condition}", [from_block, *params]
+            )
+            self._connection.execute(
+                f"DELETE FROM spans WHERE start >= ?{condition}", [from_block, *params]
+            )
+            self._connection.execute(
+                f"UPDATE spans SET end = ? WHERE end >= ?{condition}",
+                [from_block - 1, from_block, *params],
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (logs,) = self._connection.execute("SELECT COUNT(*) FROM logs").fetchone()
+            (spans,) = self._connection.execute("SELECT COUNT(*) FROM spans").fetchone()
+        return {
+            "logs": logs,
+            "spans": spans,
+            "local": self.local,
+            "fetched": self.fetched,
+        }
+
+    def close(self):
+        self._connection.close()
+
+    def _fetch(self, address: str, start: int, end: int):
+        """
+        Stores every log of the address in the block range, in place of the ones stored before, then marks the part
+        of the range below the confirmation depth as covered.
+        """
+        final = self._final_block(end)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM logs WHERE address = ? AND block BETWEEN ? AND ?",
+                (address, start, end),
+            )
+        batch: List[Tuple[Any, ...]] = []
+        for record in self.logs.iter_getLogs(address, start, end):
+            topics = [topic.lower() for topic in record.get("topics", [])]  # type: ignore
+            topics += [None] * (TOPICS - len(topics))  # type: ignore[list-item]
+            batch.append(
+                (
+                    address,
+                    to_int(record["blockNumber"]),  # type: ignore[arg-type]
+                    to_int(record["logIndex"]),  # type: ignore[arg-type]
+                    *topics[:TOPICS],
+                    json.dumps(record),
+                )
+            )
+            if len(batch) >= INSERT_BATCH:
+                self._insert(batch)
+                batch = []
+        self._insert(batch)
+        if final >= start:
+            self._cover(address, start, min(end, final))
+        self.fetched += 1
+
+    def _final_block(self, end: int) -> int:
+        """
+        Returns the highest block deep enough to be final, asking for the head unless the last one seen covers `end`.
+        """
+        if self.head is None or end > self.head - self.confirmations:
+            response = self.proxy.eth_blockNumber()
+            result = response.get("result")
+            if not isinstance(result, str) or not result.startswith("0x"):
+                raise EtherscanError(
+                    f"eth_blockNumber failed: {response.get('error') or result}"
+                )
+            self.head = int(result, 16)
+        return self.head - self.confirmations
+
+    def _insert(self, rows: List[Tuple[Any, ...]]):
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO logs VALUES (?, ?, ?, {', '.join('?' * TOPICS)}, ?)",
+                rows,
+            )
+
+    def _cover(self, address: str, start: int, end: int):
+        """
+        Adds a span, merged with the spans it overlaps or touches.
+        """
+        with self._lock, self._connection:
+            touching = self._connection.execute(
+                "SELECT start, end FROM spans WHERE address = ? AND end >= ? AND start <= ?",
+                (address, start - 1, end + 1),
+            ).fetchall()
+            for span_start, span_end in touching:
+                start, end = min(start, span_start), max(end, span_end)
+            self._connection.execute(
+                "DELETE FROM spans WHERE address = ? AND end >= ? AND start <= ?",
+                (address, start - 1, end + 1),
+            )
+            self._connection.execute(
+                "INSERT INTO spans (address, start, end) VALUES (?, ?, ?)",
+                (address, start, end),
+            )
@@ -1,9 +1,19 @@
+from copy import copy
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Union
 
-import requests
+from .backfill import backfill
+from .backfill import ShardPlanner
+from .pagination import BlockPaginator
+from .pagination import paginate
+from .pagination import Record
+from .transport import BaseTransport
+from .transport import Transport
 
 
 class Logs(object):
@@ -12,12 +22,28 @@ class Logs(object):
     see: https://docs.etherscan.io/api-endpoints/logs for more details
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self, key: str, endpoint: str, transport: Optional[BaseTransport] = None
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "logs"}
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
+
+    def _streaming(self) -> "Logs":
+        """
+        Returns a copy of this wrapper whose calls yield the records of the result as they arrive, see Transport.stream.
+        """
+        view = copy(self)
+        stream = self.transport.stream
+        view._get_request = lambda params: stream(self.endpoint, params)  # type: ignore
+        return view
+
+    # drivers of the iter_* and backfill_* methods, the asyncio wrappers swap in apaginate and abackfill
+    _paginate: Callable[..., Any] = staticmethod(paginate)
+    _backfill: Callable[..., Any] = staticmethod(backfill)
 
     def getLogs(
         self,
@@ -49,6 +75,48 @@ class Logs(object):
                     schema[f"topic{i}_{i+1}_opr"] = topic[1]
         return self._get_request(schema)
 
+    def iter_getLogs(
+        self,
+        address: str,
+        from_block: int = 0,
+        to_block: int = 99999999,
+        offset: int = 1000,
+        topics: List[tuple] = None,
+        stream: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields every event log of an address in the block range, page by page.
+
+        The 10000 record cap is worked around by re-splitting the block range, see BlockPaginator. With stream=True
+        each page is parsed while it downloads instead of after, see Transport.stream.
+        """
+        source = self._streaming() if stream else self
+        return self._paginate(
+            lambda start, end, page: source.getLogs(
+                address, start, end, page, offset, topics
+            ),
+            BlockPaginator(from_block, to_block, offset),
+        )
+
+    def backfill_getLogs(
+        self,
+        address: str,
+        from_block: int,
+        to_block: int,
+        topics: List[tuple] = None,
+        workers: int = 4,
+        shard_size: int = 10000,
+    ) -> Iterator[Record]:
+        """
+        Yields every event log of an address in block order, fetching adaptive block range shards of at most 1000
+        logs concurrently under the client's rate limit, see ShardPlanner.
+        """
+        return self._backfill(
+            lambda start, end: self.getLogs(address, start, end, 1, 1000, topics),
+            ShardPlanner(from_block, to_block, 1000, shard_size),
+            workers,
+        )
+
 
 def test_logs():
     import yaml
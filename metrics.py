@@ -0,0 +1,467 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from warnings import warn
+
+from .retry import classify_response
+from .retry import FAIL
+from .retry import OK
+
+HISTOGRAM = "histogram"
+COUNTER = "counter"
+
+SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+BYTES_BUCKETS = tuple(256 * 4**i for i in range(10))
+# metric name -> (kind, unit, description)
+METRICS = {
+    "request_seconds": (HISTOGRAM, "s", "duration of each request attempt, by outcome"),
+    "phase_seconds": (
+        HISTOGRAM,
+        "s",
+        "duration of the phases of a request (dns, connect, server, body, decode)",
+    ),
+    "response_bytes": (HISTOGRAM, "By", "size of response bodies"),
+    "rate_limit_wait_seconds": (
+        HISTOGRAM,
+        "s",
+        "time spent waiting for the rate limiter or key pool",
+    ),
+    "cache_lookups": (
+        COUNTER,
+        "1",
+        "lookups of cacheable requests, by cache and result",
+    ),
+    "retries": (COUNTER, "1", "request attempts after the first"),
+    "errors": (COUNTER, "1", "failed request attempts, by error class"),
+}
+
+Labels = Dict[str, str]
+Callback = Callable[[str, str, float, Labels], None]
+
+
+def request_labels(params: Optional[dict]) -> Labels:
+    params = params or {}
+    return {
+        "module": str(params.get("module", "")),
+        "action": str(params.get("action", "")),
+    }
+
+
+def error_class(outcome: Any) -> Optional[str]:
+    """
+    Names the error of a request attempt: the exception class, ApiRetryable or ApiError for a failed envelope (see
+    classify_response) or None for a success.
+    """
+    if isinstance(outcome, BaseException):
+        return type(outcome).__name__
+    classification = classify_response(outcome)
+    if classification == OK:
+        return None
+    return "ApiError" if classification == FAIL else "ApiRetryable"
+
+
+class Histogram(object):
+    """
+    Fixed bucket histogram, quantiles are interpolated within their bucket like Prometheus' histogram_quantile.
+    """
+
+    def __init__(self, buckets: Sequence[float] = SECONDS_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[index - 1] if index else min(self.min, 0.0)
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else math.nan,
+            "min": self.min if self.count else math.nan,
+            "max": self.max if self.count else math.nan,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class HistogramRegistry(object):
+    """
+    Thread safe in-memory store of the histograms and counters reported by Metrics, one series per name and label
+    set. Byte sized metrics use BYTES_BUCKETS, all others SECONDS_BUCKETS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def __call__(self, kind: str, name: str, value: float, labels: Labels):
+        series = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if kind == COUNTER:
+                self._counters[series] = self._counters.get(series, 0.0) + value
+                return
+            histogram = self._histograms.get(series)
+            if histogram is None:
+                unit = METRICS.get(name, (HISTOGRAM, "s", ""))[1]
+                histogram = Histogram(
+                    BYTES_BUCKETS if unit == "By" else SECONDS_BUCKETS
+                )
+                self._histograms[series] = histogram
+            histogram.observe(value)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Returns every series as {name: [{"labels": {...}, **figures}, ...]}, see Histogram.snapshot.
+        """
+        snapshot: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                snapshot.setdefault(name, []).append(
+                    {"labels": dict(labels), **histogram.snapshot()}
+                )
+            for (name, labels), value in sorted(self._counters.items()):
+                snapshot.setdefault(name, []).append(
+                    {"labels": dict(labels), "value": value}
+                )
+        return snapshot
+
+    def to_prometheus(self, namespace: str = "pyetherscan") -> str:
+        """
+        Renders every series in the Prometheus text exposition format, no client library needed.
+        """
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        previous = None
+        for (name, labels), histogram in histograms:
+            metric = f"{namespace}_{name}"
+            if name != previous:
+                lines.append(f"# TYPE {metric} histogram")
+                previous = name
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + (math.inf,), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                bucket_labels = _format_labels(labels + (("le", le),))
+                lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        for (name, labels), value in counters:
+            metric = f"{namespace}_{name}_total"
+            if name != previous:
+                lines.append(f"# TYPE {metric} counter")
+                previous = name
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return (
+        "{"
+        + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped))
+        + "}"
+    )
+
+
+class Metrics(object):
+    """
+    Instrumentation of the shared request path, pass one to Connector (or a transport) as `metrics`.
+
+    The transports report per module/action timings of every attempt and of its phases where the HTTP client exposes
+    them (dns, connect and server with aiohttp, server and body with requests where server includes connecting, and
+    decode with both), response sizes, cache lookups, retries, rate limit waits and error classes, see METRICS. Every
+    observation goes to the registry (a HistogramRegistry unless given) and to each callback as
+    `callback(kind, name, value, labels)`, e.g. PrometheusExporter or OpenTelemetryExporter.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[HistogramRegistry] = None,
+        callbacks: Sequence[Callback] = (),
+    ):
+        self.registry = registry if registry is not None else HistogramRegistry()
+        self.callbacks: List[Callback] = [self.registry, *callbacks]
+
+    def subscribe(self, callback: Callback):
+        self.callbacks.append(callback)
+
+    def emit(self, kind: str, name: str, value: float, labels: Labels):
+        for callback in self.callbacks:
+            try:
+                callback(kind, name, value, labels)
+            except Exception as error:  # instrumentation must never fail a request
+                warn(f"metrics callback {callback!r} failed: {error!r}")
+
+    def observe(self, name: str, value: float, labels: Labels):
+        self.emit(HISTOGRAM, name, value, labels)
+
+    def increment(self, name: str, labels: Labels, value: float = 1.0):
+        self.emit(COUNTER, name, value, labels)
+
+    def cached(self, params: dict, cache: str, hit: bool):
+        labels = {
+            **request_labels(params),
+            "cache": cache,
+            "result": "hit" if hit else "miss",
+        }
+        self.increment("cache_lookups", labels)
+
+    def waited(self, params: Optional[dict], seconds: float):
+        self.observe("rate_limit_wait_seconds", seconds, request_labels(params))
+
+    def responded(
+        self,
+        params: Optional[dict],
+        phases: Dict[str, float],
+        size: Optional[int] = None,
+    ):
+        labels = request_labels(params)
+        for phase, seconds in phases.items():
+            self.observe("phase_seconds", seconds, {**labels, "phase": phase})
+        if size is not None:
+            self.observe("response_bytes", size, labels)
+
+    def attempted(self, params: dict, attempt: int, seconds: float, outcome: Any):
+        labels = request_labels(params)
+        error = error_class(outcome)
+        if attempt > 1:
+            self.increment("retries", labels)
+        if error is not None:
+            self.increment("errors", {**labels, "error": error})
+        self.observe("request_seconds", seconds, {**labels, "outcome": error or "ok"})
+
+    def instrument(self, request: Callable[[], Any], params: dict) -> Callable[[], Any]:
+        """
+        Wraps the request of a retry policy so that every attempt is timed and classified.
+        """
+        attempts = [0]
+
+        def attempt():
+            attempts[0] += 1
+            started = time.perf_counter()
+            try:
+                response = request()
+            except Exception as error:
+                self.attempted(
+                    params, attempts[0], time.perf_counter() - started, error
+                )
+                raise
+            self.attempted(params, attempts[0], time.perf_counter() - started, response)
+            return response
+
+        return attempt
+
+    def ainstrument(
+        self, request: Callable[[], Awaitable[Any]], params: dict
+    ) -> Callable[[], Awaitable[Any]]:
+        """
+        Asynchronous counterpart of `instrument`.
+        """
+        attempts = [0]
+
+        async def attempt():
+            attempts[0] += 1
+            started = time.perf_counter()
+            try:
+                response = await request()
+            except Exception as error:
+                self.attempted(
+                    params, attempts[0], time.perf_counter() - started, error
+                )
+                raise
+            self.attempted(params, attempts[0], time.perf_counter() - started, response)
+            return response
+
+        return attempt
+
+    def trace_config(self) -> Any:
+        """
+        Returns an aiohttp.TraceConfig recording the dns, connect (including TLS) and server phases into the dict
+        passed as `trace_request_ctx` of a request, see AsyncTransport.
+        """
+        import aiohttp
+
+        def stamp(name: str):
+            async def callback(session, context, params):
+                if context.trace_request_ctx is not None:
+                    context.trace_request_ctx[name] = time.perf_counter()
+
+            return callback
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(stamp("request_start"))
+        config.on_dns_resolvehost_start.append(stamp("dns_start"))
+        config.on_dns_resolvehost_end.append(stamp("dns_end"))
+        config.on_connection_create_start.append(stamp("connect_start"))
+        config.on_connection_create_end.append(stamp("connect_end"))
+        config.on_request_end.append(stamp("request_end"))
+        return config
+
+
+def trace_phases(stamps: Dict[str, float]) -> Dict[str, float]:
+    """
+    Turns the timestamps collected by Metrics.trace_config into phase durations.
+    """
+    phases = {}
+    dns = stamps.get("dns_end", 0.0) - stamps.get("dns_start", 0.0)
+    if "dns_end" in stamps:
+        phases["dns"] = dns
+    if "connect_end" in stamps:
+        phases["connect"] = stamps["connect_end"] - stamps["connect_start"] - dns
+    if "request_end" in stamps:
+        sent = stamps.get(
+            "connect_end", stamps.get("request_start", stamps["request_end"])
+        )
+        phases["server"] = stamps["request_end"] - sent
+    return phases
+
+
+class PrometheusExporter(object):
+    """
+    Metrics callback mirroring every series into prometheus_client metrics named `<namespace>_<name>`, exposed by
+    the usual prometheus_client means (start_http_server, ...). Requires the optional `prometheus-client` dependency.
+    """
+
+    def __init__(self, namespace: str = "pyetherscan", registry: Any = None):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError(
+                "PrometheusExporter requires prometheus-client, install it with `pip install prometheus-client`"
+            )
+        self._client = prometheus_client
+        self.namespace = namespace
+        self.registry = registry if registry is not None else prometheus_client.REGISTRY
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def __call__(self, kind: str, name: str, value: float, labels: Labels):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._create(kind, name, labels)
+        child = metric.labels(**labels) if labels else metric
+        if kind == COUNTER:
+            child.inc(value)
+        else:
+            child.observe(value)
+
+    def _create(self, kind: str, name: str, labels: Labels) -> Any:
+        with self._lock:
+            if name in self._metrics:
+                return self._metrics[name]
+            _, unit, description = METRICS.get(name, (kind, "", name))
+            options = {
+                "namespace": self.namespace,
+                "labelnames": sorted(labels),
+                "registry": self.registry,
+            }
+            if kind == COUNTER:
+                metric = self._client.Counter(name, description, **options)
+            else:
+                buckets = BYTES_BUCKETS if unit == "By" else SECONDS_BUCKETS
+                metric = self._client.Histogram(
+                    name, description, buckets=buckets, **options
+                )
+            self._metrics[name] = metric
+            return metric
+
+
+class OpenTelemetryExporter(object):
+    """
+    Metrics callback recording every series on OpenTelemetry histograms and counters of the given meter (by default
+    the global meter provider's "pyetherscan" meter). Requires the optional `opentelemetry-api` dependency.
+    """
+
+    def __init__(self, meter: Any = None, prefix: str = "pyetherscan."):
+        if meter is None:
+            try:
+                from opentelemetry import metrics as otel_metrics
+            except ImportError:
+                raise ImportError(
+                    "OpenTelemetryExporter requires opentelemetry, install it with `pip install opentelemetry-api`"
+                )
+            meter = otel_metrics.get_meter("pyetherscan")
+        self.meter = meter
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._instruments: Dict[str, Any] = {}
+
+    def __call__(self, kind: str, name: str, value: float, labels: Labels):
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            with self._lock:
+                instrument = self._instruments.get(name)
+                if instrument is None:
+                    _, unit, description = METRICS.get(name, (kind, "", name))
+                    create = (
+                        self.meter.create_counter
+                        if kind == COUNTER
+                        else self.meter.create_histogram
+                    )
+                    instrument = create(
+                        self.prefix + name, unit=unit, description=description
+                    )
+                    self._instruments[name] = instrument
+        if kind == COUNTER:
+            instrument.add(value, attributes=labels)
+        else:
+            instrument.record(value, attributes=labels)
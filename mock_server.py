@@ -0,0 +1,964 @@
+import hashlib
+import json
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.parse import parse_qsl
+from urllib.parse import urlparse
+
+from .multicall import AGGREGATE3
+from .multicall import decode_aggregate3_calls
+from .multicall import encode_tuples
+from .multicall import MULTICALL3
+
+GENESIS_TIMESTAMP = 1438269973
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+RATE_LIMITED = "Max rate limit reached"
+WINDOW_TOO_LARGE = (
+    "Result window is too large, PageNo x Offset size must be less than or equal to "
+)
+MAX_LOGS_PER_PAGE = 1000
+ERC20_ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "type": "function",
+        "name": "transfer",
+        "stateMutability": "nonpayable",
+        "inputs": [
+            {"name": "to", "type": "address"},
+            {"name": "value", "type": "uint256"},
+        ],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+    {
+        "type": "event",
+        "name": "Transfer",
+        "anonymous": False,
+        "inputs": [
+            {"name": "from", "type": "address", "indexed": True},
+            {"name": "to", "type": "address", "indexed": True},
+            {"name": "value", "type": "uint256", "indexed": False},
+        ],
+    },
+]
+# positional JSON-RPC params of the proxy actions, by name of the matching query parameter
+RPC_PARAMS = {
+    "eth_blockNumber": (),
+    "eth_getBlockByNumber": ("tag", "boolean"),
+    "eth_getUncleByBlockNumberAndIndex": ("tag", "index"),
+    "eth_getBlockTransactionCountByNumber": ("tag",),
+    "eth_getTransactionByHash": ("txhash",),
+    "eth_getTransactionByBlockNumberAndIndex": ("tag", "index"),
+    "eth_getTransactionCount": ("address", "tag"),
+    "eth_sendRawTransaction": ("hex",),
+    "eth_getTransactionReceipt": ("txhash",),
+    "eth_call": ("call", "tag"),
+    "eth_getCode": ("address", "tag"),
+    "eth_getStorageAt": ("address", "position", "tag"),
+    "eth_gasPrice": (),
+    "eth_estimateGas": ("call",),
+}
+
+Params = Dict[str, Any]
+
+
+def fake_hash(*parts: Any) -> str:
+    return "0x" + hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def fake_address(*parts: Any) -> str:
+    return fake_hash("address", *parts)[:42]
+
+
+def topic_of(address: str) -> str:
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def quantity(value: int) -> str:
+    # getLogs records write a zero index as a bare "0x"
+    return hex(value) if value else "0x"
+
+
+def envelope(result: Any, message: str = "OK", status: str = "1") -> dict:
+    return {"status": status, "message": message, "result": result}
+
+
+def failure(result: Any, message: str = "NOTOK") -> dict:
+    return envelope(result, message, "0")
+
+
+def rpc_envelope(result: Any, request_id: Any = 1) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def is_true(value: Any) -> bool:
+    return value in (True, "true", "True", "1")
+
+
+class MockChain(object):
+    """
+    Deterministic synthetic chain served by MockEtherscan.
+
+    `head` blocks are mined every `block_time` seconds from `genesis_timestamp`, every block holds
+    `transactions_per_block` transactions. Every address owns `records_per_address` records of each list action
+    (transactions, internal transactions, token transfers, logs, ...), `records_per_block` per block, spread evenly
+    over the initial chain so that block range pagination behaves like the real api. `mine` extends the chain and
+    `reorg` replaces its most recent blocks.
+    """
+
+    def __init__(
+        self,
+        head: int = 20_000_000,
+        records_per_address: int = 5000,
+        records_per_block: int = 1,
+        transactions_per_block: int = 10,
+        block_time: int = 12,
+        genesis_timestamp: int = GENESIS_TIMESTAMP,
+    ):
+        self.head = head
+        self.records_per_address = records_per_address
+        self.records_per_block = records_per_block
+        self.transactions_per_block = transactions_per_block
+        self.block_time = block_time
+        self.genesis_timestamp = genesis_timestamp
+        groups = -(-records_per_address // records_per_block)
+        self.spacing = max(1, head // max(groups, 1))
+        self._forks: List[Tuple[int, int]] = []
+
+    def mine(self, count: int = 1) -> int:
+        self.head += count
+        return self.head
+
+    def reorg(self, depth: int = 1) -> int:
+        """
+        Replaces the last `depth` blocks with blocks of different hashes, returns the first replaced block.
+        """
+        first = max(self.head - depth + 1, 0)
+        self._forks.append((first, len(self._forks) + 1))
+        return first
+
+    def fork_of(self, number: int) -> int:
+        for first, fork in reversed(self._forks):
+            if number >= first:
+                return fork
+        return 0
+
+    def timestamp(self, number: int) -> int:
+        return self.genesis_timestamp + number * self.block_time
+
+    def block_at(self, timestamp: int, closest: str = "before") -> Optional[int]:
+        offset = timestamp - self.genesis_timestamp
+        if closest == "before":
+            number = offset // self.block_time
+        else:
+            number = -(-offset // self.block_time)
+        if number < 0 or number > self.head:
+            return None
+        return number
+
+    def block_hash(self, number: int) -> str:
+        return fake_hash("block", number, self.fork_of(number))
+
+    def transaction_hash(self, number: int, index: int) -> str:
+        return fake_hash("tx", number, self.fork_of(number), index)
+
+    def block_of_hash(self, txhash: str) -> int:
+        return int(txhash[2:10] or "0", 16) % (self.head + 1)
+
+    def resolve(self, tag: Any) -> int:
+        if tag in (None, "latest", "pending", "safe", "finalized"):
+            return self.head
+        if tag == "earliest":
+            return 0
+        if isinstance(tag, int):
+            return tag
+        return int(tag, 16) if tag[:2] in ("0x", "0X") else int(tag)
+
+    def block(self, number: int, full: bool) -> Optional[dict]:
+        if number > self.head or number < 0:
+            return None
+        hashes = [
+            self.transaction_hash(number, index)
+            for index in range(self.transactions_per_block)
+        ]
+        return {
+            "number": hex(number),
+            "hash": self.block_hash(number),
+            "parentHash": self.block_hash(number - 1) if number else "0x" + "0" * 64,
+            "timestamp": hex(self.timestamp(number)),
+            "miner": fake_address("miner", number % 16),
+            "gasLimit": hex(30_000_000),
+            "gasUsed": hex(21000 * self.transactions_per_block),
+            "baseFeePerGas": hex(10**10),
+            "transactions": [
+                self.transaction(txhash, number, index)
+                for index, txhash in enumerate(hashes)
+            ]
+            if full
+            else hashes,
+            "uncles": [],
+        }
+
+    def transaction(
+        self, txhash: str, number: Optional[int] = None, index: int = 0
+    ) -> dict:
+        if number is None:
+            number = self.block_of_hash(txhash)
+        return {
+            "hash": txhash,
+            "blockHash": self.block_hash(number),
+            "blockNumber": hex(number),
+            "transactionIndex": hex(index),
+            "from": fake_address("from", txhash),
+            "to": fake_address("to", txhash),
+            "value": hex(int(txhash[-8:], 16) * 10**9),
+            "gas": hex(21000),
+            "gasPrice": hex(2 * 10**10),
+            "nonce": hex(index),
+            "input": "0x",
+        }
+
+    def receipt(self, txhash: str) -> dict:
+        number = self.block_of_hash(txhash)
+        sender, receiver = fake_address("from", txhash), fake_address("to", txhash)
+        return {
+            "transactionHash": txhash,
+            "blockHash": self.block_hash(number),
+            "blockNumber": hex(number),
+            "transactionIndex": "0x0",
+            "from": sender,
+            "to": receiver,
+            "status": "0x1",
+            "gasUsed": hex(21000),
+            "cumulativeGasUsed": hex(21000),
+            "effectiveGasPrice": hex(2 * 10**10),
+            "contractAddress": None,
+            "logs": [
+                {
+                    "address": fake_address("token", txhash),
+                    "topics": [TRANSFER_TOPIC, topic_of(sender), topic_of(receiver)],
+                    "data": "0x" + txhash[-8:].rjust(64, "0"),
+                    "blockNumber": hex(number),
+                    "transactionHash": txhash,
+                    "transactionIndex": "0x0",
+                    "blockHash": self.block_hash(number),
+                    "logIndex": "0x0",
+                    "removed": False,
+                }
+            ],
+        }
+
+    def record_block(self, index: int) -> int:
+        return 1 + (index // self.records_per_block) * self.spacing
+
+    def record_range(self, start_block: int, end_block: int) -> Tuple[int, int]:
+        """
+        Returns the [first, last) indices of an address's records mined in the block range.
+        """
+        per_block, spacing = self.records_per_block, self.spacing
+        first_group = max(-(-(start_block - 1) // spacing), 0)
+        if end_block < 1:
+            return 0, 0
+        last_group = (end_block - 1) // spacing
+        first = min(first_group * per_block, self.records_per_address)
+        last = min((last_group + 1) * per_block, self.records_per_address)
+        return first, max(first, last)
+
+    def record(self, action: str, address: str, index: int) -> dict:
+        number = self.record_block(index)
+        txhash = fake_hash(action, address, index)
+        counterparty = fake_address("counterparty", address, index)
+        sender, receiver = (
+            (address, counterparty) if index % 2 else (counterparty, address)
+        )
+        if action == "getLogs":
+            return {
+                "address": address,
+                "topics": [TRANSFER_TOPIC, topic_of(sender), topic_of(receiver)],
+                "data": "0x" + hex(index * 10**15)[2:].rjust(64, "0"),
+                "blockNumber": hex(number),
+                "blockHash": self.block_hash(number),
+                "timeStamp": hex(self.timestamp(number)),
+                "gasPrice": hex(2 * 10**10),
+                "gasUsed": hex(52000),
+                "logIndex": quantity(index % self.records_per_block),
+                "transactionHash": txhash,
+                "transactionIndex": quantity(index % 200),
+            }
+        common = {
+            "blockNumber": str(number),
+            "timeStamp": str(self.timestamp(number)),
+            "hash": txhash,
+            "from": sender,
+            "to": receiver,
+        }
+        if action == "txlistinternal":
+            return {
+                **common,
+                "value": str(index * 10**15),
+                "contractAddress": "",
+                "input": "",
+                "type": "call",
+                "gas": "2300",
+                "gasUsed": "0",
+                "traceId": "0",
+                "isError": "0",
+                "errCode": "",
+            }
+        common.update(
+            {
+                "nonce": str(index),
+                "blockHash": self.block_hash(number),
+                "transactionIndex": str(index % 200),
+                "gas": "60000",
+                "gasPrice": str(2 * 10**10),
+                "gasUsed": "52000",
+                "cumulativeGasUsed": str(52000 * (index % 200 + 1)),
+                "confirmations": str(max(self.head - number, 0)),
+            }
+        )
+        if action == "txlist":
+            return {
+                **common,
+                "value": str(index * 10**15),
+                "isError": "0",
+                "txreceipt_status": "1",
+                "input": "0x",
+                "contractAddress": "",
+                "methodId": "0x",
+                "functionName": "",
+            }
+        token = {
+            **common,
+            "contractAddress": fake_address("token", action, index % 4),
+            "input": "deprecated",
+            "tokenName": f"Mock Token {index % 4}",
+            "tokenSymbol": f"MOCK{index % 4}",
+        }
+        if action == "tokentx":
+            return {**token, "value": str(index * 10**15), "tokenDecimal": "18"}
+        if action == "tokennfttx":
+            return {**token, "tokenID": str(index), "tokenDecimal": "0"}
+        return {**token, "tokenID": str(index), "tokenValue": str(index % 7 + 1)}
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    """
+    Threaded server with a listen backlog deep enough for many concurrent clients, the default of 5 makes the kernel
+    drop connection attempts and the clients wait for SYN retransmits.
+    """
+
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MockEtherscan(object):
+    """
+    Local stand-in for the Etherscan api serving a MockChain over HTTP, for tests and benchmarks without a key or the
+    network, see benchmarks.
+
+    Every module/action used by the endpoint wrappers answers with the api envelope (GET and form POST alike) and a
+    JSON-RPC node for the proxy batch methods is served at `rpc_url`. Each call is delayed by `latency` seconds, or a
+    uniform draw from a (min, max) range, a fraction `error_rate` of calls fails with HTTP 503, each api key may make
+    `calls_per_second` calls per second before it receives "Max rate limit reached", and result windows beyond
+    `max_records` are refused like the api does. When `keys` is given any other key is rejected as invalid.
+
+        with MockEtherscan(latency=0.01) as server:
+            connector = Connector("key", server.url, calls_per_second=None)
+    """
+
+    def __init__(
+        self,
+        chain: Optional[MockChain] = None,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        calls_per_second: Optional[float] = None,
+        max_records: int = 10000,
+        keys: Optional[List[str]] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.chain = chain if chain is not None else MockChain()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls_per_second = calls_per_second
+        self.max_records = max_records
+        self.keys = set(keys) if keys is not None else None
+        self.host = host
+        self.port = port
+        self.config = {
+            "chain": self.chain,
+            "latency": latency,
+            "error_rate": error_rate,
+            "calls_per_second": calls_per_second,
+            "max_records": max_records,
+            "keys": keys,
+            "seed": seed,
+            "host": host,
+            "port": port,
+        }
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: Dict[str, Deque[float]] = {}
+        self._server: Optional[MockHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._actions: Dict[Tuple[str, str], Callable[[Params], dict]] = {
+            ("account", "balance"): self._balance,
+            ("account", "balancemulti"): self._balancemulti,
+            ("account", "txlist"): self._records,
+            ("account", "txlistinternal"): self._records,
+            ("account", "tokentx"): self._records,
+            ("account", "tokennfttx"): self._records,
+            ("account", "token1155tx"): self._records,
+            ("account", "getminedblocks"): self._getminedblocks,
+            ("account", "tokenbalance"): self._balance,
+            ("contract", "getabi"): self._getabi,
+            ("contract", "getsourcecode"): self._getsourcecode,
+            ("contract", "getcontractcreation"): self._getcontractcreation,
+            ("contract", "verifysourcecode"): self._submit,
+            ("contract", "checkverifystatus"): self._checkverifystatus,
+            ("contract", "verifyproxycontract"): self._submit,
+            ("contract", "checkproxyverification"): self._checkproxyverification,
+            ("transaction", "getstatus"): self._getstatus,
+            ("transaction", "gettxreceiptstatus"): self._gettxreceiptstatus,
+            ("block", "getblockreward"): self._getblockreward,
+            ("block", "getblockcountdown"): self._getblockcountdown,
+            ("block", "getblocknobytime"): self._getblocknobytime,
+            ("logs", "getLogs"): self._getlogs,
+            ("gastracker", "gasestimate"): self._gasestimate,
+            ("gastracker", "gasoracle"): self._gasoracle,
+            ("stats", "ethsupply"): self._ethsupply,
+            ("stats", "ethsupply2"): self._ethsupply2,
+            ("stats", "ethprice"): self._ethprice,
+            ("stats", "chainsize"): self._chainsize,
+            ("stats", "nodecount"): self._nodecount,
+            ("stats", "tokensupply"): self._tokensupply,
+        }
+        self._rpc: Dict[str, Callable[[Params], Any]] = {
+            "eth_blockNumber": lambda params: hex(self.chain.head),
+            "eth_getBlockByNumber": lambda params: self.chain.block(
+                self.chain.resolve(params.get("tag")), is_true(params.get("boolean"))
+            ),
+            "eth_getUncleByBlockNumberAndIndex": lambda params: None,
+            "eth_getBlockTransactionCountByNumber": lambda params: hex(
+                self.chain.transactions_per_block
+            ),
+            "eth_getTransactionByHash": lambda params: self.chain.transaction(
+                params["txhash"]
+            ),
+            "eth_getTransactionByBlockNumberAndIndex": self._transaction_by_index,
+            "eth_getTransactionCount": lambda params: hex(
+                self.chain.records_per_address
+            ),
+            "eth_sendRawTransaction": lambda params: fake_hash("raw", params["hex"]),
+            "eth_getTransactionReceipt": lambda params: self.chain.receipt(
+                params["txhash"]
+            ),
+            "eth_call": self._eth_call,
+            "eth_getCode": lambda params: "0x"
+            + fake_hash("code", params["address"])[2:],
+            "eth_getStorageAt": lambda params: fake_hash(
+                "storage", params["address"], params["position"]
+            ),
+            "eth_gasPrice": lambda params: hex(2 * 10**10),
+            "eth_estimateGas": lambda params: hex(21000),
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    @property
+    def rpc_url(self) -> str:
+        return f"http://{self.host}:{self.port}/rpc"
+
+    def start(self) -> "MockEtherscan":
+        mock = self
+
+        class Handler(MockHandler):
+            server_mock = mock
+
+        self._server = MockHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def spawn(self, timeout: float = 10.0) -> "MockEtherscan":
+        """
+        Serves from a child process instead of a thread, so that the server neither competes with the client for the
+        GIL nor shows up in its memory profile. `calls` is not updated in this mode.
+        """
+        ready: multiprocessing.Queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=serve, args=(self.config, ready), daemon=True
+        )
+        self._process.start()
+        self.port = ready.get(timeout=timeout)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockEtherscan":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    def fails(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def limited(self, key: str) -> bool:
+        if self.calls_per_second is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.setdefault(key, deque())
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.calls_per_second:
+                return True
+            recent.append(now)
+            return False
+
+    def handle(self, params: Params) -> Tuple[int, Any]:
+        """
+        Answers one api call, returns the HTTP status and the JSON body. Performs no I/O and no delay.
+        """
+        module, action = params.get("module"), params.get("action")
+        with self._lock:
+            self.calls[action] += 1
+        if self.fails():
+            return 503, {"error": "Service Temporarily Unavailable"}
+        key = params.get("apikey")
+        if self.keys is not None and key not in self.keys:
+            return 200, failure("Invalid API Key")
+        if self.limited(str(key)):
+            return 200, failure(RATE_LIMITED)
+        if module == "proxy":
+            handler = self._rpc.get(str(action))
+            if handler is None:
+                return 200, failure("Error! Missing Or invalid Action name")
+            if action in ("eth_call", "eth_estimateGas"):
+                params = {
+                    **params,
+                    "call": {"to": params.get("to"), "data": params.get("data")},
+                }
+            return 200, rpc_envelope(handler(params))
+        handler = self._actions.get((str(module), str(action)))  # type: ignore[assignment]
+        if handler is None:
+            return 200, failure("Error! Missing Or invalid Module name or Action name")
+        return 200, handler(params)
+
+    def handle_rpc(self, payload: Any) -> Tuple[int, Any]:
+        """
+        Answers a JSON-RPC request or batch the way a node does.
+        """
+        if self.fails():
+            return 503, {"error": "Service Temporarily Unavailable"}
+        if isinstance(payload, list):
+            return 200, [self._rpc_call(call) for call in payload]
+        return 200, self._rpc_call(payload)
+
+    def _rpc_call(self, call: dict) -> dict:
+        method = call.get("method")
+        with self._lock:
+            self.calls[method] += 1
+        handler = self._rpc.get(method)  # type: ignore[arg-type]
+        if handler is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": call.get("id"),
+                "error": {"code": -32601, "message": "the method does not exist"},
+            }
+        params = dict(zip(RPC_PARAMS[method], call.get("params") or ()))  # type: ignore[index]
+        return rpc_envelope(handler(params), call.get("id"))
+
+    def _page(
+        self, params: Params, total: int, build: Callable[[int], dict], empty: str
+    ) -> dict:
+        page, offset = int(params.get("page") or 1), int(params.get("offset") or 10000)
+        if page * offset > self.max_records:
+            return failure(WINDOW_TOO_LARGE + str(self.max_records))
+        first = (page - 1) * offset
+        indices = range(first, min(first + offset, total))
+        if not indices:
+            return failure([], empty)
+        return envelope([build(index) for index in indices])
+
+    def _records(self, params: Params) -> dict:
+        if params.get("txhash"):
+            record = self.chain.record("txlistinternal", params["txhash"], 0)
+            number = self.chain.block_of_hash(params["txhash"])
+            return envelope(
+                [{**record, "hash": params["txhash"], "blockNumber": str(number)}]
+            )
+        action, address = (
+            params["action"],
+            params.get("address") or params.get("contractaddress") or "",
+        )
+        first, last = self.chain.record_range(
+            int(params.get("startblock") or 0),
+            int(params.get("endblock") or self.chain.head),
+        )
+        descending = params.get("sort") == "desc"
+        return self._page(
+            params,
+            last - first,
+            lambda i: self.chain.record(
+                action, address, last - 1 - i if descending else first + i
+            ),
+            "No transactions found",
+        )
+
+    def _getlogs(self, params: Params) -> dict:
+        address = params.get("address") or ""
+        first, last = self.chain.record_range(
+            self.chain.resolve(params.get("fromBlock") or 0),
+            self.chain.resolve(params.get("toBlock") or "latest"),
+        )
+        offset = min(int(params.get("offset") or MAX_LOGS_PER_PAGE), MAX_LOGS_PER_PAGE)
+        records = (
+            self.chain.record("getLogs", address, first + i)
+            for i in range(last - first)
+        )
+        matching = [
+            record for record in records if self._topics_match(params, record["topics"])
+        ]
+        return self._page(
+            {**params, "offset": offset},
+            len(matching),
+            matching.__getitem__,
+            "No records found",
+        )
+
+    @staticmethod
+    def _topics_match(params: Params, topics: List[str]) -> bool:
+        result: Optional[bool] = None
+        previous: Optional[int] = None
+        for position in range(4):
+            wanted = params.get(f"topic{position}")
+            if wanted is None:
+                continue
+            match = (
+                position < len(topics) and topics[position].lower() == wanted.lower()
+            )
+            if result is None:
+                result = match
+            elif params.get(f"topic{previous}_{position}_opr", "and") == "or":
+                result = result or match
+            else:
+                result = result and match
+            previous = position
+        return True if result is None else result
+
+    @staticmethod
+    def _amount(*parts: Any) -> str:
+        return str(int(fake_hash("amount", *parts)[2:14], 16) * 10**6)
+
+    def _balance(self, params: Params) -> dict:
+        return envelope(
+            self._amount(params.get("contractaddress"), params.get("address"))
+        )
+
+    def _balancemulti(self, params: Params) -> dict:
+        addresses = params.get("address") or ""
+        if isinstance(addresses, str):
+            addresses = addresses.split(",")
+        return envelope(
+            [
+                {"account": address, "balance": self._amount(None, address)}
+                for address in addresses
+            ]
+        )
+
+    def _getminedblocks(self, params: Params) -> dict:
+        return self._page(
+            params,
+            self.chain.records_per_address // 10,
+            lambda i: {
+                "blockNumber": str(self.chain.record_block(i * 10)),
+                "timeStamp": str(self.chain.timestamp(self.chain.record_block(i * 10))),
+                "blockReward": "2000000000000000000",
+            },
+            "No transactions found",
+        )
+
+    def _getabi(self, params: Params) -> dict:
+        return envelope(json.dumps(ERC20_ABI))
+
+    def _getsourcecode(self, params: Params) -> dict:
+        return envelope(
+            [
+                {
+                    "SourceCode": "// SPDX-License-Identifier: MIT",
+                    "ABI": json.dumps(ERC20_ABI),
+                    "ContractName": "MockToken",
+                    "CompilerVersion": "v0.8.19+commit.7dd6d404",
+                    "OptimizationUsed": "1",
+                    "Runs": "200",
+                    "ConstructorArguments": "",
+                    "EVMVersion": "Default",
+                    "Library": "",
+                    "LicenseType": "MIT",
+                    "Proxy": "0",
+                    "Implementation": "",
+                    "SwarmSource": "",
+                }
+            ]
+        )
+
+    def _getcontractcreation(self, params: Params) -> dict:
+        addresses = params.get("contractaddresses") or []
+        if isinstance(addresses, str):
+            addresses = addresses.split(",")
+        return envelope(
+            [
+                {
+                    "contractAddress": address,
+                    "contractCreator": fake_address("creator", address),
+                    "txHash": fake_hash("creation", address),
+                }
+                for address in addresses
+            ]
+        )
+
+    def _submit(self, params: Params) -> dict:
+        return envelope(fake_hash("guid", sorted(params.items()))[2:52])
+
+    def _checkverifystatus(self, params: Params) -> dict:
+        return envelope("Pass - Verified")
+
+    def _checkproxyverification(self, params: Params) -> dict:
+        return envelope(
+            "The proxy's implementation contract is found and is successfully updated."
+        )
+
+    def _getstatus(self, params: Params) -> dict:
+        return envelope({"isError": "0", "errDescription": ""})
+
+    def _gettxreceiptstatus(self, params: Params) -> dict:
+        return envelope({"status": "1"})
+
+    def _getblockreward(self, params: Params) -> dict:
+        number = int(params.get("blockno") or 0)
+        return envelope(
+            {
+                "blockNumber": str(number),
+                "timeStamp": str(self.chain.timestamp(number)),
+                "blockMiner": fake_address("miner", number % 16),
+                "blockReward": "2000000000000000000",
+                "uncles": [],
+                "uncleInclusionReward": "0",
+            }
+        )
+
+    def _getblockcountdown(self, params: Params) -> dict:
+        number = int(params.get("blockno") or 0)
+        if number <= self.chain.head:
+            return failure("Error! Block number already pass")
+        remaining = number - self.chain.head
+        return envelope(
+            {
+                "CurrentBlock": str(self.chain.head),
+                "CountdownBlock": str(number),
+                "RemainingBlock": str(remaining),
+                "EstimateTimeInSec": str(remaining * self.chain.block_time),
+            }
+        )
+
+    def _getblocknobytime(self, params: Params) -> dict:
+        number = self.chain.block_at(
+            int(params.get("timestamp") or 0), params.get("closest", "before")
+        )
+        if number is None:
+            return failure("Error! No closest block found")
+        return envelope(str(number))
+
+    def _gasestimate(self, params: Params) -> dict:
+        # confirmation time inversely proportional to the price, 3 minutes at the proposed 20 gwei
+        gas_price = max(int(params.get("gasprice") or 1), 1)
+        return envelope(str(max(12, 180 * 20 * 10**9 // gas_price)))
+
+    def _gasoracle(self, params: Params) -> dict:
+        return envelope(
+            {
+                "LastBlock": str(self.chain.head),
+                "SafeGasPrice": "18",
+                "ProposeGasPrice": "20",
+                "FastGasPrice": "24",
+                "suggestBaseFee": "17.5",
+                "gasUsedRatio": "0.45,0.52,0.61,0.38,0.5",
+            }
+        )
+
+    def _ethsupply(self, params: Params) -> dict:
+        return envelope("120000000000000000000000000")
+
+    def _ethsupply2(self, params: Params) -> dict:
+        return envelope(
+            {
+                "EthSupply": "120000000000000000000000000",
+                "Eth2Staking": "3000000000000000000000000",
+                "BurntFees": "4000000000000000000000000",
+                "WithdrawnTotal": "1000000000000000000000000",
+            }
+        )
+
+    def _ethprice(self, params: Params) -> dict:
+        now = str(int(time.time()))
+        return envelope(
+            {
+                "ethbtc": "0.05",
+                "ethbtc_timestamp": now,
+                "ethusd": "3000.00",
+                "ethusd_timestamp": now,
+            }
+        )
+
+    def _chainsize(self, params: Params) -> dict:
+        return envelope(
+            [
+                {
+                    "blockNumber": str(self.chain.head),
+                    "chainTimeStamp": params.get("startdate"),
+                    "chainSize": "1180000000000",
+                    "clientType": params.get("clienttype"),
+                    "syncMode": params.get("syncmode"),
+                }
+            ]
+        )
+
+    def _nodecount(self, params: Params) -> dict:
+        return envelope(
+            {
+                "UTCDate": time.strftime("%Y-%m-%d", time.gmtime()),
+                "TotalNodeCount": "6000",
+            }
+        )
+
+    def _tokensupply(self, params: Params) -> dict:
+        return envelope("21000000000000000000000000")
+
+    def _transaction_by_index(self, params: Params) -> dict:
+        number = self.chain.resolve(params.get("tag"))
+        index = int(params.get("index") or "0x0", 16)
+        return self.chain.transaction(
+            self.chain.transaction_hash(number, index), number, index
+        )
+
+    def _eth_call(self, params: Params) -> str:
+        call = params.get("call") or {}
+        to, data = str(call.get("to")), str(call.get("data"))
+        if to.lower() == MULTICALL3.lower() and data.startswith(AGGREGATE3):
+            return "0x" + encode_tuples(
+                [
+                    ((1,), self._call_result(inner["target"], inner["callData"]))
+                    for inner in decode_aggregate3_calls(data)
+                ]
+            )
+        return self._call_result(to, data)
+
+    @staticmethod
+    def _call_result(to: str, data: str) -> str:
+        return "0x" + fake_hash("call", to.lower(), data)[2:].rjust(64, "0")
+
+
+def serve(config: dict, ready: "multiprocessing.Queue"):
+    """
+    Runs a MockEtherscan until the process is terminated, reporting its port on `ready`, see MockEtherscan.spawn.
+    """
+    server = MockEtherscan(**config).start()
+    ready.put(server.port)
+    server._thread.join()  # type: ignore[union-attr]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of MockEtherscan, keeps connections alive like the real api.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, Nagle would hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+    server_mock: MockEtherscan
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):  # noqa
+        self._respond(self._params())
+
+    def do_POST(self):  # noqa
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path.endswith("/rpc"):
+            time.sleep(self.server_mock.delay())
+            self._send(*self.server_mock.handle_rpc(json.loads(body or b"null")))
+            return
+        params = self._params()
+        for key, value in parse_qsl(body.decode()):
+            params[key] = value
+        self._respond(params)
+
+    def _params(self) -> Params:
+        params: Params = {}
+        for key, value in parse_qsl(urlparse(self.path).query):
+            if key in params:
+                previous = params[key]
+                params[key] = (
+                    previous if isinstance(previous, list) else [previous]
+                ) + [value]
+            else:
+                params[key] = value
+        return params
+
+    def _respond(self, params: Params):
+        time.sleep(self.server_mock.delay())
+        self._send(*self.server_mock.handle(params))
+
+    def _send(self, status: int, body: Any):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,233 @@
+from decimal import Decimal
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import TypeVar
+
+from .utils import to_decimal
+from .utils import to_int
+
+M = TypeVar("M", bound="Model")
+
+
+def _int(raw: Any) -> Optional[int]:
+    return None if raw is None or raw == "" else to_int(raw)
+
+
+def _flag(raw: Any) -> Optional[bool]:
+    return None if raw is None or raw == "" else bool(to_int(raw))
+
+
+class Field(object):
+    """
+    Model attribute holding the raw api value until first accessed, it is then decoded once and the decoded value
+    replaces the raw one.
+    """
+
+    __slots__ = ("key", "decode", "bit", "slot")
+
+    def __init__(self, key: str, decode: Optional[Callable[[Any], Any]] = None):
+        self.key = key
+        self.decode = decode
+        self.bit = 0
+        self.slot: Any = None
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if self.decode is None or instance._decoded & self.bit:
+            return value
+        value = self.decode(value)
+        self.slot.__set__(instance, value)
+        instance._decoded |= self.bit
+        return value
+
+
+class _ModelMeta(type):
+    """
+    Turns the Field declarations of a model into __slots__, one private slot per field.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields = [
+            (key, value) for key, value in namespace.items() if isinstance(value, Field)
+        ]
+        namespace["__slots__"] = tuple(f"_{key}" for key, _ in fields) + (
+            ("_decoded",) if fields else ()
+        )
+        cls = super().__new__(mcs, name, bases, namespace)
+        for i, (key, field) in enumerate(fields):
+            field.bit = 1 << i
+            field.slot = getattr(cls, f"_{key}")
+        cls._fields = tuple(fields)
+        return cls
+
+
+class Model(metaclass=_ModelMeta):
+    """
+    Compact, typed view of an api record. Fields are stored in __slots__ and decoded lazily, integers (block
+    numbers, timestamps, wei amounts, ...) as exact Python ints whether the api sent decimal or hex strings.
+    """
+
+    _fields: Tuple[Tuple[str, Field], ...] = ()
+
+    @classmethod
+    def from_dict(cls: Type[M], record: Dict[str, Any]) -> M:
+        instance = cls.__new__(cls)
+        for _, field in cls._fields:
+            field.slot.__set__(instance, record.get(field.key))
+        instance._decoded = 0  # type: ignore[attr-defined]
+        return instance
+
+    @classmethod
+    def from_records(cls: Type[M], records: Iterable[Dict[str, Any]]) -> Iterator[M]:
+        """
+        Lazily wraps records, e.g. the output of an iter_* method or the result list of a response.
+        """
+        return map(cls.from_dict, records)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name, _ in self._fields}
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name, _ in self._fields[:3]
+        )
+        return f"{type(self).__name__}({fields}, ...)"
+
+
+class Transaction(Model):
+    """
+    A transaction from Accounts.txlist/txlistinternal or Proxy.eth_getTransactionByHash.
+    """
+
+    block_number = Field("blockNumber", _int)
+    timestamp = Field("timeStamp", _int)
+    hash = Field("hash")
+    block_hash = Field("blockHash")
+    transaction_index = Field("transactionIndex", _int)
+    nonce = Field("nonce", _int)
+    from_address = Field("from")
+    to_address = Field("to")
+    contract_address = Field("contractAddress")
+    value = Field("value", _int)
+    gas = Field("gas", _int)
+    gas_price = Field("gasPrice", _int)
+    gas_used = Field("gasUsed", _int)
+    cumulative_gas_used = Field("cumulativeGasUsed", _int)
+    input = Field("input")
+    is_error = Field("isError", _flag)
+    receipt_status = Field("txreceipt_status", _flag)
+
+    @property
+    def value_ether(self) -> Decimal:
+        return to_decimal(self.value)
+
+
+class TokenTransfer(Model):
+    """
+    A token transfer from Accounts.tokentx/tokennfttx/token1155tx.
+    """
+
+    block_number = Field("blockNumber", _int)
+    timestamp = Field("timeStamp", _int)
+    hash = Field("hash")
+    block_hash = Field("blockHash")
+    transaction_index = Field("transactionIndex", _int)
+    nonce = Field("nonce", _int)
+    from_address = Field("from")
+    to_address = Field("to")
+    contract_address = Field("contractAddress")
+    value = Field("value", _int)
+    token_id = Field("tokenID", _int)
+    token_value = Field("tokenValue", _int)
+    token_name = Field("tokenName")
+    token_symbol = Field("tokenSymbol")
+    token_decimal = Field("tokenDecimal", _int)
+    gas = Field("gas", _int)
+    gas_price = Field("gasPrice", _int)
+    gas_used = Field("gasUsed", _int)
+
+    @property
+    def amount(self) -> Decimal:
+        """
+        Exact ERC-20 amount in whole tokens.
+        """
+        return to_decimal(self.value, self.token_decimal or 0)
+
+
+class Log(Model):
+    """
+    An event log from Logs.getLogs or a receipt.
+    """
+
+    address = Field("address")
+    topics = Field("topics")
+    data = Field("data")
+    block_number = Field("blockNumber", _int)
+    block_hash = Field("blockHash")
+    timestamp = Field("timeStamp", _int)
+    log_index = Field("logIndex", _int)
+    transaction_hash = Field("transactionHash")
+    transaction_index = Field("transactionIndex", _int)
+    gas_price = Field("gasPrice", _int)
+    gas_used = Field("gasUsed", _int)
+    removed = Field("removed")
+
+
+def _logs(raw: Optional[List[Dict[str, Any]]]) -> Optional[List[Log]]:
+    return None if raw is None else list(Log.from_records(raw))
+
+
+def _transactions(raw: Optional[List[Any]]) -> Optional[List[Any]]:
+    if raw is None:
+        return None
+    return [Transaction.from_dict(tx) if isinstance(tx, dict) else tx for tx in raw]
+
+
+class Receipt(Model):
+    """
+    A transaction receipt from Proxy.eth_getTransactionReceipt.
+    """
+
+    transaction_hash = Field("transactionHash")
+    transaction_index = Field("transactionIndex", _int)
+    block_number = Field("blockNumber", _int)
+    block_hash = Field("blockHash")
+    from_address = Field("from")
+    to_address = Field("to")
+    contract_address = Field("contractAddress")
+    status = Field("status", _flag)
+    gas_used = Field("gasUsed", _int)
+    cumulative_gas_used = Field("cumulativeGasUsed", _int)
+    effective_gas_price = Field("effectiveGasPrice", _int)
+    type = Field("type", _int)
+    logs = Field("logs", _logs)
+
+
+class Block(Model):
+    """
+    A block from Proxy.eth_getBlockByNumber, transactions are hashes or Transaction models depending on the boolean
+    flag of the call.
+    """
+
+    number = Field("number", _int)
+    hash = Field("hash")
+    parent_hash = Field("parentHash")
+    timestamp = Field("timestamp", _int)
+    miner = Field("miner")
+    gas_limit = Field("gasLimit", _int)
+    gas_used = Field("gasUsed", _int)
+    base_fee_per_gas = Field("baseFeePerGas", _int)
+    size = Field("size", _int)
+    transactions = Field("transactions", _transactions)
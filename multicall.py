@@ -0,0 +1,232 @@
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+from .abi import params_decoder
+from .proxy import Proxy
+
+# Multicall3, deployed at the same address on most EVM chains, see https://www.multicall3.com
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# aggregate3((address target, bool allowFailure, bytes callData)[]) returns ((bool success, bytes returnData)[])
+AGGREGATE3 = "0x82ad56cb"
+
+Call = Tuple[str, str]
+CallResult = Dict[str, Any]
+
+_decode_calls = params_decoder(
+    [
+        {
+            "name": "calls",
+            "type": "tuple[]",
+            "components": [
+                {"name": "target", "type": "address"},
+                {"name": "allowFailure", "type": "bool"},
+                {"name": "callData", "type": "bytes"},
+            ],
+        }
+    ]
+)
+_decode_results = params_decoder(
+    [
+        {
+            "name": "results",
+            "type": "tuple[]",
+            "components": [
+                {"name": "success", "type": "bool"},
+                {"name": "returnData", "type": "bytes"},
+            ],
+        }
+    ]
+)
+
+
+def _word(value: int) -> str:
+    return format(value, "064x")
+
+
+def encode_tuples(rows: Sequence[Tuple[Sequence[int], str]]) -> str:
+    """
+    Encodes a one-parameter tuple holding an array of (static words..., bytes) tuples, each row given as the integer
+    values of its static words and its hex bytes.
+    """
+    encoded = []
+    for words, data in rows:
+        data = data[2:] if data.startswith("0x") else data
+        head = "".join(_word(word) for word in words) + _word(32 * (len(words) + 1))
+        encoded.append(
+            head + _word(len(data) // 2) + data.ljust(-(-len(data) // 64) * 64, "0")
+        )
+    offsets, position = [], 32 * len(rows)
+    for element in encoded:
+        offsets.append(_word(position))
+        position += len(element) // 2
+    return _word(32) + _word(len(rows)) + "".join(offsets) + "".join(encoded)
+
+
+def encode_aggregate3(calls: Sequence[Call], allow_failure: bool = True) -> str:
+    return AGGREGATE3 + encode_tuples(
+        [((int(to, 16), int(allow_failure)), data) for to, data in calls]
+    )
+
+
+def decode_aggregate3_calls(calldata: str) -> List[Dict[str, Any]]:
+    return _decode_calls(calldata[10:])["calls"]
+
+
+def decode_aggregate3(data: str) -> List[Dict[str, Any]]:
+    """
+    Decodes the return data of aggregate3 to its [{"success", "returnData"}] results.
+    """
+    return _decode_results(data[2:])["results"]
+
+
+def single(response: Dict[str, Any]) -> CallResult:
+    """
+    Result of a single eth_call response, a JSON-RPC error or an api failure envelope fail the call.
+    """
+    result = response.get("result")
+    if (
+        "error" in response
+        or response.get("status") == "0"
+        or not isinstance(result, str)
+    ):
+        error = response.get("error")
+        message = error.get("message") if isinstance(error, dict) else error or result
+        return {"success": False, "result": message}
+    return {"success": True, "result": result}
+
+
+class Multicall(object):
+    """
+    Performs many eth_call reads with few requests by aggregating them into Multicall3 aggregate3 calls.
+
+    Calls are packed `max_calls` at a time into aggregate calls, which are sent as one JSON-RPC batch when the proxy
+    has an rpc_endpoint, or concurrently otherwise (see Proxy.call_many). Each call may fail on its own. An aggregate
+    call that fails as a whole, e.g. when the chain has no Multicall3, is retried as single calls, so is everything
+    with aggregate=False.
+
+    Results come back in order as {"success": bool, "result": return data or error message}, decode them with
+    Function.decode_output of the matching ABI:
+
+        balance_of = ContractAbi(abi).function("balanceOf")
+        results = Multicall(etherscan.proxy).call([(token, balance_of.selector + owner[2:].rjust(64, "0"))])
+    """
+
+    def __init__(
+        self,
+        proxy: Proxy,
+        address: str = MULTICALL3,
+        max_calls: int = 500,
+        aggregate: bool = True,
+        workers: int = 8,
+    ):
+        self.proxy = proxy
+        self.address = address
+        self.max_calls = max_calls
+        self.aggregate = aggregate
+        self.workers = workers
+
+    def call(self, calls: Iterable[Call], tag: str = "latest") -> List[CallResult]:
+        """
+        Returns the results of eth_call for every (to, data) pair, at the block given by tag.
+        """
+        calls = list(calls)
+        if not self.aggregate:
+            return [
+                single(response)
+                for response in self.proxy.call_many(calls, tag, self.workers)
+            ]
+        batches = self._batches(calls)
+        results = self._results(
+            batches, self.proxy.call_many(self._aggregates(batches), tag, self.workers)
+        )
+        retried = self._retried(batches, results)
+        singles = self.proxy.call_many(retried, tag, self.workers) if retried else []
+        return self._merge(batches, results, singles)
+
+    def _batches(self, calls: List[Call]) -> List[List[Call]]:
+        return [
+            calls[i : i + self.max_calls] for i in range(0, len(calls), self.max_calls)
+        ]
+
+    def _aggregates(self, batches: List[List[Call]]) -> List[Call]:
+        return [(self.address, encode_aggregate3(batch)) for batch in batches]
+
+    @staticmethod
+    def _retried(batches: List[List[Call]], results: List[Any]) -> List[Call]:
+        return [
+            call
+            for batch, result in zip(batches, results)
+            if result is None
+            for call in batch
+        ]
+
+    @staticmethod
+    def _merge(
+        batches: List[List[Call]], results: List[Any], singles: List[Dict[str, Any]]
+    ) -> List[CallResult]:
+        """
+        Flattens the per batch results, taking the single call responses in place of the failed batches.
+        """
+        responses = iter(singles)
+        merged: List[CallResult] = []
+        for batch, result in zip(batches, results):
+            merged.extend(
+                [single(next(responses)) for _ in batch] if result is None else result
+            )
+        return merged
+
+    @staticmethod
+    def _results(
+        batches: List[List[Call]], responses: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Splits the aggregate responses back per call, None for a batch whose aggregate call failed.
+        """
+        results: List[Any] = []
+        for batch, response in zip(batches, responses):
+            try:
+                decoded = decode_aggregate3(response["result"])
+            except (KeyError, TypeError, ValueError, AttributeError):
+                decoded = None
+            if decoded is None or len(decoded) != len(batch):
+                results.append(None)
+                continue
+            results.append(
+                [
+                    {"success": item["success"], "result": item["returnData"]}
+                    for item in decoded
+                ]
+            )
+        return results
+
+
+class AsyncMulticall(Multicall):
+    """
+    Multicall for the AsyncConnector's proxy, call is a coroutine.
+    """
+
+    async def call(  # type: ignore[override]
+        self, calls: Iterable[Call], tag: str = "latest"
+    ) -> List[CallResult]:
+        calls = list(calls)
+        if not self.aggregate:
+            responses = await self.proxy.call_many(calls, tag, self.workers)  # type: ignore[misc]
+            return [single(response) for response in responses]
+        batches = self._batches(calls)
+        results = self._results(
+            batches,
+            await self.proxy.call_many(  # type: ignore[misc]
+                self._aggregates(batches), tag, self.workers
+            ),
+        )
+        retried = self._retried(batches, results)
+        singles = (
+            await self.proxy.call_many(retried, tag, self.workers)  # type: ignore[misc]
+            if retried
+            else []
+        )
+        return self._merge(batches, results, singles)
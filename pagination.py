@@ -0,0 +1,176 @@
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Counter
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from warnings import warn
+
+from .exceptions import EtherscanError
+from .utils import to_int
+
+MAX_RECORDS = 10000
+VOLATILE_FIELDS = ("confirmations",)
+
+Record = Dict[str, object]
+
+
+def result_records(response: dict) -> List[Record]:
+    """
+    Unwraps the list of records from an api response, an empty result ("No transactions found") is an empty list,
+    any other failed status is raised as an EtherscanError.
+    """
+    result = response.get("result")
+    if isinstance(result, list):
+        return result
+    raise EtherscanError(f"{response.get('message')}: {result}")
+
+
+def record_key(record: Record) -> Hashable:
+    """
+    Identity of a record for de-duplication, ignoring fields such as confirmations that change between calls.
+    """
+    return tuple(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in sorted(record.items())
+        if key not in VOLATILE_FIELDS
+    )
+
+
+class BlockPaginator(object):
+    """
+    Walks a block range page by page, re-splitting the range once the api result window cap is reached.
+
+    Etherscan refuses pages beyond `page * offset > 10000`, so once the cap is hit the window restarts at the last
+    block seen (or ends there when sorting descending). Records of that block which were already yielded reappear at
+    the start of the new window and are dropped, each as many times as it was yielded so that identical records of
+    one block (e.g. two equal token transfers of a transaction) survive. Only the keys of the current edge block are
+    remembered so memory stays constant.
+
+    The paginator performs no I/O, `window` gives the next (start_block, end_block, page) to fetch and `feed` takes
+    the fetched records and returns the ones not seen before, see `paginate` and `apaginate`. Records of a streamed
+    page are checked one by one with `accept`, followed by `advance` once the page is exhausted.
+    """
+
+    def __init__(
+        self,
+        start_block: int,
+        end_block: int,
+        offset: int,
+        sort: str = "asc",
+        max_records: int = MAX_RECORDS,
+        block_field: str = "blockNumber",
+        key: Callable[[Record], Hashable] = record_key,
+    ):
+        if offset > max_records:
+            raise ValueError(f"offset can not exceed {max_records}")
+        self.start_block = start_block
+        self.end_block = end_block
+        self.offset = offset
+        self.descending = sort == "desc"
+        self.max_records = max_records
+        self.block_field = block_field
+        self.key = key
+        self.page = 1
+        self.done = start_block > end_block
+        self._edge_block: Optional[int] = None
+        self._edge_keys: Counter[Hashable] = Counter()
+        self._replayed: Counter[Hashable] = Counter()
+
+    def window(self) -> Tuple[int, int, int]:
+        return self.start_block, self.end_block, self.page
+
+    def feed(self, records: List[Record]) -> List[Record]:
+        fresh = [record for record in records if self.accept(record)]
+        self.advance(len(records))
+        return fresh
+
+    def accept(self, record: Record) -> bool:
+        block = to_int(record[self.block_field])  # type: ignore[arg-type]
+        key = self.key(record)
+        if block != self._edge_block:
+            self._edge_block = block
+            self._edge_keys = Counter()
+            self._replayed = Counter()
+        elif self._replayed[key]:
+            self._replayed[key] -= 1
+            return False
+        self._edge_keys[key] += 1
+        return True
+
+    def advance(self, count: int):
+        if count < self.offset:
+            self.done = True
+        elif (self.page + 1) * self.offset > self.max_records:
+            self._restart()
+        else:
+            self.page += 1
+
+    def _restart(self):
+        edge = self._edge_block
+        assert edge is not None
+        window_start = self.end_block if self.descending else self.start_block
+        if edge == window_start:
+            warn(
+                f"block {edge} holds more than {self.max_records} records, "
+                "the remainder of this block can not be retrieved"
+            )
+            edge = edge - 1 if self.descending else edge + 1
+            self._edge_block = None
+            self._edge_keys = Counter()
+        self._replayed = self._edge_keys.copy()
+        if self.descending:
+            self.end_block = edge
+        else:
+            self.start_block = edge
+        self.page = 1
+        self.done = self.start_block > self.end_block
+
+
+def paginate(
+    fetch: Callable[[int, int, int], Union[dict, Iterable[Record]]],
+    paginator: BlockPaginator,
+) -> Iterator[Record]:
+    """
+    Lazily yields every record of a paginated endpoint, `fetch(start_block, end_block, page)` performs one call and
+    returns either the response or a stream of its records, see Transport.stream.
+    """
+    while not paginator.done:
+        page = fetch(*paginator.window())
+        if isinstance(page, dict):
+            yield from paginator.feed(result_records(page))
+            continue
+        count = 0
+        for record in page:
+            count += 1
+            if paginator.accept(record):
+                yield record
+        paginator.advance(count)
+
+
+async def apaginate(
+    fetch: Callable[[int, int, int], Union[Awaitable[dict], AsyncIterable[Record]]],
+    paginator: BlockPaginator,
+) -> AsyncIterator[Record]:
+    """
+    Asynchronous counterpart of `paginate` for wrappers bound to an AsyncTransport.
+    """
+    while not paginator.done:
+        page = fetch(*paginator.window())
+        if not hasattr(page, "__aiter__"):
+            for record in paginator.feed(result_records(await page)):  # type: ignore[misc]
+                yield record
+            continue
+        count = 0
+        async for record in page:  # type: ignore[union-attr]
+            count += 1
+            if paginator.accept(record):
+                yield record
+        paginator.advance(count)
@@ -1,24 +1,96 @@
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from warnings import warn
 
-import requests
-
+from .concurrency import chunked
+from .concurrency import map_ordered
+from .transport import BaseTransport
+from .transport import Transport
 from .utils import convert_wei2ether
 
+# longest calldata (in hex characters) eth_call sends in a query string
+MAX_GET_DATA = 4000
+
+
+def rpc_error(request_id: int, error: Exception) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": -32603, "message": f"{type(error).__name__}: {error}"},
+    }
+
+
+def rpc_requests(method: str, calls: List[list]) -> List[Dict[str, Any]]:
+    """
+    Builds JSON-RPC requests, each identified by its position in `calls`.
+    """
+    return [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, params in enumerate(calls)
+    ]
+
+
+def rpc_results(
+    batches: List[List[Dict[str, Any]]], responses: List[Any]
+) -> List[Dict[str, Any]]:
+    """
+    Matches the responses of JSON-RPC batches back to their requests by id, in request order. A batch that failed as
+    a whole, or a request missing from its batch response, yields an error object in its place.
+    """
+    results: List[Dict[str, Any]] = []
+    for batch, response in zip(batches, responses):
+        if not isinstance(response, list):
+            error = (
+                response
+                if isinstance(response, Exception)
+                else ValueError(f"unexpected batch response: {response}")
+            )
+            results.extend(rpc_error(request["id"], error) for request in batch)
+            continue
+        by_id = {item.get("id"): item for item in response if isinstance(item, dict)}
+        for request in batch:
+            results.append(
+                by_id.get(request["id"])
+                or rpc_error(request["id"], KeyError("missing from batch response"))
+            )
+    return results
+
 
 class Proxy(object):
     """
     Python endpoint wrapper for Geth/Parity Proxy api at etherscan,
     see: https://docs.etherscan.io/api-endpoints/geth-parity-proxy for more details
+
+    The get_* batch methods fan single calls out concurrently under the client's rate limit. When `rpc_endpoint`
+    points at a JSON-RPC node supporting batch requests they are sent there instead, `rpc_batch_size` calls per
+    request.
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self,
+        key: str,
+        endpoint: str,
+        transport: Optional[BaseTransport] = None,
+        rpc_endpoint: Optional[str] = None,
+        rpc_batch_size: int = 100,
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "proxy"}
+        self.rpc_endpoint = rpc_endpoint
+        self.rpc_batch_size = rpc_batch_size
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
+
+    def _post_request(self, data: dict) -> Dict[str, Union[str, float, int]]:
+        return self.transport.post(self.endpoint, data)
 
     def eth_blockNumber(self) -> Dict[str, Union[str, float, int]]:
         """
@@ -137,8 +209,18 @@ class Proxy(object):
     ) -> Dict[str, Union[str, float, int]]:
         """
         Executes a new message call immediately without creating a transaction on the blockchain.
+
+        Calldata too long for a query string is posted instead.
         """
-        schema = {**self.params, "action": "eth_call", "data": data, "tag": tag}
+        schema = {
+            **self.params,
+            "action": "eth_call",
+            "to": to,
+            "data": data,
+            "tag": tag,
+        }
+        if len(data) > MAX_GET_DATA:
+            return self._post_request(schema)
         return self._get_request(schema)
 
     def eth_getCode(
@@ -147,7 +229,12 @@ class Proxy(object):
         """
         Returns code at a given address.
         """
-        schema = {**self.params, "action": "eth_call", "address": address, "tag": tag}
+        schema = {
+            **self.params,
+            "action": "eth_getCode",
+            "address": address,
+            "tag": tag,
+        }
         return self._get_request(schema)
 
     def eth_getStorageAt(
@@ -161,7 +248,7 @@ class Proxy(object):
         warn("This endpoint is still __experimental__ and may have potential issues")
         schema = {
             **self.params,
-            "action": "eth_call",
+            "action": "eth_getStorageAt",
             "address": address,
             "position": position,
             "tag": tag,
@@ -176,7 +263,12 @@ class Proxy(object):
             **self.params,
             "action": "eth_gasPrice",
         }
-        response = self._get_request(schema)
+        return self._gas_price_result(self._get_request(schema), in_wei)
+
+    @staticmethod
+    def _gas_price_result(
+        response: Dict[str, Union[str, float, int]], in_wei: bool
+    ) -> Dict[str, Union[str, float, int]]:
         if not in_wei:
             if "result" in response:
                 response["result"] = convert_wei2ether(response["result"])
@@ -198,3 +290,73 @@ class Proxy(object):
             "gas": gas,
         }
         return self._get_request(schema)
+
+    def get_blocks(
+        self, block_numbers: Iterable[int], boolean: bool = True, workers: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the blocks with the given numbers (e.g. a range), in order. A block that could not be fetched is
+        replaced by a JSON-RPC error object.
+        """
+        return self._batch(
+            "eth_getBlockByNumber",
+            [[hex(number), boolean] for number in block_numbers],
+            workers,
+        )
+
+    def get_transactions(
+        self, txhashes: Iterable[str], workers: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the transactions with the given hashes, in order, see get_blocks.
+        """
+        return self._batch(
+            "eth_getTransactionByHash", [[txhash] for txhash in txhashes], workers
+        )
+
+    def get_receipts(
+        self, txhashes: Iterable[str], workers: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the receipts of the transactions with the given hashes, in order, see get_blocks.
+        """
+        return self._batch(
+            "eth_getTransactionReceipt", [[txhash] for txhash in txhashes], workers
+        )
+
+    def call_many(
+        self, calls: Iterable[Tuple[str, str]], tag: str = "latest", workers: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the results of eth_call for every (to, data) pair, in order, see get_blocks.
+        """
+        return self._batch(
+            "eth_call",
+            [[{"to": to, "data": data}, tag] for to, data in calls],
+            workers,
+            lambda call, tag: self.eth_call(call["to"], call["data"], tag),
+        )
+
+    def _batch(
+        self,
+        method: str,
+        calls: List[list],
+        workers: int,
+        single: Optional[Callable[..., Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Performs the calls, each a list of JSON-RPC params, as one batch or concurrent single calls through `single`
+        (by default the method of the same name, taking the same params).
+        """
+        if self.rpc_endpoint is None:
+            call: Callable[..., Any] = single or getattr(self, method)
+            return map_ordered(lambda args: call(*args), calls, workers, rpc_error)
+        rpc_endpoint: str = self.rpc_endpoint
+        batches = chunked(rpc_requests(method, calls), self.rpc_batch_size)
+        responses = map_ordered(
+            lambda batch: self.transport.post_json(rpc_endpoint, batch),
+            batches,
+            workers,
+            lambda _, error: error,
+        )
+        return rpc_results(batches, responses)
@@ -0,0 +1,104 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Callable
+from typing import Optional
+
+from .exceptions import DailyQuotaExceeded
+
+SECONDS_PER_DAY = 86400
+
+
+class RateLimiter(object):
+    """
+    Token bucket rate limiter honouring the per second and per day call limits of an api key,
+    see: https://docs.etherscan.io/support/rate-limits for the limits of each tier.
+
+    Each call reserves a token under a lock and is told how long to wait for it, callers therefore queue in arrival
+    order and are released at exactly `calls_per_second`. The lock is never held while waiting, which makes the
+    limiter safe to share between threads and between coroutines on an event loop.
+
+    The daily quota is counted per UTC day, a call beyond it raises DailyQuotaExceeded rather than blocking until
+    midnight. Either limit may be None to disable it.
+    """
+
+    def __init__(
+        self,
+        calls_per_second: Optional[float] = 5.0,
+        daily_quota: Optional[int] = None,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        if calls_per_second is not None and calls_per_second <= 0:
+            raise ValueError("calls_per_second must be positive")
+        self.calls_per_second = calls_per_second
+        self.daily_quota = daily_quota
+        self.burst = burst
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last = clock()
+        self._day = int(wall_clock() // SECONDS_PER_DAY)
+        self.calls_today = 0
+
+    def reserve(self) -> float:
+        """
+        Reserves a call and returns the number of seconds the caller has to wait before making it.
+        """
+        with self._lock:
+            self._roll_day()
+            if self.daily_quota is not None and self.calls_today >= self.daily_quota:
+                raise DailyQuotaExceeded(
+                    f"daily quota of {self.daily_quota} calls reached"
+                )
+            self.calls_today += 1
+            if self.calls_per_second is None:
+                return 0.0
+            self._refill()
+            self._tokens -= 1.0
+            if self._tokens >= 0.0:
+                return 0.0
+            return -self._tokens / self.calls_per_second
+
+    def wait_time(self) -> float:
+        """
+        Returns how long a call reserved now would have to wait, without reserving it (math.inf once the daily quota
+        is used up).
+        """
+        with self._lock:
+            self._roll_day()
+            if self.daily_quota is not None and self.calls_today >= self.daily_quota:
+                return math.inf
+            if self.calls_per_second is None:
+                return 0.0
+            self._refill()
+            return max(0.0, (1.0 - self._tokens) / self.calls_per_second)
+
+    def _roll_day(self):
+        day = int(self._wall_clock() // SECONDS_PER_DAY)
+        if day != self._day:
+            self._day = day
+            self.calls_today = 0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            float(self.burst),
+            self._tokens + (now - self._last) * self.calls_per_second,  # type: ignore[operator]
+        )
+        self._last = now
+
+    def acquire(self) -> float:
+        delay = self.reserve()
+        if delay > 0.0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        delay = self.reserve()
+        if delay > 0.0:
+            await asyncio.sleep(delay)
+        return delay
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import time
+from typing import Awaitable
+from typing import Callable
+from typing import FrozenSet
+from typing import Optional
+
+import requests
+
+from .exceptions import KeyRejected
+from .exceptions import RetryError
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+OK = "ok"
+RETRY = "retry"
+FAIL = "fail"
+
+NON_IDEMPOTENT_ACTIONS = frozenset(
+    {"eth_sendRawTransaction", "verifysourcecode", "verifyproxycontract"}
+)
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+RETRYABLE_MESSAGES = ("rate limit", "timeout", "temporarily unavailable")
+FINAL_MESSAGES = ("daily", "invalid api key")
+
+
+def classify_response(response: dict) -> str:
+    """
+    Classifies a decoded response: RETRY for transient api errors such as "Max rate limit reached" or query
+    timeouts, FAIL for any other failed status (including an exhausted daily limit) and OK otherwise.
+    """
+    if not isinstance(response, dict) or response.get("status") != "0":
+        return OK
+    result = response.get("result")
+    if not isinstance(result, str):
+        return OK if isinstance(result, list) else FAIL
+    message = result.lower()
+    if any(marker in message for marker in FINAL_MESSAGES):
+        return FAIL
+    if any(marker in message for marker in RETRYABLE_MESSAGES):
+        return RETRY
+    return FAIL
+
+
+def classify_exception(error: BaseException) -> str:
+    """
+    Classifies an error raised while making a request: RETRY for connection errors, timeouts, undecodable bodies and
+    retryable HTTP status codes or a key rejected by its pool, FAIL otherwise.
+    """
+    if isinstance(error, KeyRejected):
+        return RETRY
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return RETRY if status in RETRYABLE_STATUS_CODES else FAIL
+    if aiohttp is not None and isinstance(error, aiohttp.ClientResponseError):
+        return RETRY if error.status in RETRYABLE_STATUS_CODES else FAIL
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return RETRY
+    if isinstance(error, requests.exceptions.ChunkedEncodingError):
+        return RETRY
+    if aiohttp is not None and isinstance(error, aiohttp.ClientError):
+        return RETRY
+    if isinstance(error, (asyncio.TimeoutError, ValueError)):
+        return RETRY
+    return FAIL
+
+
+class RetryPolicy(object):
+    """
+    Retries transient failures with exponential backoff, full jitter and a total deadline.
+
+    The n-th retry waits a random time up to min(max_backoff, backoff * 2 ** n) seconds, no retry is started once it
+    would end after `deadline` seconds since the first attempt. Non idempotent actions (e.g. eth_sendRawTransaction)
+    are only retried when the api explicitly rejected the call, never after an error that may have happened once the
+    request reached the server.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        deadline: Optional[float] = 120.0,
+        non_idempotent: FrozenSet[str] = NON_IDEMPOTENT_ACTIONS,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.non_idempotent = frozenset(non_idempotent)
+        self._clock = clock
+        self._jitter = jitter
+
+    def delay(self, retry: int) -> float:
+        return self._jitter() * min(self.max_backoff, self.backoff * 2**retry)
+
+    def call(self, request: Callable[[], dict], params: dict) -> dict:
+        start = self._clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = request()
+            except Exception as error:
+                delay = self._next_delay(error, attempt, start, params)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next_delay(response, attempt, start, params)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+
+    async def acall(self, request: Callable[[], Awaitable[dict]], params: dict) -> dict:
+        start = self._clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await request()
+            except Exception as error:
+                delay = self._next_delay(error, attempt, start, params)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next_delay(response, attempt, start, params)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+
+    def _next_delay(
+        self, outcome, attempt: int, start: float, params: dict
+    ) -> Optional[float]:
+        """
+        Returns how long to wait before the next attempt, or None when the outcome is final. A retryable response
+        that can not be retried any more is raised as a RetryError.
+        """
+        failed = isinstance(outcome, BaseException)
+        if failed:
+            if classify_exception(outcome) != RETRY:
+                return None
+            rejected = isinstance(outcome, KeyRejected)
+            if params.get("action") in self.non_idempotent and not rejected:
+                return None
+        elif classify_response(outcome) != RETRY:
+            return None
+        delay = self.delay(attempt)
+        exhausted = attempt >= self.max_attempts or (
+            self.deadline is not None and self._clock() - start + delay > self.deadline
+        )
+        if not exhausted:
+            return delay
+        if failed:
+            return None
+        raise RetryError(
+            f"{params.get('action')} failed after {attempt} attempts: {outcome.get('result')}",
+            outcome,
+        )
@@ -1,7 +1,9 @@
 from typing import Dict
+from typing import Optional
 from typing import Union
 
-import requests
+from .transport import BaseTransport
+from .transport import Transport
 
 
 class Stats(object):
@@ -10,12 +12,15 @@ class Stats(object):
     see: https://docs.etherscan.io/api-endpoints/stats-1 for more details
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self, key: str, endpoint: str, transport: Optional[BaseTransport] = None
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "stats"}
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
 
     def ethsupply(  # noqa
         self,
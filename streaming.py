@@ -0,0 +1,143 @@
+import codecs
+import json
+import re
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+COMPACT_AFTER = 1 << 16
+
+_START, _KEY, _COLON, _VALUE, _ARRAY, _DONE = range(6)
+
+
+class ResultParser(object):
+    """
+    Incremental parser of an api envelope ({"status": ..., "message": ..., "result": [...]}) that returns the
+    elements of the result array as soon as they are complete.
+
+    Chunks of the body are pushed with `feed` as they arrive, each call returns the records completed by that
+    chunk, `close` returns the rest and validates the body. Consumed text is discarded, so memory is bounded by the
+    largest single record rather than the response. A value cut off by the end of a chunk is only decoded again once
+    the text after its start has doubled, so records spanning many chunks still take linear time. Every other member
+    of the envelope ends up in `envelope`, `result_is_list` tells whether "result" was an array (when it was not,
+    e.g. an error message, it is kept in `envelope` too).
+    """
+
+    def __init__(self):
+        self.envelope: Dict[str, Any] = {}
+        self.result_is_list = False
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._needed = 0
+        self._pending: List[str] = []
+        self._pending_size = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        text = self._text.decode(chunk)
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if len(self._buffer) - self._pos + self._pending_size < self._needed:
+            return []
+        self._flush()
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        self._pending.append(self._text.decode(b"", final=True))
+        self._flush()
+        records = self._parse(final=True)
+        if self._state != _DONE or self._skip() != len(self._buffer):
+            raise ValueError("incomplete or invalid api response body")
+        return records
+
+    def _flush(self):
+        self._buffer += "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+
+    def _skip(self) -> int:
+        return WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+
+    def _decode(self, final: bool) -> Optional[Any]:
+        """
+        Decodes the value at the current position, returns a (value,) tuple or None when more data is needed.
+        """
+        available = len(self._buffer) - self._pos
+        if not final and available < self._needed:
+            return None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            self._needed = 2 * available
+            return None
+        if end == len(self._buffer) and not final:
+            # numbers and literals are only known to be complete once followed by a delimiter
+            self._needed = 2 * available
+            return None
+        self._pos = end
+        self._needed = 0
+        return (value,)
+
+    def _parse(self, final: bool) -> List[Any]:
+        records: List[Any] = []
+        buffer = self._buffer
+        while True:
+            self._pos = self._skip()
+            if self._pos >= len(buffer):
+                break
+            char = buffer[self._pos]
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError(f"expected an object, got {char!r}")
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char in ",}":
+                    self._pos += 1
+                    if char == "}":
+                        self._state = _DONE
+                    continue
+                decoded = self._decode(final)
+                if decoded is None:
+                    break
+                self._key = decoded[0]
+                self._state = _COLON
+            elif self._state == _COLON:
+                if char != ":":
+                    raise ValueError(f"expected ':', got {char!r}")
+                self._pos += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._key == "result" and char == "[":
+                    self._pos += 1
+                    self.result_is_list = True
+                    self._state = _ARRAY
+                    continue
+                decoded = self._decode(final)
+                if decoded is None:
+                    break
+                self.envelope[self._key] = decoded[0]  # type: ignore[index]
+                self._state = _KEY
+            elif self._state == _ARRAY:
+                if char in ",]":
+                    self._pos += 1
+                    if char == "]":
+                        self._state = _KEY
+                    continue
+                decoded = self._decode(final)
+                if decoded is None:
+                    break
+                records.append(decoded[0])
+            else:
+                break
+        if self._pos > COMPACT_AFTER:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        return records
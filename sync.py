@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable
+from typing import Counter
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from .accounts import Accounts
+from .concurrency import map_ordered
+from .pagination import Record
+from .utils import to_int
+
+# fields identifying a record of each action: internal calls of a transaction differ by traceId, token transfers,
+# which carry no logIndex, by token, parties and amount
+IDENTITY_FIELDS = {
+    "txlist": ("hash",),
+    "txlistinternal": ("hash", "traceId"),
+    "tokentx": ("hash", "contractAddress", "from", "to", "value"),
+    "tokennfttx": ("hash", "contractAddress", "from", "to", "tokenID"),
+    "token1155tx": ("hash", "contractAddress", "from", "to", "tokenID", "tokenValue"),
+}
+
+SYNCED: Dict[str, Callable[[Accounts, str, int], Iterator[Record]]] = {
+    "txlist": lambda accounts, address, start: accounts.iter_txlist(address, start),
+    "txlistinternal": lambda accounts, address, start: accounts.iter_txlistinternal(
+        start, address=address
+    ),
+    "tokentx": lambda accounts, address, start: accounts.iter_tokentx(
+        None, address, start
+    ),
+    "tokennfttx": lambda accounts, address, start: accounts.iter_tokennfttx(
+        None, address, start
+    ),
+    "token1155tx": lambda accounts, address, start: accounts.iter_token1155tx(
+        None, address, start
+    ),
+}
+
+
+def identity(record: Record, fields: Tuple[str, ...] = ("hash",)) -> str:
+    return "|".join(str(record.get(field, "")) for field in fields)
+
+
+class SyncManager(object):
+    """
+    Keeps address histories up to date incrementally, fetching only the records of blocks not synced yet.
+
+    A high-water mark, the highest block seen, is stored per (address, action) in a local SQLite database. A refresh
+    resumes `overlap` blocks below it, so records of recently reorganised blocks are picked up again, and drops the
+    records of that window it already returned, identified by the fields of IDENTITY_FIELDS. An address without new
+    activity costs one call per action, records removed by a reorg are not reported.
+
+    The mark only moves once a refresh has been consumed entirely, a refresh that is interrupted returns the same
+    records next time. Requires the synchronous Connector's accounts:
+
+        sync = SyncManager(etherscan.accounts)
+        for address, action, records in sync.refresh_all(addresses, ("txlist", "tokentx")):
+            ...
+    """
+
+    def __init__(
+        self,
+        accounts: Accounts,
+        path: str = "pyetherscan_sync.sqlite",
+        overlap: int = 12,
+    ):
+        self.accounts = accounts
+        self.overlap = overlap
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS marks "
+                "(address TEXT, action TEXT, block INTEGER NOT NULL, PRIMARY KEY (address, action))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen "
+                "(address TEXT, action TEXT, block INTEGER, identity TEXT, PRIMARY KEY (address, action, identity))"
+            )
+
+    def mark(self, address: str, action: str) -> Optional[int]:
+        """
+        Returns the highest block synced for the address and action, None when it was never synced.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT block FROM marks WHERE address = ? AND action = ?",
+                (address.lower(), action),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def refresh(
+        self, address: str, action: str = "txlist", start_block: int = 0
+    ) -> Iterator[Record]:
+        """
+        Yields the records of the address not returned by a previous refresh, in block order. `start_block` only
+        applies to the first refresh.
+        """
+        if action not in SYNCED:
+            raise ValueError(f"can not sync {action}, use one of {sorted(SYNCED)}")
+        address = address.lower()
+        mark = self.mark(address, action)
+        start = start_block if mark is None else max(mark - self.overlap + 1, 0)
+        seen = self._seen(address, action, start)
+        highest = mark
+        window: Deque[Tuple[int, str]] = deque()
+        fields = IDENTITY_FIELDS[action]
+        occurrences: Counter[str] = Counter()
+        for record in SYNCED[action](self.accounts, address, start):
+            key = identity(record, fields)
+            # identical records (e.g. two equal transfers of a transaction) are told apart by their order
+            occurrences[key] += 1
+            key = f"{key}|{occurrences[key]}"
+            block = to_int(record["blockNumber"])  # type: ignore[arg-type]
+            highest = block if highest is None else max(highest, block)
+            window.append((block, key))
+            while window and window[0][0] <= highest - self.overlap:
+                window.popleft()
+            if key not in seen:
+                yield record
+        if highest is not None:
+            self._commit(address, action, highest, window)
+
+    def refresh_all(
+        self,
+        addresses: Iterable[str],
+        actions: Iterable[str] = ("txlist",),
+        workers: int = 8,
+    ) -> Iterator[Tuple[str, str, List[Record]]]:
+        """
+        Refreshes every (address, action) on a pool of `workers` threads, yielding (address, action, new records) in
+        input order. Only a few chunks of targets are in flight at a time, so any number of addresses can be given.
+        """
+        actions = list(actions)
+        targets = ((address, action) for address in addresses for action in actions)
+        chunk: List[Tuple[str, str]] = []
+        for target in targets:
+            chunk.append(target)
+            if len(chunk) == workers * 16:
+                yield from self._refresh_chunk(chunk, workers)
+                chunk = []
+        yield from self._refresh_chunk(chunk, workers)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (marks,) = self._connection.execute("SELECT COUNT(*) FROM marks").fetchone()
+            (seen,) = self._connection.execute("SELECT COUNT(*) FROM seen").fetchone()
+        return {"marks": marks, "seen": seen}
+
+    def reset(self, address: str, action: Optional[str] = None):
+        """
+        Forgets the sync state of an address (for one action or all), its next refresh starts over.
+        """
+        condition, params = "address = ?", [address.lower()]
+        if action is not None:
+            condition, params = condition + " AND action = ?", params + [action]
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM marks WHERE {condition}", params)
+            self._connection.execute(f"DELETE FROM seen WHERE {condition}", params)
+
+    def close(self):
+        self._connection.close()
+
+    def _refresh_chunk(
+        self, chunk: List[Tuple[str, str]], workers: int
+    ) -> List[Tuple[str, str, List[Record]]]:
+        results = map_ordered(
+            lambda target: list(self.refresh(*target)), chunk, workers
+        )
+        return [
+            (address, action, records)
+            for (address, action), records in zip(chunk, results)
+        ]
+
+    def _seen(self, address: str, action: str, start: int) -> Set[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT identity FROM seen WHERE address = ? AND action = ? AND block >= ?",
+                (address, action, start),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def _commit(
+        self, address: str, action: str, highest: int, window: Iterable[Tuple[int, str]]
+    ):
+        """
+        Moves the mark and remembers the identities of the records within the overlap below it.
+        """
+        floor = highest - self.overlap + 1
+        rows = [
+            (address, action, block, key) for block, key in window if block >= floor
+        ]
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO marks (address, action, block) VALUES (?, ?, ?)",
+                (address, action, highest),
+            )
+            self._connection.execute(
+                "DELETE FROM seen WHERE address = ? AND action = ? AND block < ?",
+                (address, action, floor),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO seen (address, action, block, identity) VALUES (?, ?, ?, ?)",
+                rows,
+            )
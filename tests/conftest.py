@@ -0,0 +1,22 @@
+import pytest
+
+from ..api import Connector
+from ..mock_server import MockChain
+from ..mock_server import MockEtherscan
+
+
+@pytest.fixture
+def chain():
+    return MockChain(head=1000, records_per_address=50, transactions_per_block=2)
+
+
+@pytest.fixture
+def server(chain):
+    with MockEtherscan(chain) as server:
+        yield server
+
+
+@pytest.fixture
+def connector(server):
+    with Connector("key", server.url, calls_per_second=None) as connector:
+        yield connector
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from ..abi import AbiDecoder
+from ..abi import ContractAbi
+from ..abi import keccak256
+from ..mock_server import ERC20_ABI
+from ..mock_server import fake_address
+from ..mock_server import TRANSFER_TOPIC
+
+TOKEN = fake_address("token")
+UNSUPPORTED = {
+    "type": "function",
+    "name": "callback",
+    "inputs": [{"name": "f", "type": "function"}, {"name": "x", "type": "fixed128x18"}],
+    "outputs": [],
+}
+
+
+class Contracts(object):
+    """
+    Answers getabi with the given responses in turn.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def getabi(self, address):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_keccak256():
+    assert (
+        "0x" + keccak256(b"Transfer(address,address,uint256)").hex() == TRANSFER_TOPIC
+    )
+
+
+def test_decode_logs(connector):
+    decoder = AbiDecoder(connector.contacts)
+    logs = connector.logs.getLogs(TOKEN, 0, 100)["result"]
+    decoded = decoder.decode_logs(logs)
+    assert [entry["event"] for entry in decoded] == ["Transfer"] * len(logs)
+    assert decoded[1]["args"]["value"] == 10**15
+
+
+def test_unsupported_entries_are_left_out():
+    abi = ContractAbi(ERC20_ABI + [UNSUPPORTED])
+    assert set(abi.unsupported) == {"callback"}
+    assert abi.function("balanceOf").signature == "balanceOf(address)"
+    assert abi.events
+
+
+def test_only_not_verified_answers_are_remembered():
+    verified = {"status": "1", "message": "OK", "result": ERC20_ABI}
+    contracts = Contracts(
+        {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"},
+        verified,
+        {
+            "status": "0",
+            "message": "NOTOK",
+            "result": "Contract source code not verified",
+        },
+    )
+    decoder = AbiDecoder(contracts)
+    with pytest.warns(UserWarning, match="getabi of"):
+        assert decoder.abi(TOKEN) is None
+    assert decoder.abi(TOKEN) is not None
+    assert decoder.abi(TOKEN) is not None
+    assert decoder.abi(fake_address("eoa")) is None
+    assert decoder.abi(fake_address("eoa")) is None
+    assert contracts.calls == 3
+
+
+def test_malformed_entries_and_records_are_skipped():
+    abi = ContractAbi(json.dumps(["junk", None] + ERC20_ABI))
+    assert set(abi.functions) == {
+        abi.function("transfer").selector,
+        abi.function("balanceOf").selector,
+    }
+    decoder = AbiDecoder(None, fallback=[ERC20_ABI])
+    transfer = abi.function("transfer").selector + "0" * 128
+    decoded = decoder.decode_transactions(
+        [
+            {"to": TOKEN, "input": transfer},
+            {"to": None, "input": transfer},
+            {"input": "0x"},
+        ]
+    )
+    assert decoded[0]["function"] == "transfer"
+    assert decoded[1:] == [None, None]
+    assert decoder.decode_logs(
+        [{"address": TOKEN, "topics": None}, {"topics": [TRANSFER_TOPIC]}]
+    ) == [None, None]
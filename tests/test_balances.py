@@ -0,0 +1,47 @@
+import pytest
+
+from ..api import Connector
+from ..mock_server import fake_address
+from ..mock_server import MockEtherscan
+from ..retry import RetryPolicy
+
+ADDRESSES = [fake_address("a", i) for i in range(45)]
+
+
+def test_balancemulti_takes_a_list_or_a_string(connector):
+    as_list = connector.accounts.balancemulti(ADDRESSES[:3])
+    as_string = connector.accounts.balancemulti(",".join(ADDRESSES[:3]))
+    assert as_list == as_string
+    assert [record["account"] for record in as_list["result"]] == ADDRESSES[:3]
+
+
+def test_balances_are_chunked(connector, server):
+    balances = connector.accounts.balances(ADDRESSES + ADDRESSES[:5])
+    assert list(balances) == ADDRESSES
+    assert server.calls["balancemulti"] == 3
+
+
+def test_failed_token_balances_are_left_out(chain):
+    pairs = [(fake_address("token"), address) for address in ADDRESSES]
+    with MockEtherscan(chain, error_rate=0.3) as server:
+        policy = RetryPolicy(max_attempts=1)
+        with Connector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            with pytest.warns(UserWarning, match="tokenbalance failed for"):
+                balances = connector.tokens.tokenbalances(pairs)
+    assert 0 < len(balances) < len(pairs)
+    assert all(isinstance(balance, int) for balance in balances.values())
+
+
+def test_failed_balance_chunks_are_left_out(chain):
+    with MockEtherscan(chain, error_rate=0.5, seed=3) as server:
+        policy = RetryPolicy(max_attempts=1)
+        with Connector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            with pytest.warns(UserWarning, match="balancemulti failed for"):
+                balances = connector.accounts.balances(ADDRESSES, chunk_size=5)
+    assert 0 < len(balances) < len(ADDRESSES)
+    assert len(balances) % 5 == 0
+    assert set(balances) <= set(ADDRESSES)
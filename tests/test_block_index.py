@@ -0,0 +1,61 @@
+from ..block_index import BlockTimeIndex
+
+
+def open_index(connector, tmp_path, **kwargs):
+    return BlockTimeIndex(
+        connector.blocks,
+        connector.proxy,
+        str(tmp_path / "blocks.sqlite"),
+        **kwargs,
+    )
+
+
+def test_block_at_learns_from_answers(connector, server, chain, tmp_path):
+    index = open_index(connector, tmp_path)
+    assert index.block_at(chain.timestamp(500) + 1) == 500
+    assert index.block_at(chain.timestamp(500) + 10) == 500
+    calls = server.calls["getblocknobytime"]
+    # both answers bracket the timestamps between them
+    assert index.block_at(chain.timestamp(500) + 5) == 500
+    assert index.block_at(chain.timestamp(500) + 5, "after") == 501
+    assert server.calls["getblocknobytime"] == calls == 2
+    assert index.stats()["local"] == 2
+    index.close()
+
+
+def test_blocks_at_matches_the_api(connector, server, chain, tmp_path):
+    index = open_index(connector, tmp_path)
+    # several timestamps per block, fetching the blocks is cheaper than asking for each
+    timestamps = [chain.timestamp(100) + 5 * i for i in range(500)]
+    for closest in ("before", "after"):
+        expected = [chain.block_at(timestamp, closest) for timestamp in timestamps]
+        assert index.blocks_at(timestamps, closest) == expected
+    stats = index.stats()
+    assert stats["calls"] < len(timestamps) // 2
+    assert server.calls["eth_getBlockByNumber"] > server.calls["getblocknobytime"]
+    assert stats["local"] > len(timestamps)
+    index.close()
+
+
+def test_block_range_and_recorded_blocks(connector, server, chain, tmp_path):
+    index = open_index(connector, tmp_path)
+    assert index.record_blocks(connector.proxy.get_blocks(range(100, 111), False)) == 11
+    assert index.block_range(chain.timestamp(101), chain.timestamp(109) + 3) == (
+        101,
+        109,
+    )
+    assert server.calls["getblocknobytime"] == 0
+    index.close()
+    reopened = open_index(connector, tmp_path)
+    assert reopened.block_at(chain.timestamp(105)) == 105
+    assert server.calls["getblocknobytime"] == 0
+    reopened.close()
+
+
+def test_recent_points_are_not_stored(connector, server, chain, tmp_path):
+    index = open_index(connector, tmp_path, wall_clock=lambda: chain.timestamp(1000))
+    recent = chain.timestamp(990)
+    assert index.block_at(recent) == index.block_at(recent) == 990
+    assert server.calls["getblocknobytime"] == 2
+    assert index.stats()["points"] == 0
+    index.close()
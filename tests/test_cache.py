@@ -0,0 +1,87 @@
+import math
+import time
+
+from ..api import Connector
+from ..cache import CachePolicy
+from ..cache import MemoryCache
+from ..cache import ResponseCache
+
+
+def test_policy():
+    policy = CachePolicy()
+    assert policy.ttl({"module": "contract", "action": "getabi"}) == math.inf
+    assert policy.ttl({"module": "account", "action": "balance"}) is None
+    assert policy.ttl({"module": "gastracker", "action": "gasoracle"}) == 15.0
+    latest = {"module": "proxy", "action": "eth_getBlockByNumber", "tag": "latest"}
+    assert policy.ttl(latest) is None
+
+
+def test_response_cache_answers_repeated_calls(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    with Connector("key", server.url, calls_per_second=None, cache=cache) as c:
+        first = c.contacts.getabi("0xabc")
+        assert c.contacts.getabi("0xabc") == first
+    assert server.calls["getabi"] == 1
+    cache.close()
+
+
+def test_memory_cache_expires():
+    now = [0.0]
+    cache = MemoryCache(clock=lambda: now[0])
+    params = {"module": "gastracker", "action": "gasoracle"}
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"status": "1", "result": {}}
+
+    cache.get_or_load("api", params, load)
+    cache.get_or_load("api", params, load)
+    now[0] = 16.0
+    cache.get_or_load("api", params, load)
+    assert len(loads) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def block_params(number):
+    return {"module": "proxy", "action": "eth_getBlockByNumber", "tag": hex(number)}
+
+
+def test_recent_blocks_are_not_final(server, chain, tmp_path):
+    # recent mock timestamps, so only the confirmation depth makes blocks final
+    chain.genesis_timestamp = int(time.time()) - chain.head * chain.block_time
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    with Connector("key", server.url, calls_per_second=None, cache=cache) as c:
+        c.proxy.eth_getBlockByNumber(hex(990))
+        c.proxy.eth_getBlockByNumber(hex(990))
+        assert server.calls["eth_getBlockByNumber"] == 2
+        c.proxy.eth_blockNumber()
+        assert cache.policy.head == 1000
+        for _ in range(2):
+            c.proxy.eth_getBlockByNumber(hex(900))
+        assert server.calls["eth_getBlockByNumber"] == 3
+    cache.close()
+    assert ResponseCache(str(tmp_path / "cache.sqlite")).policy.head == 1000
+
+
+def test_finality_of_responses():
+    policy = CachePolicy(wall_clock=lambda: 10_000.0)
+    old = {"result": {"number": "0x1", "timestamp": hex(1000)}}
+    recent = {"result": {"number": "0x1", "timestamp": hex(9_500)}}
+    assert policy.ttl(block_params(1), old) == math.inf
+    assert policy.ttl(block_params(1), recent) is None
+    receipt = {"module": "proxy", "action": "eth_getTransactionReceipt"}
+    assert policy.ttl(receipt, {"result": {"blockNumber": "0x1"}}) is None
+    policy.observe({"module": "proxy", "action": "eth_blockNumber"}, {"result": "0x41"})
+    assert policy.ttl(receipt, {"result": {"blockNumber": "0x1"}}) == math.inf
+    assert policy.ttl(receipt, {"result": {"blockNumber": None}}) is None
+    status = {"module": "transaction", "action": "gettxreceiptstatus"}
+    assert policy.ttl(status, {"status": "1", "result": {"status": ""}}) is None
+    assert policy.ttl(status, {"status": "1", "result": {"status": "1"}}) == math.inf
+
+
+def test_memory_cache_keeps_recent_blocks_out():
+    cache = MemoryCache(policy=CachePolicy(wall_clock=lambda: 10_000.0))
+    block = {"result": {"number": "0x1", "timestamp": hex(9_500)}}
+    cache.get_or_load("api", block_params(1), lambda: block)
+    assert cache.stats() == {"entries": 0, "hits": 0, "misses": 1, "coalesced": 0}
@@ -0,0 +1,51 @@
+import pytest
+
+from ..columnar import ColumnBuilder
+from ..columnar import LOG_COLUMNS
+from ..columnar import TRANSACTION_COLUMNS
+from ..mock_server import fake_address
+
+ADDRESS = fake_address("token")
+
+
+def test_log_columns_from_pages(connector):
+    # one log per block, every logIndex is the bare "0x" the api writes for zero
+    records = list(connector.logs.iter_getLogs(ADDRESS, 0, 99999999))
+    builder = ColumnBuilder(LOG_COLUMNS).extend(records)
+    assert builder.rows == len(records) == 50
+    assert set(record["logIndex"] for record in records) == {"0x"}
+    assert list(builder.column("log_index")) == [0] * 50
+    assert list(builder.column("block_number")) == [
+        int(record["blockNumber"], 16) for record in records
+    ]
+    topics = builder.column("topic1")
+    assert bytes(topics[:32]).hex() == records[0]["topics"][1][2:]
+    assert len(builder.column("topic3")) == 50 * 32  # missing topics are zero bytes
+
+
+def test_uint256_round_trip():
+    values = ["0", "1", str(2**64), str(2**256 - 1), "0xff", ""]
+    builder = ColumnBuilder({"value": ("value", "uint256")})
+    builder.extend({"value": value} for value in values)
+    assert builder.uint256("value") == [0, 1, 2**64, 2**256 - 1, 255, 0]
+
+
+def test_transaction_columns(connector):
+    records = connector.accounts.txlist(fake_address("a"), 0, 99999999)["result"]
+    builder = ColumnBuilder(TRANSACTION_COLUMNS).extend(records)
+    assert builder.uint256("value") == [int(record["value"]) for record in records]
+    assert bytes(builder.column("from_address")[:20]).hex() == records[0]["from"][2:]
+
+
+def test_to_numpy(connector):
+    np = pytest.importorskip("numpy")
+    records = connector.accounts.txlist(fake_address("a"), 0, 99999999)["result"]
+    arrays = ColumnBuilder(TRANSACTION_COLUMNS).extend(records).to_numpy()
+    assert arrays["block_number"].dtype == np.int64
+    assert arrays["value"].shape == (len(records), 4)
+    assert arrays["hash"][0] == bytes.fromhex(records[0]["hash"][2:])
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        ColumnBuilder({"value": ("value", "float")})
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from ..async_api import AsyncConnector
+from ..enrichment import AsyncEnricher
+from ..enrichment import Enricher
+from ..enrichment import merge_lookups
+
+
+def hashes(chain, count):
+    return [chain.transaction_hash(900 + i // 2, i % 2) for i in range(count)]
+
+
+def test_records_are_merged_in_order(connector, server, chain):
+    txhashes = hashes(chain, 6)
+    repeated = txhashes + txhashes[:2]
+    enricher = Enricher(connector.proxy, connector.transactions, connector.accounts)
+    records = list(enricher.enrich(repeated))
+    assert [record["hash"] for record in records] == repeated
+    assert all(record["errors"] == {} for record in records)
+    assert all(record["blockHash"] and record["status"] for record in records)
+    assert all(len(record["internalTransactions"]) == 1 for record in records)
+    assert "transactionHash" not in records[0]
+
+
+def test_repeated_hashes_share_their_lookups(connector, server, chain):
+    txhash = hashes(chain, 1)[0]
+    enricher = Enricher(connector.proxy, internal=False, max_in_flight=4)
+    records = list(enricher.enrich([txhash] * 1000))
+    assert len(records) == 1000
+    assert server.calls["eth_getTransactionByHash"] < 1000
+
+
+def test_records_are_not_held_back(connector, chain):
+    pulled = []
+
+    def slow_hashes():
+        for txhash in hashes(chain, 20):
+            pulled.append(txhash)
+            yield txhash
+            time.sleep(0.05)
+
+    enricher = Enricher(connector.proxy, max_in_flight=16)
+    first = next(iter(enricher.enrich(slow_hashes())))
+    assert first["hash"] == pulled[0]
+    assert len(pulled) < 16
+
+
+def test_status_lookup_without_receipts(connector, chain):
+    enricher = Enricher(connector.proxy, connector.transactions, receipts=False)
+    assert set(enricher.lookups) == {"transaction", "status"}
+    (record,) = enricher.enrich(hashes(chain, 1))
+    assert record["status"] == "0x1"
+    assert "logs" not in record
+
+
+def test_failed_lookups_are_listed():
+    record = merge_lookups(
+        "0xab",
+        {
+            "transaction": {"jsonrpc": "2.0", "id": 1, "result": {"nonce": "0x1"}},
+            "receipt": ConnectionError("reset"),
+            "status": {"status": "0", "message": "NOTOK", "result": "Invalid txhash"},
+            "internal": {"status": "0", "message": "NOTOK", "result": "Max rate limit"},
+        },
+    )
+    assert record["nonce"] == "0x1"
+    assert record["internalTransactions"] is None
+    assert record["errors"] == {
+        "receipt": "ConnectionError: reset",
+        "status": "Invalid txhash",
+        "internal": "Max rate limit",
+    }
+
+
+def test_async_enricher(server, chain):
+    txhashes = hashes(chain, 6)
+
+    async def enrich():
+        async with AsyncConnector("key", server.url, calls_per_second=None) as c:
+            enricher = AsyncEnricher(
+                c.proxy, c.transactions, c.accounts, max_in_flight=2
+            )
+            return [record async for record in enricher.enrich(txhashes + txhashes)]
+
+    records = asyncio.run(enrich())
+    assert [record["hash"] for record in records] == txhashes + txhashes
+    assert all(record["errors"] == {} for record in records)
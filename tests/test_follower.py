@@ -0,0 +1,55 @@
+import pytest
+
+from ..follower import ChainFollower
+from ..follower import CONFIRMED
+from ..follower import NEW
+from ..follower import REORGED
+
+
+def follow(follower, chain):
+    events = []
+    while not (follower.caught_up and follower.head == chain.head):
+        events += follower.poll()
+    return events
+
+
+def test_new_and_confirmed_blocks(connector, chain):
+    follower = ChainFollower(connector.proxy, start_block=990, confirmations=3)
+    events = follow(follower, chain)
+    assert [e.number for e in events if e.kind == NEW] == list(range(990, 1001))
+    assert [e.number for e in events if e.kind == CONFIRMED] == list(range(990, 998))
+    assert follower.anchor[0] == 997
+
+
+def test_reorg_unwinds_replaced_blocks(connector, chain):
+    follower = ChainFollower(connector.proxy, start_block=990, confirmations=5)
+    follow(follower, chain)
+    chain.reorg(2)
+    chain.mine(1)
+    events = []
+    for _ in range(5):
+        events += follower.poll()
+    assert [e.number for e in events if e.kind == REORGED] == [1000, 999]
+    assert [block["hash"] for block in follower.unconfirmed] == [
+        chain.block_hash(number) for number in range(997, 1002)
+    ]
+
+
+def test_resumes_from_checkpoint(connector, chain, tmp_path):
+    path = str(tmp_path / "follower.sqlite")
+    follower = ChainFollower(connector.proxy, 990, confirmations=3, checkpoint=path)
+    follow(follower, chain)
+    follower.poll()
+    follower.close()
+    resumed = ChainFollower(connector.proxy, confirmations=3, checkpoint=path)
+    assert resumed.next_block == 998
+
+
+def test_zero_confirmations(connector, chain):
+    follower = ChainFollower(connector.proxy, start_block=995, confirmations=0)
+    events = follow(follower, chain)
+    assert [e.number for e in events if e.kind == CONFIRMED] == list(range(995, 1001))
+    assert not follower.unconfirmed
+    chain.mine(2)
+    assert [e.kind for e in follower.poll()] == [NEW, CONFIRMED, NEW, CONFIRMED]
+    assert follower.block_time == pytest.approx(12)
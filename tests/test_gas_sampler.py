@@ -0,0 +1,58 @@
+import math
+import time
+
+from ..gas_sampler import GasSampler
+
+
+def sampler(connector, now, **kwargs):
+    return GasSampler(
+        connector.gas_tracker, connector.proxy, wall_clock=lambda: now[0], **kwargs
+    )
+
+
+def test_sample(connector, chain):
+    gas = sampler(connector, [1000.0])
+    assert gas.latest() is None
+    sample = gas.sample()
+    assert gas.latest() == sample
+    assert (sample["safe"], sample["propose"], sample["fast"]) == (18, 20, 24)
+    assert sample["block"] == chain.head
+    assert sample["base_fee"] == 17.5
+    assert sample["gas_price"] == 20.0
+    assert (
+        sample["safe_seconds"],
+        sample["propose_seconds"],
+        sample["fast_seconds"],
+    ) == (200, 180, 150)
+
+
+def test_ring_buffer_and_windows(connector, server):
+    now = [0.0]
+    gas = sampler(connector, now, capacity=4, calibrate=False)
+    for _ in range(6):
+        now[0] += 15
+        gas.sample()
+    assert len(gas) == 4
+    assert list(gas.series("timestamp")) == [45, 60, 75, 90]
+    assert list(gas.series("timestamp", window=30)) == [60, 75, 90]
+    assert gas.percentile("fast", 90) == gas.moving_average("fast") == 24
+    assert math.isnan(gas.percentile("fast_seconds", 50))
+    assert server.calls["gasestimate"] == 0
+
+
+def test_estimate_seconds(connector):
+    gas = sampler(connector, [0.0])
+    assert math.isnan(gas.estimate_seconds(20))
+    gas.sample()
+    assert gas.estimates([20, 22, 30]) == [180, 165, 150]
+    assert gas.estimate_seconds(9) == 400  # inversely proportional below the safe tier
+    assert gas.estimate_seconds(0) == math.inf
+
+
+def test_background_sampling(connector, server):
+    with GasSampler(connector.gas_tracker, interval=0.05, calibrate=False) as gas:
+        deadline = time.monotonic() + 5
+        while len(gas) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert len(gas) >= 3
+    assert server.calls["gasoracle"] == len(gas)
@@ -0,0 +1,35 @@
+import pytest
+
+from ..exceptions import DailyQuotaExceeded
+from ..keys import KeyPool
+
+INVALID = {"status": "0", "message": "NOTOK", "result": "Invalid API Key"}
+
+
+def test_single_key_raises_daily_quota_exceeded():
+    pool = KeyPool("a", calls_per_second=None, daily_quota=2)
+    pool.reserve()
+    pool.reserve()
+    for _ in range(2):
+        with pytest.raises(DailyQuotaExceeded):
+            pool.reserve()
+    assert pool.usage()["a"]["ejected_for"] == 0.0
+    assert not pool.report("a", INVALID)
+
+
+def test_calls_move_to_the_keys_left():
+    pool = KeyPool(["a", "b"], calls_per_second=None, daily_quota=2)
+    keys = [pool.reserve()[0] for _ in range(4)]
+    assert sorted(keys) == ["a", "a", "b", "b"]
+    with pytest.raises(DailyQuotaExceeded):
+        pool.reserve()
+    assert [usage["ejected_for"] > 0 for usage in pool.usage().values()].count(
+        True
+    ) == 1
+
+
+def test_rejected_keys_are_ejected_but_not_the_last():
+    pool = KeyPool(["a", "b"], calls_per_second=None)
+    assert pool.report("a", INVALID)
+    assert not pool.report("b", INVALID)
+    assert {pool.reserve()[0] for _ in range(4)} == {"b"}
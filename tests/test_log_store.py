@@ -0,0 +1,27 @@
+from ..log_store import LogStore
+from ..mock_server import fake_address
+from ..mock_server import TRANSFER_TOPIC
+
+ADDRESS = fake_address("token")
+
+
+def test_repeated_queries_are_answered_locally(connector, server, tmp_path):
+    store = LogStore(connector.logs, str(tmp_path / "logs.sqlite"))
+    first = store.getLogs(ADDRESS, 0, 900, topics=[(TRANSFER_TOPIC,)])
+    calls = server.calls["getLogs"]
+    assert store.getLogs(ADDRESS, 100, 500) == store.getLogs(ADDRESS, 100, 500)
+    assert server.calls["getLogs"] == calls
+    assert len(first["result"]) == 45
+    store.close()
+
+
+def test_recent_blocks_stay_uncovered(connector, server, chain, tmp_path):
+    store = LogStore(connector.logs, str(tmp_path / "logs.sqlite"), confirmations=12)
+    assert len(list(store.iter_getLogs(ADDRESS, 0, 99999999))) == 50
+    assert store.gaps(ADDRESS, 0, 99999999) == [(989, 99999999)]
+    chain.records_per_address = 51  # a log in block 1001
+    chain.mine(5)
+    records = list(store.iter_getLogs(ADDRESS, 0, 99999999))
+    assert len(records) == 51
+    assert store.gaps(ADDRESS, 0, 2000) == [(994, 2000)]
+    store.close()
@@ -0,0 +1,114 @@
+import asyncio
+import math
+
+from ..api import Connector
+from ..async_api import AsyncConnector
+from ..cache import MemoryCache
+from ..cache import ResponseCache
+from ..metrics import Histogram
+from ..metrics import Metrics
+from ..mock_server import fake_address
+from ..mock_server import MockEtherscan
+from ..retry import RetryPolicy
+
+ADDRESS = fake_address("a")
+ABI = {"module": "contract", "action": "getabi"}
+BALANCE = {"module": "account", "action": "balance"}
+
+
+def lookups(metrics, action, cache, result):
+    return metrics.registry.counter(
+        "cache_lookups", **action, cache=cache, result=result
+    )
+
+
+def test_cache_lookups_count_cacheable_requests_only(server, tmp_path):
+    metrics = Metrics()
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    with Connector(
+        "key",
+        server.url,
+        calls_per_second=None,
+        cache=cache,
+        memory_cache=MemoryCache(),
+        metrics=metrics,
+    ) as connector:
+        for _ in range(3):
+            connector.contacts.getabi("0xabc")
+            connector.accounts.balance(ADDRESS)
+    cache.close()
+    assert lookups(metrics, ABI, "memory", "miss") == 1
+    assert lookups(metrics, ABI, "memory", "hit") == 2
+    assert lookups(metrics, ABI, "disk", "miss") == 1
+    assert lookups(metrics, ABI, "disk", "hit") == 0
+    assert not [
+        series
+        for series in metrics.registry.snapshot()["cache_lookups"]
+        if series["labels"]["action"] == "balance"
+    ]
+    requests = metrics.registry.histogram("request_seconds", **BALANCE, outcome="ok")
+    assert requests is not None and requests.count == 3
+
+
+def test_async_cache_lookups_count_cacheable_requests_only(server, tmp_path):
+    metrics = Metrics()
+
+    async def run():
+        async with AsyncConnector(
+            "key",
+            server.url,
+            calls_per_second=None,
+            memory_cache=MemoryCache(),
+            metrics=metrics,
+        ) as connector:
+            for _ in range(2):
+                await connector.contacts.getabi("0xabc")
+                await connector.accounts.balance(ADDRESS)
+
+    asyncio.run(run())
+    assert lookups(metrics, ABI, "memory", "miss") == 1
+    assert lookups(metrics, ABI, "memory", "hit") == 1
+    assert lookups(metrics, BALANCE, "memory", "miss") == 0
+
+
+def test_retries_and_errors_are_counted(chain):
+    metrics = Metrics()
+    policy = RetryPolicy(max_attempts=30, backoff=0.05, max_backoff=0.2)
+    with MockEtherscan(chain, calls_per_second=4) as server:
+        with Connector(
+            "key",
+            server.url,
+            calls_per_second=None,
+            retry_policy=policy,
+            metrics=metrics,
+        ) as connector:
+            for _ in range(6):
+                assert connector.accounts.balance(ADDRESS)["status"] == "1"
+    retries = metrics.registry.counter("retries", **BALANCE)
+    errors = metrics.registry.counter("errors", **BALANCE, error="ApiRetryable")
+    assert retries == errors > 0
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert math.isnan(histogram.quantile(0.5))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.snapshot()["max"] == 3.0
+
+
+def test_prometheus_exposition():
+    metrics = Metrics()
+    metrics.cached(ABI, "memory", True)
+    metrics.observe("response_bytes", 300, {"module": "m", "action": "a"})
+    text = metrics.registry.to_prometheus()
+    assert "# TYPE pyetherscan_response_bytes histogram" in text
+    assert (
+        'pyetherscan_response_bytes_bucket{action="a",module="m",le="+Inf"} 1' in text
+    )
+    assert (
+        'pyetherscan_cache_lookups_total{action="getabi",cache="memory",'
+        'module="contract",result="hit"} 1.0'
+    ) in text
@@ -0,0 +1,58 @@
+from ..models import Log
+from ..models import Transaction
+from ..mock_server import TRANSFER_TOPIC
+
+# as returned by logs.getLogs, zero indices are written as a bare "0x"
+FIRST_LOG = {
+    "address": "0xbd3531da5cf5857e7cfaa92426877b022e612cf8",
+    "topics": [
+        TRANSFER_TOPIC,
+        "0x0000000000000000000000000000000000000000000000000000000000000000",
+        "0x000000000000000000000000c45a4b3b698f21f88687548e7f5a80df8b99d93d",
+    ],
+    "data": "0x",
+    "blockNumber": "0xc48174",
+    "blockHash": "0x4a3b8e2ec7e8e7f1e10cbdd6cbd1b3fe6b23f0e92e7a4ed5d21f7bc2a54ab3c1",
+    "timeStamp": "0x60f9ce56",
+    "gasPrice": "0x2e90edd000",
+    "gasUsed": "0x247205",
+    "logIndex": "0x",
+    "transactionHash": "0x4ffd22d986913d33927a392fe4319bcd2b62f3afe1c15a2c59f77fc2cc4c20a9",
+    "transactionIndex": "0x",
+}
+
+
+def test_log_zero_indices():
+    log = Log.from_dict(FIRST_LOG)
+    assert log.log_index == 0
+    assert log.transaction_index == 0
+    assert log.block_number == 12878196
+    assert log.timestamp == 1626984022
+    assert log.gas_used == 2388485
+
+
+def test_log_hex_indices():
+    log = Log.from_dict({**FIRST_LOG, "logIndex": "0x1f", "transactionIndex": "0xa"})
+    assert (log.log_index, log.transaction_index) == (31, 10)
+
+
+def test_log_to_dict_decodes_every_field():
+    decoded = Log.from_dict(FIRST_LOG).to_dict()
+    assert decoded["log_index"] == 0
+    assert decoded["topics"] == FIRST_LOG["topics"]
+    assert decoded["removed"] is None
+
+
+def test_transaction_decimal_fields():
+    tx = Transaction.from_dict(
+        {
+            "blockNumber": "14000000",
+            "value": "1500000000000000000",
+            "isError": "0",
+            "contractAddress": "",
+        }
+    )
+    assert tx.block_number == 14000000
+    assert tx.value_ether == 1.5
+    assert tx.is_error is False
+    assert tx.nonce is None
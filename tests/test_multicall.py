@@ -0,0 +1,55 @@
+from ..mock_server import fake_address
+from ..multicall import decode_aggregate3
+from ..multicall import decode_aggregate3_calls
+from ..multicall import encode_aggregate3
+from ..multicall import encode_tuples
+from ..multicall import Multicall
+
+TOKEN = fake_address("token")
+# balanceOf(owner), calldata longer than a word and empty calldata
+CALLS = [
+    (TOKEN, "0x70a08231" + fake_address("owner")[2:].rjust(64, "0")),
+    (fake_address("other"), "0x" + "ab" * 40),
+    (TOKEN, "0x"),
+]
+# Error(string) revert data of "no"
+REVERT = "0x08c379a0" + format(32, "064x") + format(2, "064x") + "6e6f".ljust(64, "0")
+
+
+def test_aggregate3_calls_round_trip():
+    for allow_failure in (True, False):
+        decoded = decode_aggregate3_calls(encode_aggregate3(CALLS, allow_failure))
+        assert [(call["target"].lower(), call["callData"]) for call in decoded] == [
+            (to.lower(), data) for to, data in CALLS
+        ]
+        assert {call["allowFailure"] for call in decoded} == {allow_failure}
+
+
+def test_aggregate3_results_with_a_failed_call():
+    value = "0x" + format(10**18, "064x")
+    encoded = "0x" + encode_tuples([((1,), value), ((0,), REVERT), ((1,), "0x")])
+    assert decode_aggregate3(encoded) == [
+        {"success": True, "returnData": value},
+        {"success": False, "returnData": REVERT},
+        {"success": True, "returnData": "0x"},
+    ]
+    batches = [[CALLS[0], CALLS[1], CALLS[2]]]
+    results = Multicall._results(batches, [{"result": encoded}])
+    assert [result["success"] for result in results[0]] == [True, False, True]
+    assert Multicall._retried(batches, results) == []
+
+
+def test_call_matches_single_calls(connector, server):
+    aggregated = Multicall(connector.proxy).call(CALLS)
+    singles = Multicall(connector.proxy, aggregate=False).call(CALLS)
+    assert aggregated == singles
+    assert all(result["success"] for result in aggregated)
+    assert server.calls["eth_call"] == 1 + len(CALLS)
+
+
+def test_failed_aggregate_is_retried_as_single_calls(connector, server):
+    # no Multicall3 at this address, its answer does not decode
+    multicall = Multicall(connector.proxy, address=fake_address("nothing"), max_calls=2)
+    results = multicall.call(CALLS)
+    assert results == Multicall(connector.proxy, aggregate=False).call(CALLS)
+    assert server.calls["eth_call"] == 2 + 2 * len(CALLS)
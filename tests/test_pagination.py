@@ -0,0 +1,87 @@
+import pytest
+
+from ..api import Connector
+from ..backfill import backfill
+from ..backfill import ShardPlanner
+from ..mock_server import fake_address
+from ..mock_server import MockChain
+from ..mock_server import MockEtherscan
+from ..pagination import BlockPaginator
+from ..pagination import paginate
+
+ADDRESS = fake_address("a")
+
+
+@pytest.fixture
+def accounts():
+    # the api's 10000 record window, scaled down to 100
+    chain = MockChain(head=10000, records_per_address=250, records_per_block=3)
+    with MockEtherscan(chain, max_records=100) as server:
+        with Connector("key", server.url, calls_per_second=None) as connector:
+            yield connector.accounts
+
+
+@pytest.mark.parametrize("sort", ["asc", "desc"])
+def test_paginate_crosses_the_result_window(accounts, sort):
+    records = list(
+        paginate(
+            lambda start, end, page: accounts.txlist(
+                ADDRESS, start, end, page, 40, sort
+            ),
+            BlockPaginator(0, 99999999, 40, sort, max_records=100),
+        )
+    )
+    hashes = [record["hash"] for record in records]
+    blocks = [int(record["blockNumber"]) for record in records]
+    assert len(hashes) == len(set(hashes)) == 250
+    assert blocks == sorted(blocks, reverse=sort == "desc")
+
+
+def test_backfill_splits_full_shards(accounts):
+    records = list(
+        backfill(
+            lambda start, end: accounts.txlist(ADDRESS, start, end, 1, 100, "asc"),
+            ShardPlanner(0, 10000, 100, shard_size=5000),
+        )
+    )
+    blocks = [int(record["blockNumber"]) for record in records]
+    assert len({record["hash"] for record in records}) == 250
+    assert blocks == sorted(blocks)
+
+
+def test_iter_txlist_streamed_matches_buffered(connector):
+    buffered = list(connector.accounts.iter_txlist(ADDRESS, offset=20))
+    streamed = list(connector.accounts.iter_txlist(ADDRESS, offset=20, stream=True))
+    assert streamed == buffered
+
+
+def fake_fetch(records):
+    def fetch(start, end, page, offset=2):
+        window = [r for r in records if start <= int(r["blockNumber"]) <= end]
+        return {"status": "1", "result": window[(page - 1) * offset : page * offset]}
+
+    return fetch
+
+
+def test_identical_records_of_a_block_survive():
+    # two equal transfers of one transaction, tokentx records carry no logIndex
+    transfer = {"blockNumber": "2", "hash": "0xab", "value": "5"}
+    records = [
+        {"blockNumber": "1", "hash": "0x01", "value": "1"},
+        {"blockNumber": "1", "hash": "0x02", "value": "1"},
+        {"blockNumber": "2", "hash": "0x03", "value": "1"},
+        dict(transfer),
+        dict(transfer),
+        {"blockNumber": "3", "hash": "0x04", "value": "1"},
+        {"blockNumber": "3", "hash": "0x04", "value": "1"},
+    ]
+    # without a restart
+    fetched = list(
+        paginate(fake_fetch(records), BlockPaginator(0, 9, 2, max_records=10))
+    )
+    assert fetched == records
+    # the window restarts at block 2 after 4 records, both transfers straddle the edge
+    fetched = list(
+        paginate(fake_fetch(records), BlockPaginator(0, 9, 2, max_records=4))
+    )
+    assert fetched == records
@@ -0,0 +1,75 @@
+import asyncio
+
+from ..api import Connector
+from ..async_api import AsyncConnector
+from ..mock_server import fake_address
+from ..mock_server import MockEtherscan
+from ..retry import RetryPolicy
+
+BLOCKS = range(995, 1003)  # the last two are beyond the head
+
+
+def test_get_blocks_fan_out_and_batch_agree(connector, server):
+    fanned = connector.proxy.get_blocks(BLOCKS, boolean=False)
+    with Connector(
+        "key", server.url, calls_per_second=None, rpc_endpoint=server.rpc_url
+    ) as batched:
+        batched.proxy.rpc_batch_size = 3
+        assert batched.proxy.get_blocks(BLOCKS, boolean=False) == [
+            {**block, "id": i} for i, block in enumerate(fanned)
+        ]
+    assert [block["result"]["number"] for block in fanned[:-2]] == [
+        hex(number) for number in BLOCKS[:-2]
+    ]
+    assert [block["result"] for block in fanned[-2:]] == [None, None]
+
+
+def test_transactions_and_receipts(connector, chain):
+    hashes = [chain.transaction_hash(900, index) for index in range(2)]
+    transactions = connector.proxy.get_transactions(hashes)
+    receipts = connector.proxy.get_receipts(hashes)
+    assert [tx["result"]["hash"] for tx in transactions] == hashes
+    assert [receipt["result"]["transactionHash"] for receipt in receipts] == hashes
+
+
+def test_call_many(connector, server):
+    calls = [
+        (fake_address("token"), "0x70a08231" + "0" * 64),
+        (fake_address("x"), "0x"),
+    ]
+    results = connector.proxy.call_many(calls)
+    with Connector(
+        "key", server.url, calls_per_second=None, rpc_endpoint=server.rpc_url
+    ) as batched:
+        assert [item["result"] for item in batched.proxy.call_many(calls)] == [
+            item["result"] for item in results
+        ]
+
+
+def test_failed_batch_gives_error_objects(chain):
+    with MockEtherscan(chain, error_rate=1.0) as server:
+        with Connector(
+            "key",
+            server.url,
+            calls_per_second=None,
+            retry_policy=RetryPolicy(max_attempts=1),
+            rpc_endpoint=server.rpc_url,
+        ) as connector:
+            blocks = connector.proxy.get_blocks(range(3))
+    assert [block["id"] for block in blocks] == [0, 1, 2]
+    assert all("HTTPError" in block["error"]["message"] for block in blocks)
+
+
+def test_async_get_blocks(server):
+    async def fetch(rpc_endpoint):
+        async with AsyncConnector(
+            "key", server.url, calls_per_second=None, rpc_endpoint=rpc_endpoint
+        ) as connector:
+            return await connector.proxy.get_blocks(BLOCKS, boolean=False)
+
+    fanned = asyncio.run(fetch(None))
+    batched = asyncio.run(fetch(server.rpc_url))
+    assert [block["result"] for block in fanned] == [
+        block["result"] for block in batched
+    ]
+    assert fanned[0]["result"]["number"] == hex(BLOCKS[0])
@@ -0,0 +1,31 @@
+import pytest
+
+from ..exceptions import DailyQuotaExceeded
+from ..rate_limit import RateLimiter
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_calls_are_spaced_at_the_rate():
+    clock = Clock()
+    limiter = RateLimiter(calls_per_second=5, clock=clock, wall_clock=clock)
+    assert [limiter.reserve() for _ in range(4)] == pytest.approx([0, 0.2, 0.4, 0.6])
+    clock.now = 1.0
+    assert limiter.reserve() == pytest.approx(0.0)
+
+
+def test_daily_quota_raises_and_rolls_over():
+    clock = Clock()
+    limiter = RateLimiter(None, daily_quota=2, clock=clock, wall_clock=clock)
+    limiter.reserve()
+    limiter.reserve()
+    with pytest.raises(DailyQuotaExceeded):
+        limiter.reserve()
+    clock.now = 86400.0
+    assert limiter.reserve() == 0.0
@@ -0,0 +1,44 @@
+import pytest
+
+from ..exceptions import RetryError
+from ..retry import classify_response
+from ..retry import FAIL
+from ..retry import OK
+from ..retry import RETRY
+from ..retry import RetryPolicy
+
+RATE_LIMITED = {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+
+def responses(*sequence):
+    calls = iter(sequence)
+    return lambda: next(calls)
+
+
+def test_classify_response():
+    assert classify_response({"status": "1", "result": "1"}) == OK
+    assert classify_response({"status": "0", "result": []}) == OK
+    assert classify_response(RATE_LIMITED) == RETRY
+    assert classify_response({"status": "0", "result": "Invalid API Key"}) == FAIL
+
+
+def test_retries_until_success():
+    policy = RetryPolicy(backoff=0.001)
+    request = responses(RATE_LIMITED, RATE_LIMITED, {"status": "1", "result": "7"})
+    assert policy.call(request, {"action": "balance"})["result"] == "7"
+
+
+def test_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2, backoff=0.001)
+    with pytest.raises(RetryError):
+        policy.call(responses(RATE_LIMITED, RATE_LIMITED), {"action": "balance"})
+
+
+def test_non_idempotent_actions_are_not_retried_after_errors():
+    policy = RetryPolicy(backoff=0.001)
+
+    def request():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        policy.call(request, {"action": "eth_sendRawTransaction"})
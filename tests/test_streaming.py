@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from ..api import Connector
+from ..async_api import AsyncConnector
+from ..exceptions import EtherscanError
+from ..mock_server import fake_address
+from ..mock_server import MockEtherscan
+from ..retry import RetryPolicy
+from ..streaming import ResultParser
+
+ADDRESS = fake_address("a")
+
+
+def parse(body: bytes, size: int):
+    parser = ResultParser()
+    records = []
+    for i in range(0, len(body), size):
+        records += parser.feed(body[i : i + size])
+    return records + parser.close(), parser
+
+
+@pytest.mark.parametrize("size", [1, 5, 1 << 16])
+def test_parser_yields_the_result_records(size):
+    result = [{"hash": f"0x{i:064x}", "value": str(i), "note": "é"} for i in range(50)]
+    body = json.dumps({"status": "1", "message": "OK", "result": result}).encode()
+    records, parser = parse(body, size)
+    assert records == result
+    assert parser.envelope == {"status": "1", "message": "OK"}
+
+
+def test_parser_keeps_a_non_list_result():
+    body = b'{"status":"0","message":"NOTOK","result":"Max rate limit reached"}'
+    records, parser = parse(body, 3)
+    assert records == []
+    assert not parser.result_is_list
+    assert parser.envelope["result"] == "Max rate limit reached"
+
+
+def test_parser_handles_records_spanning_many_chunks():
+    large = {"input": "0x" + "ab" * 500_000}
+    body = json.dumps({"status": "1", "result": [large, 1, large]}).encode()
+    assert parse(body, 1000)[0] == [large, 1, large]
+
+
+def rate_limited(chain):
+    return MockEtherscan(chain, calls_per_second=4)
+
+
+def test_rate_limited_stream_is_retried(chain):
+    policy = RetryPolicy(max_attempts=30, backoff=0.05, max_backoff=0.2)
+    with rate_limited(chain) as server:
+        with Connector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            records = list(
+                connector.accounts.iter_txlist(ADDRESS, offset=5, stream=True)
+            )
+    assert len(records) == 50
+
+
+def test_stream_raises_error_envelopes(chain):
+    policy = RetryPolicy(max_attempts=1)
+    with rate_limited(chain) as server:
+        with Connector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            with pytest.raises(EtherscanError, match="rate limit"):
+                list(connector.accounts.iter_txlist(ADDRESS, offset=5, stream=True))
+
+
+def test_async_rate_limited_stream_is_retried(chain):
+    policy = RetryPolicy(max_attempts=30, backoff=0.05, max_backoff=0.2)
+
+    async def walk(server):
+        async with AsyncConnector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            return [
+                record
+                async for record in connector.accounts.iter_txlist(
+                    ADDRESS, offset=5, stream=True
+                )
+            ]
+
+    with rate_limited(chain) as server:
+        assert len(asyncio.run(walk(server))) == 50
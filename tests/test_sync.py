@@ -0,0 +1,60 @@
+from ..mock_server import fake_address
+from ..sync import SyncManager
+
+ADDRESS = fake_address("a")
+
+
+def test_refresh_only_returns_new_records(connector, server, tmp_path):
+    sync = SyncManager(connector.accounts, str(tmp_path / "sync.sqlite"))
+    assert len(list(sync.refresh(ADDRESS))) == 50
+    assert sync.mark(ADDRESS, "txlist") is not None
+    calls = server.calls["txlist"]
+    assert list(sync.refresh(ADDRESS)) == []
+    assert server.calls["txlist"] == calls + 1
+    sync.close()
+
+
+def test_interrupted_refresh_is_repeated(connector, tmp_path):
+    sync = SyncManager(connector.accounts, str(tmp_path / "sync.sqlite"))
+    next(sync.refresh(ADDRESS))
+    assert sync.mark(ADDRESS, "txlist") is None
+    assert len(list(sync.refresh(ADDRESS))) == 50
+    sync.close()
+
+
+def test_zero_overlap(connector, chain, tmp_path):
+    sync = SyncManager(connector.accounts, str(tmp_path / "sync.sqlite"), overlap=0)
+    assert len(list(sync.refresh(ADDRESS))) == 50
+    chain.records_per_address = 60
+    assert len(list(sync.refresh(ADDRESS))) == 10
+    sync.close()
+
+
+class Accounts(object):
+    """
+    Serves the given token transfers from iter_tokentx.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    def iter_tokentx(self, contract_address, address, start_block):
+        return iter([r for r in self.records if int(r["blockNumber"]) >= start_block])
+
+
+def test_identical_token_transfers_are_kept(tmp_path):
+    # tokentx records carry no logIndex, one transaction can emit equal transfers
+    transfer = {
+        "blockNumber": "10",
+        "hash": "0xab",
+        "from": "0x1",
+        "to": "0x2",
+        "value": "5",
+    }
+    accounts = Accounts([dict(transfer), dict(transfer), {**transfer, "value": "6"}])
+    sync = SyncManager(accounts, str(tmp_path / "sync.sqlite"))
+    assert len(list(sync.refresh(ADDRESS, "tokentx"))) == 3
+    assert list(sync.refresh(ADDRESS, "tokentx")) == []
+    accounts.records.append({**transfer, "blockNumber": "11"})
+    assert list(sync.refresh(ADDRESS, "tokentx")) == [accounts.records[-1]]
+    sync.close()
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ..api import Connector
+from ..mock_server import fake_address
+from ..mock_server import MockEtherscan
+from ..retry import RetryPolicy
+
+
+def test_wrappers_share_one_transport(connector):
+    assert connector.accounts.transport is connector.proxy.transport
+    assert connector.accounts.transport is connector.stats.transport
+
+
+def test_balance(connector, server):
+    response = connector.accounts.balance(fake_address("a"))
+    assert response["status"] == "1"
+    assert server.calls["balance"] == 1
+
+
+def test_concurrent_calls(connector, server):
+    addresses = [fake_address("a", i) for i in range(50)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(connector.accounts.balance, addresses))
+    assert all(response["status"] == "1" for response in responses)
+    assert server.calls["balance"] == 50
+
+
+def test_transient_errors_are_retried(chain):
+    with MockEtherscan(chain, error_rate=0.3) as server:
+        policy = RetryPolicy(max_attempts=20, backoff=0.001, max_backoff=0.01)
+        with Connector(
+            "key", server.url, calls_per_second=None, retry_policy=policy
+        ) as connector:
+            for i in range(20):
+                assert connector.accounts.balance(fake_address(i))["status"] == "1"
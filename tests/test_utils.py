@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+import pytest
+
+from ..columnar import ColumnBuilder
+from ..columnar import TRANSACTION_COLUMNS
+from ..mock_server import fake_address
+from ..utils import convert_limbs_fast
+from ..utils import convert_units
+from ..utils import convert_units_fast
+from ..utils import convert_units_many
+from ..utils import convert_wei2ether
+from ..utils import to_decimal
+from ..utils import to_int
+
+MAX_UINT256 = 2**256 - 1
+
+
+def test_to_int():
+    assert to_int("123") == to_int("0x7b") == to_int("0X7B") == to_int(123) == 123
+    assert to_int("0x") == to_int("") == 0
+    with pytest.raises(ValueError):
+        to_int("0xzz")
+
+
+def test_convert_units_is_exact():
+    # the default decimal context would round this to 28 digits
+    whole, fraction = divmod(MAX_UINT256, 10**18)
+    assert convert_units(MAX_UINT256) == Decimal(f"{whole}.{fraction:018d}")
+    assert convert_units("1", "ether", "wei") == Decimal(10**18)
+    assert convert_units(hex(10**9), "wei", "gwei") == 1
+    assert convert_units("1.5", "gwei", "wei") == 1500000000
+    assert convert_units(Decimal("0.000000001"), "ether", "gwei") == 1
+    assert convert_units_many(["1", "0x2", 3], "gwei", "ether") == [
+        Decimal("1E-9"),
+        Decimal("2E-9"),
+        Decimal("3E-9"),
+    ]
+    assert to_decimal("123456", 6) == Decimal("0.123456")
+    assert convert_wei2ether(str(10**18 + 1)) == 1.0
+    assert convert_wei2ether(1.5e18) == 1.5
+
+
+def test_convert_units_fast(connector):
+    records = connector.accounts.txlist(fake_address("a"), 0, 99999999)["result"]
+    values = [record["value"] for record in records]
+    expected = [float(convert_units(value)) for value in values]
+    assert convert_units_fast(values) == expected
+    assert convert_units_fast(values, "wei", "gwei") == [
+        float(convert_units(value, "wei", "gwei")) for value in values
+    ]
+    np = pytest.importorskip("numpy")
+    limbs = ColumnBuilder(TRANSACTION_COLUMNS).extend(records).to_numpy()["value"]
+    assert convert_limbs_fast(limbs) == pytest.approx(expected, rel=1e-15)
+    assert convert_units_fast(np.array([10**18, 2 * 10**18])).tolist() == [1.0, 2.0]
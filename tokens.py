@@ -1,7 +1,41 @@
+from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
+from warnings import warn
 
-import requests
+from .concurrency import map_ordered
+from .transport import BaseTransport
+from .transport import Transport
+
+
+def merge_token_balances(
+    pairs: List[Tuple[str, str]], responses: List[Any]
+) -> Dict[Tuple[str, str], int]:
+    """
+    Merges the tokenbalance responses of the pairs. A failed call (an error response or the exception it raised) does
+    not discard the others, its pair is left out and reported with a warning.
+    """
+    balances, errors = {}, {}
+    for pair, response in zip(pairs, responses):
+        if isinstance(response, Exception):
+            errors[pair] = f"{type(response).__name__}: {response}"
+        elif response.get("status") != "1":
+            errors[pair] = f"{response.get('message')}: {response.get('result')}"
+        else:
+            balances[pair] = int(response["result"])
+    if errors:
+        listed = "; ".join(
+            f"{pair}: {error}" for pair, error in list(errors.items())[:3]
+        )
+        more = f" and {len(errors) - 3} more" if len(errors) > 3 else ""
+        warn(
+            f"tokenbalance failed for {len(errors)} of {len(pairs)} pairs, they are left out: {listed}{more}"
+        )
+    return balances
 
 
 class Tokens(object):
@@ -10,12 +44,15 @@ class Tokens(object):
     see: https://docs.etherscan.io/api-endpoints/tokens for more details
     """
 
-    def __init__(self, key: str, endpoint: str):
+    def __init__(
+        self, key: str, endpoint: str, transport: Optional[BaseTransport] = None
+    ):
         self.endpoint = endpoint
+        self.transport = transport if transport is not None else Transport()
         self.params = {"apikey": key, "module": "stats"}
 
     def _get_request(self, params: dict) -> Dict[str, Union[str, float, int]]:
-        return requests.get(self.endpoint, params=params).json()
+        return self.transport.get(self.endpoint, params)
 
     def tokensupply(  # noqa
         self,
@@ -50,3 +87,24 @@ class Tokens(object):
             "tag": tag,
         }
         return self._get_request(schema)
+
+    def tokenbalances(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        tag: str = "latest",
+        workers: int = 8,
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        Returns the ERC-20 balance, in the token's smallest unit, of any number of (contractaddress, address) pairs,
+        fetched with concurrent tokenbalance calls. Pairs whose call failed are left out, see merge_token_balances.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        return merge_token_balances(
+            pairs,
+            map_ordered(
+                lambda pair: self.tokenbalance(pair[0], pair[1], tag),
+                pairs,
+                workers,
+                on_error=lambda index, error: error,
+            ),
+        )
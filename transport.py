@@ -0,0 +1,573 @@
+import json
+import time
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import MemoryCache
+from .cache import ResponseCache
+from .exceptions import EtherscanError
+from .exceptions import KeyRejected
+from .keys import KeyPool
+from .metrics import Metrics
+from .metrics import trace_phases
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .streaming import ResultParser
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+Timeout = Union[float, Tuple[float, float], None]
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+def encode_params(params: Optional[dict]) -> List[Tuple[str, str]]:
+    """
+    Encodes a schema into query pairs the way requests does: None values are dropped, lists are repeated keys.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else (value,):
+            pairs.append((key, str(item)))
+    return pairs
+
+
+def rpc_params(payload: Any) -> dict:
+    """
+    Describes a JSON-RPC payload like an api schema, for the retry policy and metrics.
+    """
+    method = payload.get("method") if isinstance(payload, dict) else "batch"
+    return {"module": "rpc", "action": method}
+
+
+def with_key(params: Optional[dict], key: str) -> Optional[dict]:
+    """
+    Returns the schema with its apikey replaced, schemas without an apikey are left untouched.
+    """
+    if params is None or "apikey" not in params:
+        return params
+    return {**params, "apikey": key}
+
+
+class Stream(object):
+    """
+    A streamed response read up to the start of its result array: the records completed so far are in `records`,
+    the rest of the body is still in `chunks`.
+    """
+
+    __slots__ = ("response", "chunks", "parser", "records", "size")
+
+    def __init__(self, response: Any, chunks: Any, parser: ResultParser):
+        self.response = response
+        self.chunks = chunks
+        self.parser = parser
+        self.records: List[Any] = []
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self.size += len(chunk)
+        return self.parser.feed(chunk)
+
+
+class BaseTransport(object):
+    """
+    Interface shared by the synchronous and asynchronous transports, the endpoint wrappers only ever call `get` and
+    `post` and return whatever they produce (a response dict, or an awaitable of one).
+    """
+
+    key_pool: Optional[KeyPool] = None
+    metrics: Optional[Metrics] = None
+
+    def get(self, endpoint: str, params: dict) -> Any:
+        raise NotImplementedError
+
+    def post(self, endpoint: str, data: dict, params: Optional[dict] = None) -> Any:
+        raise NotImplementedError
+
+    def post_json(self, endpoint: str, payload: Any) -> Any:
+        raise NotImplementedError
+
+    def stream(self, endpoint: str, params: dict) -> Any:
+        raise NotImplementedError
+
+    def _streamed(self, opened: Union[dict, "Stream"]) -> "Stream":
+        """
+        Returns an opened stream, raising EtherscanError for the envelope of a response whose result was not a list.
+        """
+        if isinstance(opened, dict):
+            raise EtherscanError(f"{opened.get('message')}: {opened.get('result')}")
+        return opened
+
+    def _checked(self, key: Optional[str], response: dict) -> dict:
+        """
+        Reports the response to the key pool, raising KeyRejected when the key used got ejected because of it.
+        """
+        if key is not None and self.key_pool is not None:
+            if self.key_pool.report(key, response):
+                raise KeyRejected(f"api key rejected: {response.get('result')}")
+        return response
+
+
+class Transport(BaseTransport):
+    """
+    Shared HTTP transport for all endpoint wrappers.
+
+    Owns a single requests.Session with a keep-alive connection pool so that consecutive calls reuse the same
+    TCP/TLS connection to the api instead of performing a new handshake per request.
+    When a rate limiter is given every call first waits for its turn, see RateLimiter. When a cache is given GET
+    requests are answered from it where its policy allows, see ResponseCache. A memory cache sits in front of both
+    and coalesces concurrent identical requests, see MemoryCache. Failed requests are retried according to the
+    retry policy, see RetryPolicy. When metrics are given every step of the request path reports to them, see Metrics.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        timeout: Timeout = (3.05, 30.0),
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        memory_cache: Optional[MemoryCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        key_pool: Optional[KeyPool] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.retry_policy = retry_policy
+        self.key_pool = key_pool
+        self.metrics = metrics
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, endpoint: str, params: dict) -> Dict[str, Union[str, float, int]]:
+        if self.memory_cache is not None:
+            loaded = []
+
+            def load():
+                loaded.append(True)
+                return self._get(endpoint, params)
+
+            response = self.memory_cache.get_or_load(endpoint, params, load)
+            if (
+                self.metrics is not None
+                and self.memory_cache.policy.ttl(params) is not None
+            ):
+                self.metrics.cached(params, "memory", not loaded)
+            return response
+        return self._get(endpoint, params)
+
+    def _get(self, endpoint: str, params: dict) -> Dict[str, Union[str, float, int]]:
+        if self.cache is not None and self.cache.policy.ttl(params) is not None:
+            cached = self.cache.get(endpoint, params)
+            if self.metrics is not None:
+                self.metrics.cached(params, "disk", cached is not None)
+            if cached is not None:
+                return cached
+        response = self._send(lambda: self._request("GET", endpoint, params), params)
+        if self.cache is not None:
+            self.cache.set(endpoint, params, response)
+        return response
+
+    def post(
+        self, endpoint: str, data: dict, params: Optional[dict] = None
+    ) -> Dict[str, Union[str, float, int]]:
+        return self._send(
+            lambda: self._request("POST", endpoint, params, data),
+            {**data, **(params or {})},
+        )
+
+    def post_json(self, endpoint: str, payload: Any) -> Any:
+        """
+        Posts a JSON body, e.g. a JSON-RPC batch, to a node endpoint. No api key or rate limit applies.
+        """
+
+        params = rpc_params(payload)
+
+        def request():
+            started = time.perf_counter()
+            response = self.session.post(endpoint, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            self._measured(params, response, started, False)
+            return self._decode(params, response)
+
+        return self._send(request, params)
+
+    def stream(self, endpoint: str, params: dict) -> Iterator[Any]:
+        """
+        Sends a GET request and yields the records of its result array as they arrive, see ResultParser. The body is
+        read up to the start of the result before anything is yielded, so an error envelope ("Max rate limit
+        reached", ...) is retried like any other response. Once records were yielded nothing is retried any more and
+        no cache applies, the records are never held in memory together.
+        """
+        stream = self._streamed(
+            self._send(lambda: self._open_stream(endpoint, params), params)
+        )
+        with stream.response:
+            yield from stream.records
+            for chunk in stream.chunks:
+                yield from stream.feed(chunk)
+        yield from stream.parser.close()
+        if self.metrics is not None:
+            self.metrics.responded(params, {}, stream.size)
+
+    def _open_stream(self, endpoint: str, params: dict) -> Union[dict, Stream]:
+        """
+        Opens a streamed response and reads it up to the start of its result. A result that is not a list is read
+        entirely and its envelope returned, reported to the key pool like any response.
+        """
+        key, response = self._open("GET", endpoint, params, stream=True)
+        stream = Stream(
+            response,
+            response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+            ResultParser(),
+        )
+        try:
+            for chunk in stream.chunks:
+                stream.records.extend(stream.feed(chunk))
+                if stream.parser.result_is_list:
+                    return stream
+                if "result" in stream.parser.envelope:
+                    break
+            for chunk in stream.chunks:
+                stream.feed(chunk)
+            stream.parser.close()
+        except BaseException:
+            response.close()
+            raise
+        response.close()
+        if self.metrics is not None:
+            self.metrics.responded(params, {}, stream.size)
+        return self._checked(key, stream.parser.envelope)
+
+    def _send(self, request, params: dict) -> Dict[str, Union[str, float, int]]:
+        if self.metrics is not None:
+            request = self.metrics.instrument(request, params)
+        if self.retry_policy is None:
+            return request()
+        return self.retry_policy.call(request, params)
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict] = None,
+    ) -> dict:
+        key, response = self._open(method, endpoint, params, data)
+        return self._checked(key, self._decode(params or data, response))
+
+    def _decode(self, params: Optional[dict], response: requests.Response) -> Any:
+        if self.metrics is None:
+            return response.json()
+        started = time.perf_counter()
+        decoded = response.json()
+        self.metrics.responded(
+            params,
+            {"decode": time.perf_counter() - started},
+            len(response.content),
+        )
+        return decoded
+
+    def _measured(
+        self,
+        params: Optional[dict],
+        response: requests.Response,
+        started: float,
+        stream: bool,
+    ):
+        """
+        Reports the phases of a received response: server covers connecting, sending and waiting for the headers
+        (requests does not time them separately), body the download of a response that is not streamed.
+        """
+        if self.metrics is None:
+            return
+        server = response.elapsed.total_seconds()
+        phases = {"server": server}
+        if not stream:
+            phases["body"] = max(time.perf_counter() - started - server, 0.0)
+        self.metrics.responded(params, phases)
+
+    def _open(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict] = None,
+        stream: bool = False,
+    ) -> Tuple[Optional[str], requests.Response]:
+        key = None
+        started = time.perf_counter()
+        if self.key_pool is not None:
+            key = self.key_pool.acquire()
+            params, data = with_key(params, key), with_key(data, key)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.metrics is not None:
+            self.metrics.waited(params or data, time.perf_counter() - started)
+            started = time.perf_counter()
+        response = self.session.request(
+            method,
+            endpoint,
+            params=params,
+            data=data,
+            timeout=self.timeout,
+            stream=stream,
+        )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        self._measured(params or data, response, started, stream)
+        return key, response
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport(BaseTransport):
+    """
+    Asyncio counterpart of Transport, built on a single shared aiohttp.ClientSession.
+
+    `get` and `post` are coroutines, the session is created lazily on first use so that it binds to the running
+    event loop. Requires the optional `aiohttp` dependency. With metrics the dns, connect and server phases of every
+    request are traced, see Metrics.trace_config.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 100,
+        timeout: Timeout = (3.05, 30.0),
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        memory_cache: Optional[MemoryCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        key_pool: Optional[KeyPool] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncTransport requires aiohttp, install it with `pip install aiohttp`"
+            )
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.retry_policy = retry_policy
+        self.key_pool = key_pool
+        self.metrics = metrics
+        self._session = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            if isinstance(self.timeout, tuple):
+                timeout = aiohttp.ClientTimeout(
+                    sock_connect=self.timeout[0], sock_read=self.timeout[1]
+                )
+            else:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=timeout,
+                trace_configs=[self.metrics.trace_config()]
+                if self.metrics is not None
+                else None,
+            )
+        return self._session
+
+    async def get(
+        self, endpoint: str, params: dict
+    ) -> Dict[str, Union[str, float, int]]:
+        if self.memory_cache is not None:
+            loaded = []
+
+            def load():
+                loaded.append(True)
+                return self._get(endpoint, params)
+
+            response = await self.memory_cache.aget_or_load(endpoint, params, load)
+            if (
+                self.metrics is not None
+                and self.memory_cache.policy.ttl(params) is not None
+            ):
+                self.metrics.cached(params, "memory", not loaded)
+            return response
+        return await self._get(endpoint, params)
+
+    async def _get(
+        self, endpoint: str, params: dict
+    ) -> Dict[str, Union[str, float, int]]:
+        if self.cache is not None and self.cache.policy.ttl(params) is not None:
+            cached = self.cache.get(endpoint, params)
+            if self.metrics is not None:
+                self.metrics.cached(params, "disk", cached is not None)
+            if cached is not None:
+                return cached
+        response = await self._send(
+            lambda: self._request("GET", endpoint, params), params
+        )
+        if self.cache is not None:
+            self.cache.set(endpoint, params, response)
+        return response
+
+    async def post(
+        self, endpoint: str, data: dict, params: Optional[dict] = None
+    ) -> Dict[str, Union[str, float, int]]:
+        return await self._send(
+            lambda: self._request("POST", endpoint, params, data),
+            {**data, **(params or {})},
+        )
+
+    async def post_json(self, endpoint: str, payload: Any) -> Any:
+        """
+        Posts a JSON body, e.g. a JSON-RPC batch, to a node endpoint. No api key or rate limit applies.
+        """
+
+        params = rpc_params(payload)
+
+        async def request():
+            stamps: Dict[str, float] = {}
+            async with self.session.post(
+                endpoint, json=payload, trace_request_ctx=stamps
+            ) as response:
+                response.raise_for_status()
+                if self.metrics is not None:
+                    self.metrics.responded(params, trace_phases(stamps))
+                return await self._decode(params, response)
+
+        return await self._send(request, params)
+
+    async def stream(self, endpoint: str, params: dict) -> AsyncIterator[Any]:
+        """
+        Sends a GET request and yields the records of its result array as they arrive, see Transport.stream.
+        """
+        stream = self._streamed(
+            await self._send(lambda: self._open_stream(endpoint, params), params)
+        )
+        async with stream.response:
+            for record in stream.records:
+                yield record
+            async for chunk in stream.chunks:
+                for record in stream.feed(chunk):
+                    yield record
+        for record in stream.parser.close():
+            yield record
+        if self.metrics is not None:
+            self.metrics.responded(params, {}, stream.size)
+
+    async def _open_stream(self, endpoint: str, params: dict) -> Union[dict, Stream]:
+        """
+        Asynchronous counterpart of Transport._open_stream.
+        """
+        key, response = await self._open("GET", endpoint, params)
+        stream = Stream(
+            response, response.content.iter_chunked(STREAM_CHUNK_SIZE), ResultParser()
+        )
+        try:
+            async for chunk in stream.chunks:
+                stream.records.extend(stream.feed(chunk))
+                if stream.parser.result_is_list:
+                    return stream
+                if "result" in stream.parser.envelope:
+                    break
+            async for chunk in stream.chunks:
+                stream.feed(chunk)
+            stream.parser.close()
+        except BaseException:
+            response.release()
+            raise
+        response.release()
+        if self.metrics is not None:
+            self.metrics.responded(params, {}, stream.size)
+        return self._checked(key, stream.parser.envelope)
+
+    async def _send(self, request, params: dict) -> Dict[str, Union[str, float, int]]:
+        if self.metrics is not None:
+            request = self.metrics.ainstrument(request, params)
+        if self.retry_policy is None:
+            return await request()
+        return await self.retry_policy.acall(request, params)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict] = None,
+    ) -> dict:
+        key, response = await self._open(method, endpoint, params, data)
+        async with response:
+            return self._checked(key, await self._decode(params or data, response))
+
+    async def _decode(
+        self, params: Optional[dict], response: "aiohttp.ClientResponse"
+    ) -> Any:
+        if self.metrics is None:
+            return await response.json(content_type=None)
+        started = time.perf_counter()
+        body = await response.read()
+        downloaded = time.perf_counter()
+        decoded = json.loads(body)
+        self.metrics.responded(
+            params,
+            {"body": downloaded - started, "decode": time.perf_counter() - downloaded},
+            len(body),
+        )
+        return decoded
+
+    async def _open(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict] = None,
+    ) -> Tuple[Optional[str], "aiohttp.ClientResponse"]:
+        key = None
+        started = time.perf_counter()
+        if self.key_pool is not None:
+            key = await self.key_pool.acquire_async()
+            params, data = with_key(params, key), with_key(data, key)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        if self.metrics is not None:
+            self.metrics.waited(params or data, time.perf_counter() - started)
+        stamps: Dict[str, float] = {}
+        response = await self.session.request(
+            method,
+            endpoint,
+            params=encode_params(params),
+            data=encode_params(data) if data is not None else None,
+            trace_request_ctx=stamps,
+        )
+        if response.status >= 400:
+            response.release()
+            response.raise_for_status()
+        if self.metrics is not None:
+            self.metrics.responded(params or data, trace_phases(stamps))
+        return key, response
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
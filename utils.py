@@ -1,3 +1,8 @@
+from decimal import Context
+from decimal import Decimal
+from typing import Any
+from typing import Iterable
+from typing import List
 from typing import Union
 
 Ether2Wei = 1e18
@@ -11,15 +16,112 @@ Ether2MEther = 1e-6
 Ether2GEther = 1e-9
 Ether2TEther = 1e-12
 
+UNIT_DECIMALS = {
+    "wei": 0,
+    "kwei": 3,
+    "mwei": 6,
+    "gwei": 9,
+    "szabo": 12,
+    "finney": 15,
+    "ether": 18,
+}
+# 100 significant digits hold any uint256 (78 digits) at any unit exactly
+EXACT = Context(prec=100)
+
 
 def convert_wei2ether(wei: Union[float, int, str]) -> Union[float, str]:
-    if isinstance(wei, str):
-        if wei[:2] == "0x":
-            return int(wei, 16) / Ether2Wei
-        else:
-            return float(wei) / Ether2Wei
-    return float(wei) / Ether2Wei
+    """
+    Converts wei to a float amount of ether, integer amounts are divided exactly and rounded once,
+    see convert_units for exact Decimal results.
+    """
+    if isinstance(wei, float):
+        return wei / Ether2Wei
+    if isinstance(wei, str) and "." in wei:
+        return float(wei) / Ether2Wei
+    return to_int(wei) / 10**18
 
 
 def convert_ether2wei(eth: float) -> float:
     return eth * Ether2Wei
+
+
+def to_int(value: Union[int, str]) -> int:
+    """
+    Parses the integer fields etherscan returns either as decimal strings (api modules) or hex strings (proxy module),
+    the hex fields of getLogs records write zero as a bare "0x".
+    """
+    if isinstance(value, str):
+        if value[:2] in ("0x", "0X"):
+            return int(value, 16) if len(value) > 2 else 0
+        return int(value) if value else 0
+    return int(value)
+
+
+def to_decimal(value: Union[int, str], decimals: int = 18) -> Decimal:
+    """
+    Exactly scales an integer amount in the smallest unit (e.g. wei, or a token's smallest unit) to whole units.
+    """
+    return EXACT.scaleb(Decimal(to_int(value)), -decimals)
+
+
+def _to_decimal(value: Union[int, str, Decimal]) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, str) and value[:2] not in ("0x", "0X"):
+        return Decimal(value)
+    return Decimal(to_int(value))
+
+
+def convert_units(
+    value: Union[int, str, Decimal], from_unit: str = "wei", to_unit: str = "ether"
+) -> Decimal:
+    """
+    Exactly converts an amount between units (wei, gwei, ether, ...), accepting ints, decimal or hex strings and
+    Decimals.
+    """
+    shift = UNIT_DECIMALS[from_unit] - UNIT_DECIMALS[to_unit]
+    return EXACT.scaleb(_to_decimal(value), shift)
+
+
+def convert_units_many(
+    values: Iterable[Union[int, str, Decimal]],
+    from_unit: str = "wei",
+    to_unit: str = "ether",
+) -> List[Decimal]:
+    """
+    Exactly converts a sequence of amounts, see convert_units.
+    """
+    shift = UNIT_DECIMALS[from_unit] - UNIT_DECIMALS[to_unit]
+    scaleb = EXACT.scaleb
+    return [scaleb(_to_decimal(value), shift) for value in values]
+
+
+def convert_units_fast(
+    values: Any, from_unit: str = "wei", to_unit: str = "ether"
+) -> Any:
+    """
+    Converts amounts to floats for analytics: a NumPy array is converted in one vectorised operation, any other
+    sequence of ints or strings element-wise with a single correctly rounded division each.
+    """
+    shift = UNIT_DECIMALS[from_unit] - UNIT_DECIMALS[to_unit]
+    if hasattr(values, "dtype"):
+        return values.astype("float64") * 10.0**shift
+    if shift >= 0:
+        factor = 10**shift
+        return [float(to_int(value) * factor) for value in values]
+    divisor = 10**-shift
+    return [to_int(value) / divisor for value in values]
+
+
+def convert_limbs_fast(
+    limbs: Any, from_unit: str = "wei", to_unit: str = "ether"
+) -> Any:
+    """
+    Converts a uint256 column of little-endian uint64 limbs, shape (rows, 4) as built by ColumnBuilder, to floats
+    in one vectorised operation. Requires numpy.
+    """
+    import numpy as np
+
+    weights = np.array([1.0, 2.0**64, 2.0**128, 2.0**192])
+    shift = UNIT_DECIMALS[from_unit] - UNIT_DECIMALS[to_unit]
+    return (np.asarray(limbs, dtype=np.float64) @ weights) * 10.0**shift